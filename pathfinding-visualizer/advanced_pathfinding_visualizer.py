@@ -1,6 +1,15 @@
-import pygame, math, sys
-from queue import PriorityQueue, Queue, LifoQueue
+import pygame, math, os, sys, time, threading
+import numpy as np
 from array import array
+from collections import deque
+from pathfinding_core import Grid, BARRIER, BLOCKED, STEPPERS, path_cache, flow_field, OPEN, CLOSED, PATH, OPEN_BACK, CLOSED_BACK
+from pathfinding_core.maps import open_map
+from pathfinding_core.profiling import RunStats, export_json
+from pathfinding_core.multiagent import whca_star_steps
+from pathfinding_core.worker import SearchWorker
+from pathfinding_core.trace import Trace, KINDS, CODES, load_trace
+from pathfinding_core.landmarks import (landmarks, attached_landmarks, detach_landmarks, load_landmarks,
+                                        landmarks_path, layout_checksum)
 
 # ---------- Init ----------
 pygame.init()
@@ -18,7 +27,7 @@ SCREEN_W, SCREEN_H = INFO.current_w, INFO.current_h
 SCALE = 0.92          # proportion of screen taken by square grid area when fullscreen
 WINDOW_SCALE = 0.8    # proportion when windowed
 DEFAULT_ROWS = 40     # initial grid density (can be changed with slider)
-MIN_ROWS, MAX_ROWS = 20, 80
+MIN_ROWS, MAX_ROWS = 20, 1024   # the slider's range; it moves through it geometrically
 
 def compute_grid_pixels(fullscreen=False, base_w=SCREEN_W, base_h=SCREEN_H):
     if fullscreen:
@@ -40,6 +49,7 @@ WIN = pygame.display.set_mode((GRID_PIXELS, GRID_PIXELS + UI_HEIGHT))
 pygame.display.set_caption("Advanced Pathfinding Visualizer")
 
 FONT = pygame.font.SysFont("arial", 16)
+SMALL_FONT = pygame.font.SysFont("arial", 13)
 TITLE_FONT = pygame.font.SysFont("arial", 28, bold=True)
 CLOCK = pygame.time.Clock()
 
@@ -54,8 +64,12 @@ START_COLOR = (255,165,0)
 END_COLOR = (128,0,128)
 BARRIER_COLOR = (0,0,0)
 OPEN_COLOR = (0,102,255)
+OPEN_BACK_COLOR = (0,190,160)
+CLOSED_BACK_COLOR = (255,105,180)
 CLOSED_COLOR = (255,0,0)
 PATH_COLOR = (255,255,0)
+MUD_COLOR = (176,136,96)
+WATER_COLOR = (150,200,240)
 
 # ---------- Click sound ----------
 def make_click_sound():
@@ -83,172 +97,655 @@ def click_play():
         except:
             pass
 
-# ---------- Node ----------
-class Node:
-    def __init__(self, r,c,w,total):
-        self.row=r; self.col=c; self.width=w; self.total=total
-        self.x = c * w
-        self.y = r * w
-        self.color = WHITE
-        self.neighbors=[]
-    def get_pos(self): return (self.row,self.col)
-    def is_barrier(self): return self.color==BARRIER_COLOR
-    def is_start(self): return self.color==START_COLOR
-    def is_end(self): return self.color==END_COLOR
-    def reset(self): self.color=WHITE
-    def make_start(self): self.color=START_COLOR
-    def make_end(self): self.color=END_COLOR
-    def make_barrier(self): self.color=BARRIER_COLOR
-    def make_open(self): self.color=OPEN_COLOR
-    def make_closed(self): self.color=CLOSED_COLOR
-    def make_path(self): self.color=PATH_COLOR
-    def draw(self, win): pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
-    def update_neighbors(self, grid):
-        self.neighbors=[]
-        rows=self.total
-        r,c = self.row, self.col
-        # 4 directions
-        if r < rows-1 and not grid[r+1][c].is_barrier(): self.neighbors.append(grid[r+1][c])
-        if r > 0 and not grid[r-1][c].is_barrier(): self.neighbors.append(grid[r-1][c])
-        if c < rows-1 and not grid[r][c+1].is_barrier(): self.neighbors.append(grid[r][c+1])
-        if c > 0 and not grid[r][c-1].is_barrier(): self.neighbors.append(grid[r][c-1])
-    def __lt__(self, other): return False
-
-# ---------- Heuristic & path reconstruct ----------
-def h(p1,p2):
-    (r1,c1),(r2,c2)=p1,p2
-    return abs(r1-r2)+abs(c1-c2)
-
-def reconstruct_path(came_from, current, draw):
-    while current in came_from:
-        current = came_from[current]
-        current.make_path()
-        draw()
-
-# ---------- Algorithms ----------
-def a_star(draw, grid, start, end):
-    count=0
-    open_set = PriorityQueue()
-    open_set.put((0,count,start))
-    came_from={}
-    g_score={node: float('inf') for row in grid for node in row}
-    f_score={node: float('inf') for row in grid for node in row}
-    g_score[start]=0
-    f_score[start]=h(start.get_pos(), end.get_pos())
-    open_hash={start}
-    while not open_set.empty():
-        for ev in pygame.event.get():
-            if ev.type==pygame.QUIT: pygame.quit(); sys.exit()
-        current=open_set.get()[2]
-        open_hash.remove(current)
-        if current==end:
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
-            return True
-        for neighbor in current.neighbors:
-            temp_g=g_score[current]+1
-            if temp_g < g_score[neighbor]:
-                came_from[neighbor]=current
-                g_score[neighbor]=temp_g
-                f_score[neighbor]=temp_g + h(neighbor.get_pos(), end.get_pos())
-                if neighbor not in open_hash:
-                    count+=1
-                    open_set.put((f_score[neighbor], count, neighbor))
-                    open_hash.add(neighbor)
-                    neighbor.make_open()
-        draw()
-        if current!=start: current.make_closed()
-    draw_no_path_message()
-    return False
-
-def dijkstra(draw, grid, start, end):
-    pq = PriorityQueue()
-    pq.put((0,start))
-    dist={node: float('inf') for row in grid for node in row}
-    dist[start]=0
-    came_from={}
-    while not pq.empty():
-        for ev in pygame.event.get():
-            if ev.type==pygame.QUIT: pygame.quit(); sys.exit()
-        current = pq.get()[1]
-        if current==end:
-            reconstruct_path(came_from,end,draw)
-            end.make_end()
-            return True
-        for neighbor in current.neighbors:
-            temp = dist[current]+1
-            if temp < dist[neighbor]:
-                came_from[neighbor]=current
-                dist[neighbor]=temp
-                pq.put((temp,neighbor))
-                neighbor.make_open()
-        draw()
-        if current!=start: current.make_closed()
-    draw_no_path_message()
-    return False
-
-def bfs(draw, grid, start, end):
-    q = Queue()
-    q.put(start)
-    came_from={}
-    visited={start}
-    while not q.empty():
-        for ev in pygame.event.get():
-            if ev.type==pygame.QUIT: pygame.quit(); sys.exit()
-        current = q.get()
-        if current==end:
-            reconstruct_path(came_from,end,draw)
-            end.make_end()
-            return True
-        for neighbor in current.neighbors:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                came_from[neighbor]=current
-                q.put(neighbor)
-                neighbor.make_open()
-        draw()
-        if current!=start: current.make_closed()
-    draw_no_path_message()
-    return False
-
-def dfs(draw, grid, start, end):
-    st = LifoQueue()
-    st.put(start)
-    came_from={}
-    visited={start}
-    while not st.empty():
-        for ev in pygame.event.get():
-            if ev.type==pygame.QUIT: pygame.quit(); sys.exit()
-        current = st.get()
-        if current==end:
-            reconstruct_path(came_from,end,draw)
-            end.make_end()
-            return True
-        for neighbor in current.neighbors:
-            if neighbor not in visited:
-                visited.add(neighbor)
-                came_from[neighbor]=current
-                st.put(neighbor)
-                neighbor.make_open()
-        draw()
-        if current!=start: current.make_closed()
-    draw_no_path_message()
-    return False
+# ---------- Board: solver grid + display overlay ----------
+# overlay codes, kept apart from the barrier layout the solvers read
+EMPTY, OPEN_CELL, CLOSED_CELL, PATH_CELL, OPEN_BACK_CELL, CLOSED_BACK_CELL = 0, 1, 2, 3, 4, 5
+OVERLAY_COLORS = (WHITE, OPEN_COLOR, CLOSED_COLOR, PATH_COLOR, OPEN_BACK_COLOR, CLOSED_BACK_COLOR)
+OVERLAY_CODES = {OPEN: OPEN_CELL, CLOSED: CLOSED_CELL, PATH: PATH_CELL,
+                 OPEN_BACK: OPEN_BACK_CELL, CLOSED_BACK: CLOSED_BACK_CELL}
+TRACE_OVERLAY = np.array([EMPTY] + [OVERLAY_CODES[k] for k in KINDS], dtype=np.uint8)   # trace kind code -> overlay code
+
+# viewport: zoom levels as (pixels per cell, cells per pixel); below one pixel per cell a
+# pixel shows a whole block of cells (level of detail), the most important one winning
+ZOOMS = tuple((1, b) for b in (64, 32, 16, 8, 4, 2)) + tuple((g, 1) for g in (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64))
+MARKER_PX = 5         # start, end and agents are drawn at least this big however far out the view is
+LINES_MIN_GAP = 4     # no grid lines below this many pixels per cell, they would hide the cells
+OUTSIDE_COLOR = PANEL   # the viewport beyond the map's edges
+
+# paintable terrain: (name, step cost, color); plain ground costs 1
+TERRAINS = (("Mud", 3, MUD_COLOR), ("Water", 8, WATER_COLOR))
+TERRAIN_COLORS = {cost: col for _, cost, col in TERRAINS}
+
+# movement rules the grid can be switched between: (label, connectivity, corner cutting)
+MOVES = (("4-way", 4, True), ("8-way", 8, True), ("8 no-cut", 8, False))
+
+# distance-to-end heatmap (H): index 0 means no heat, 1 is next to the end, the last is farthest
+HEAT_NEAR, HEAT_FAR = (255,240,170), (90,30,120)
+HEAT_COLORS = (None,) + tuple(tuple(int(a + (b - a) * k / 23) for a, b in zip(HEAT_NEAR, HEAT_FAR)) for k in range(24))
+
+# multi-agent mode: one color per agent (cycled), its goal drawn in a paler tint
+AGENT_COLORS = ((230,25,75),(60,180,75),(0,130,200),(245,130,48),(145,30,180),
+                (70,200,200),(240,50,230),(150,190,40),(0,128,128),(170,110,40))
+AGENT_GOAL_COLORS = tuple(tuple((c + 2*255)//3 for c in col) for col in AGENT_COLORS)
+AGENT_BATCH = 50   # agents G scatters at random
+
+def terrain_color(cost):
+    return WHITE if cost == 1 else TERRAIN_COLORS.get(cost, MUD_COLOR)
+
+def packed(colors):
+    # RGB tuples as 0xRRGGBB pixels, the layout of a plain 32-bit Surface
+    return np.array([(r << 16) | (g << 8) | b for r,g,b in colors], dtype=np.uint32)
+
+def reduce_blocks(layer, block, op=np.maximum, dtype=None):
+    # combine each block x block square of a 2-D array with op (partial squares at the edges
+    # too), one strided slice at a time -- far faster than reshaping into 4-D and reducing
+    out = layer[::block].astype(dtype or layer.dtype)
+    for k in range(1, block):
+        part = layer[k::block]; op(out[:len(part)], part, out=out[:len(part)])
+    rows = out
+    out = rows[:, ::block].copy()
+    for k in range(1, block):
+        part = rows[:, k::block]; op(out[:, :part.shape[1]], part, out=out[:, :part.shape[1]])
+    return out
+
+# the same colors as lookup tables, for painting whole regions at once
+TERRAIN_LUT = packed(terrain_color(cost) for cost in range(256))
+OVERLAY_LUT = packed(OVERLAY_COLORS)
+HEAT_LUT = packed((WHITE,) + HEAT_COLORS[1:])
+BARRIER_PIXEL = packed((BARRIER_COLOR,))[0]
+
+class Board:
+    def __init__(self, rows, pixel_size, grid=None):
+        # grid: an already loaded map (possibly memory-mapped) to wrap instead of an empty one
+        self.grid = Grid(rows) if grid is None else grid
+        self.rows, self.cols = self.grid.rows, self.grid.cols
+        self.viewport = pygame.Rect(0, 0, pixel_size, pixel_size)
+        self.fit()
+        self.lod = None   # (key, terrain pixels, barrier mask) for the whole map at the current block size
+        self.overlay = self.grid.new_layer()
+        self.heat = None; self.heat_key = None   # HEAT_COLORS index per cell while the heatmap is shown
+        self.start = None; self.end = None
+        self.agents = []     # (start, goal) flat indices per agent
+        self.agent_at = {}; self.goal_at = {}   # flat index -> agent: where agents are drawn, their goals
+        self.agents_shown = None   # the positions agent_at shows, None while at their starts
+        self.rng = np.random.default_rng()
+        self.dirty = set()   # flat indices whose color changed since the last frame
+    # ---- camera: gap pixels per cell, or one pixel per block x block cells; (ox, oy) is the
+    # map pixel at the viewport's top-left corner ----
+    def fit(self):
+        # zoom so the whole map shows, from its top-left corner
+        size, cells = self.viewport.w, max(self.rows, self.cols)
+        self.gap, self.block = (size // cells, 1) if cells <= size else (1, -(-cells // size))
+        self.fit_zoom = (self.gap, self.block)
+        self.ox = self.oy = 0
+    @property
+    def camera(self): return (self.gap, self.block, self.ox, self.oy)
+    def zoom_text(self):
+        return f"{self.gap}px/cell" if self.block == 1 else f"1px/{self.block}x{self.block} cells"
+    def zoom(self, steps, anchor):
+        # steps ZOOMS levels in (> 0) or out, keeping the map point under anchor (a screen position) in place;
+        # never further out than showing the whole map
+        scale = lambda z: z[0] / z[1]
+        levels = sorted({z for z in ZOOMS if scale(z) >= scale(self.fit_zoom)} | {self.fit_zoom}, key=scale)
+        here = min(range(len(levels)), key=lambda k: abs(scale(levels[k]) - self.gap / self.block))
+        gap, block = levels[max(0, min(len(levels) - 1, here + steps))]
+        ax, ay = anchor
+        x = (self.ox + ax) * self.block / self.gap   # the map point under the anchor, in cells
+        y = (self.oy + ay) * self.block / self.gap
+        self.gap, self.block = gap, block
+        self.ox, self.oy = int(x * gap / block) - ax, int(y * gap / block) - ay
+        self.pan(0, 0)
+    def pan(self, dx, dy):
+        # move the view by (dx, dy) screen pixels, no further than the map's edges
+        w, h = self.tiles(self.cols) * self.gap, self.tiles(self.rows) * self.gap
+        size = self.viewport.w
+        self.ox = max(min(0, w - size), min(max(0, w - size), self.ox - dx))
+        self.oy = max(min(0, h - size), min(max(0, h - size), self.oy - dy))
+    def tiles(self, cells):
+        # screen squares (of gap pixels) that cells cells take up
+        return -(-cells // self.block)
+    def cell_at(self, x, y):
+        # the (row, col) under screen position (x, y), or (None, None) off the map
+        if not self.viewport.collidepoint(x, y): return None, None
+        r, c = (self.oy + y) // self.gap * self.block, (self.ox + x) // self.gap * self.block
+        if r >= self.rows or c >= self.cols: return None, None
+        return r, c
+    def cell_rect(self, i):
+        # the screen area cell i covers: its square, or its block's pixel -- widened to the
+        # marker size when that is smaller, so a repaint always covers a marker drawn there
+        r,c = self.grid.pos(i)
+        gap, b = self.gap, self.block
+        rect = pygame.Rect(c//b*gap - self.ox, r//b*gap - self.oy, gap, gap)
+        if gap < MARKER_PX: rect = rect.inflate(MARKER_PX - gap, MARKER_PX - gap)
+        return rect
+    def visible(self, i):
+        return self.viewport.colliderect(self.cell_rect(i))
+    def color(self, pos):
+        if pos==self.start: return START_COLOR
+        if pos==self.end: return END_COLOR
+        if self.grid.is_barrier(pos): return BARRIER_COLOR
+        i = self.grid.index(pos)
+        if i in self.agent_at: return AGENT_COLORS[self.agent_at[i] % len(AGENT_COLORS)]
+        if i in self.goal_at: return AGENT_GOAL_COLORS[self.goal_at[i] % len(AGENT_COLORS)]
+        code = self.overlay[i]
+        if code: return OVERLAY_COLORS[code]
+        if self.heat is not None and self.heat[i]: return HEAT_COLORS[self.heat[i]]
+        return terrain_color(self.grid.cost(pos))
+    def show_heat(self, field):
+        # color free cells by their distance in field (a FlowField), or stop with None
+        if field is None:
+            self.heat = None; self.heat_key = None
+            return
+        dist = field.distance
+        reached = np.isfinite(dist)
+        far = dist[reached].max() or 1
+        heat = self.grid.new_layer()
+        heat[reached] = 1 + (dist[reached] * ((len(HEAT_COLORS) - 2) / far)).astype(np.uint8)
+        self.heat = heat; self.heat_key = (self.grid.version, self.end)
+    def pixels(self, r0, r1, c0, c1):
+        # packed colors of the screen squares showing cells r0:r1, c0:c1 (whole blocks)
+        grid, b = self.grid, self.block
+        if b == 1:
+            # one color per cell from the lookup tables, later layers on top
+            pixels = TERRAIN_LUT[grid.interior(grid.costs)[r0:r1, c0:c1]]
+            barrier = (grid.view[r0:r1, c0:c1] & BARRIER) != 0
+        else:
+            # zoomed out: per block the costliest terrain, barriers where they fill at least
+            # half of it, both cached for the whole map until it changes
+            key = (grid.version, b)
+            if self.lod is None or self.lod[0] != key:
+                self.lod = (key, TERRAIN_LUT[reduce_blocks(grid.interior(grid.costs), b)],
+                            reduce_blocks(grid.view & BARRIER, b, np.add, np.uint16) * 2 >= b * b)
+            _, terrain, barriers = self.lod
+            pixels = terrain[r0//b:-(-r1//b), c0//b:-(-c1//b)].copy()
+            barrier = barriers[r0//b:-(-r1//b), c0//b:-(-c1//b)]
+        for layer, lut in ((self.heat, HEAT_LUT), (self.overlay, OVERLAY_LUT)):
+            if layer is None: continue
+            codes = grid.interior(layer)[r0:r1, c0:c1]
+            if b > 1:
+                if not codes.any(): continue
+                # the farthest heat, and the overlay's highest code -- but the path above everything
+                path = reduce_blocks(codes == PATH_CELL, b) if layer is self.overlay else None
+                codes = reduce_blocks(codes, b)
+                if path is not None: codes[path] = PATH_CELL
+            pixels = np.where(codes != 0, lut[codes], pixels)
+        pixels[barrier] = BARRIER_PIXEL
+        return pixels
+    def draw(self, win, area=None):
+        # paint the viewport, or just the part of it inside area, drawing only the cells
+        # in view; returns the painted rect
+        area = self.viewport if area is None else area.clip(self.viewport)
+        if not area.w or not area.h: return area
+        gap, b = self.gap, self.block
+        clip = win.get_clip(); win.set_clip(area)
+        win.fill(OUTSIDE_COLOR, area)
+        # the screen squares under area, and the cells they show
+        t0, u0 = (self.oy + area.top) // gap, (self.ox + area.left) // gap
+        t1 = min(self.tiles(self.rows), -(-(self.oy + area.bottom) // gap))
+        u1 = min(self.tiles(self.cols), -(-(self.ox + area.right) // gap))
+        t0, u0 = max(0, t0), max(0, u0)
+        if t0 < t1 and u0 < u1:
+            r0, r1, c0, c1 = t0*b, min(self.rows, t1*b), u0*b, min(self.cols, u1*b)
+            pixels = self.pixels(r0, r1, c0, c1)
+            image = pygame.Surface((u1-u0, t1-t0), 0, 32)
+            pygame.surfarray.blit_array(image, pixels.T)
+            if gap > 1: image = pygame.transform.scale(image, ((u1-u0)*gap, (t1-t0)*gap))
+            win.blit(image, (u0*gap - self.ox, t0*gap - self.oy))
+            marks = [(i, colors[a % len(colors)]) for marks,colors in ((self.goal_at,AGENT_GOAL_COLORS),(self.agent_at,AGENT_COLORS))
+                     for i,a in marks.items()]
+            marks += [(self.grid.index(pos), col) for pos,col in ((self.start,START_COLOR),(self.end,END_COLOR)) if pos]
+            for i,col in marks:
+                rect = self.cell_rect(i)
+                if rect.colliderect(area): pygame.draw.rect(win, col, rect)
+        win.set_clip(clip)
+        return area
+    def draw_cell(self, win, i):
+        if self.gap < MARKER_PX:
+            self.draw(win, self.cell_rect(i))   # a block, or a marker bigger than the cell
+        else:
+            pygame.draw.rect(win, self.color(self.grid.pos(i)), self.cell_rect(i).clip(self.viewport))
+    def touch(self, pos):
+        if pos: self.dirty.add(self.grid.index(pos))
+    def place(self, mode, pos, cost=1):
+        self.show_agents(None)
+        i = self.grid.index(pos)
+        if mode=="start":
+            self.erase(pos); self.touch(self.start); self.start = pos
+        elif mode=="end":
+            self.erase(pos); self.touch(self.end); self.end = pos
+        elif mode=="barrier":
+            if pos!=self.start and pos!=self.end and i not in self.agent_at and i not in self.goal_at:
+                self.grid.set_barrier(pos); self.overlay[self.grid.index(pos)] = EMPTY
+                self.touch(pos)
+        elif mode=="terrain":
+            self.grid.set_cost(pos, cost); self.overlay[self.grid.index(pos)] = EMPTY
+            self.touch(pos)
+        elif mode=="erase":
+            self.erase(pos)
+        elif mode=="agents":
+            # a new agent here, heading for a random free cell no other agent is headed for
+            if pos!=self.start and pos!=self.end and not self.grid.is_barrier(pos) and i not in self.agent_at:
+                goal = self.random_cells(1, set(self.goal_at) | {i})
+                if goal: self.add_agents([i], goal)
+    def erase(self, pos):
+        self.show_agents(None)
+        if pos==self.start: self.start=None
+        if pos==self.end: self.end=None
+        i = self.grid.index(pos)
+        if i in self.agent_at or i in self.goal_at:
+            self.set_agents([(s,g) for s,g in self.agents if s != i and g != i])
+        self.grid.set_barrier(pos, False)
+        if self.grid.cost(pos) != 1: self.grid.set_cost(pos, 1)
+        self.overlay[self.grid.index(pos)] = EMPTY
+        self.touch(pos)
+    def random_cells(self, count, taken):
+        # up to count distinct free cells outside taken, as flat indices
+        free = np.flatnonzero((self.grid.cells & BLOCKED) == 0)
+        if taken: free = free[~np.isin(free, list(taken))]
+        return self.rng.choice(free, min(count, len(free)), replace=False).tolist()
+    def scatter_agents(self, count):
+        self.show_agents(None)
+        taken = set(self.agent_at) | {self.grid.index(p) for p in (self.start, self.end) if p}
+        starts = self.random_cells(count, taken)
+        self.add_agents(starts, self.random_cells(len(starts), set(self.goal_at)))
+    def add_agents(self, starts, goals):
+        self.set_agents(self.agents + list(zip(starts, goals)))
+    def set_agents(self, agents):
+        self.dirty.update(self.agent_at); self.dirty.update(self.goal_at)
+        self.agents = agents
+        self.agent_at = {s: a for a,(s,_) in enumerate(agents)}
+        self.goal_at = {g: a for a,(_,g) in enumerate(agents)}
+        self.dirty.update(self.agent_at); self.dirty.update(self.goal_at)
+    def show_agents(self, positions):
+        # draw agent k at positions[k] (flat indices), or back at its start with None
+        if positions is None and self.agents_shown is None: return
+        self.dirty.update(self.agent_at)
+        cells = positions if positions is not None else [s for s,_ in self.agents]
+        self.agent_at = {i: a for a,i in enumerate(cells)}
+        self.dirty.update(self.agent_at)
+        self.agents_shown = positions
+    def clear_overlay(self):
+        self.dirty.update(np.flatnonzero(self.overlay).tolist())
+        self.overlay[:] = EMPTY
+
+# ---------- Solver bridge ----------
+SPEEDS = (1, 4, 16, 64, 256, 0)   # expansions per frame, 0 = instant
+DEFAULT_SPEED = 2
+FRAME_BUDGET_MS = 10              # never spend more than this per frame drawing search events
+SEARCH_LOCK = threading.Lock()    # background workers (searches, agent plans, heatmaps) run one at a time
+IDLE = threading.Event()          # set while the main loop waits for the next frame, when workers may run
+TAKE_BATCH = 4096                 # events moved from a worker's buffer at a time
+NOTICE_S = 2.0                    # how long "No Path Found!" stays up
+STATUS_S = 3.0                    # how long a "Saved ..." message takes the algorithm label's place
+
+ALGORITHM_KEYS = list(STEPPERS)[:10]   # number keys 1..9, then 0, pick these in order
+HUD_REFRESH_S = 0.25              # stats line refresh while a run is animating
+STATS_FILE = "run_stats.json"     # where J exports this session's run stats
+TRACE_FILE = "last_run.pftrace"   # where S saves the last run's trace
+SCRUB_STEPS = 100                 # Left/Right move a trace replay by this fraction of its events, PgUp/PgDn ten times that
+
+def speed_label(speed): return f"x{speed}" if speed else "Instant"
+
+def replay_path(grid, result):
+    # a cached answer: just draw its path, same order the searches use
+    for pos in reversed(result.path[1:-1]): yield PATH, grid.index(pos)
+    return result
+
+def stop(job):
+    # cancel a SearchRun / AgentPlayback / TraceReplay if there is one; returns None to clear the variable
+    if job is not None: job.cancel()
+    return None
+
+class SearchRun:
+    # the solver's step generator runs on a SearchWorker thread; each frame the main
+    # loop draws a few of the events it published, so the UI never waits on the search
+    def __init__(self, algo, board):
+        board.clear_overlay()
+        self.overlay = board.overlay
+        self.dirty = board.dirty
+        self.query = (board.grid, algo, board.start, board.end)
+        self.cache = path_cache(board.grid)
+        cached = self.cache.get(*self.query)
+        if cached is not None:
+            steps = replay_path(board.grid, cached)
+        else:
+            steps = STEPPERS[algo](board.grid, board.start, board.end)
+        self.cached = cached is not None
+        # every event is recorded on the way through, for R to replay and S to save
+        self.trace = Trace(board.grid, algo, board.start, board.end)
+        steps = self.trace.record(steps)
+        self.worker = SearchWorker(steps, SEARCH_LOCK, gate=IDLE)
+        self.pending = deque()   # events taken from the worker, not drawn yet
+        self.result = None
+        self.stats = RunStats(algo, board.start, board.end)
+    def advance(self, speed, single=False):
+        # draws up to speed expansions (speed 0: all there are, single: just one);
+        # returns True once the search is finished and everything is drawn
+        overlay, pending, dirty = self.overlay, self.pending, self.dirty
+        t0 = time.perf_counter()
+        deadline = t0 + FRAME_BUDGET_MS/1000
+        done = count = 0
+        try:
+            while True:
+                if not pending:
+                    pending.extend(self.worker.take(TAKE_BATCH))
+                    if not pending:
+                        if self.worker.finished: return self.finish()
+                        return False   # the worker has not got this far yet
+                kind, i = pending.popleft()
+                count += 1
+                overlay[i] = OVERLAY_CODES[kind]
+                dirty.add(i)
+                if kind!=OPEN and (speed or single):
+                    done += 1
+                    if single or done >= speed: return False
+                if time.perf_counter() > deadline: return False
+        finally:
+            # drawing the events is this thread's share; the worker's time is added at the end
+            self.stats.add("draw", time.perf_counter() - t0)
+            self.stats.steps += count; self.stats.frames += 1
+    def finish(self):
+        if self.worker.error is not None: raise self.worker.error
+        self.result = self.worker.result
+        self.stats.add("search", self.worker.seconds)
+        self.stats.finish(self.result)
+        if not self.cached: self.cache.put(*self.query, self.result)
+        return True
+    def cancel(self):
+        self.worker.cancel()
+
+class TraceReplay:
+    # shows a recorded run again from its Trace without running the search; jumps in
+    # either direction go through the trace's keyframes, so only the drawing costs
+    def __init__(self, trace, board):
+        self.trace = trace
+        self.board = board
+        board.clear_overlay()
+        board.touch(board.start); board.touch(board.end)
+        meta = trace.meta
+        board.start = tuple(meta["start"]) if meta["start"] else None
+        board.end = tuple(meta["end"]) if meta["end"] else None
+        board.touch(board.start); board.touch(board.end)
+        self.codes = trace.events[0]
+        self.pos = 0   # events shown
+        self.done = False   # played to the end once; from then on it only moves when scrubbed
+    def advance(self, speed, single=False):
+        # like SearchRun.advance: up to speed expansions, all of them with speed 0, one with single
+        n = len(self.trace)
+        if speed or single:
+            want = 1 if single else speed
+            ahead = self.codes[self.pos:self.pos + max(TAKE_BATCH, 64*want)]
+            expanded = np.flatnonzero(ahead != CODES[OPEN])
+            self.seek(self.pos + (expanded[want-1] + 1 if len(expanded) >= want else len(ahead)))
+        else:
+            self.seek(n)
+        self.done = self.pos >= n
+        return self.done
+    def seek(self, n):
+        # show the overlay as it was after n events, marking the cells that change
+        trace, board = self.trace, self.board
+        n = max(0, min(n, len(trace)))
+        if self.pos <= n <= self.pos + trace.every:
+            cells, codes = trace.changes(self.pos, n)
+            board.overlay[cells] = TRACE_OVERLAY[codes]
+        else:
+            layer = TRACE_OVERLAY[trace.state(n)]
+            cells = np.flatnonzero(layer != board.overlay)
+            board.overlay[cells] = layer[cells]
+        board.dirty.update(cells.tolist())
+        self.pos = int(n)
+    def scrub(self, fraction):
+        self.seek(self.pos + round(fraction * len(self.trace)))
+    def cancel(self):
+        pass   # nothing runs in the background
+    def text(self):
+        meta, n = self.trace.meta, len(self.trace)
+        cost = meta.get("cost")
+        result = (f"path {meta['path_length']}  cost {cost if isinstance(cost, int) else f'{cost:.2f}'}"
+                  if meta.get("found") else "no path" if "found" in meta else "unfinished run")
+        return (f"replay {meta['algorithm']}  event {self.pos}/{n} ({100*self.pos//max(1, n)}%)"
+                f"  expanded {meta.get('stats', {}).get('expanded', '-')}",
+                f"{result}   Left/Right scrub  PgUp/PgDn jump  Home/End")
+
+TICK_FRAMES = 32   # agent playback: frames per tick at speed x1, faster speeds divide it
+
+class AgentPlayback:
+    # plans every agent together on a worker thread, then shows the plan one tick at a time
+    def __init__(self, board):
+        self.board = board
+        grid = board.grid
+        agents = [(grid.pos(s), grid.pos(g)) for s,g in board.agents]
+        self.worker = SearchWorker(whca_star_steps(grid, agents), SEARCH_LOCK, gate=IDLE)
+        self.result = None
+        self.planned = 0   # how far planning got, while it runs
+        self.tick = 0; self.frames = 0
+        self.done = False
+    def advance(self, speed, single=False):
+        # returns True once the last tick is shown; speed 0 jumps straight there, single one tick on
+        if self.result is None:
+            ticks = self.worker.take()
+            if ticks: self.planned = ticks[-1]
+            if not self.worker.finished: return False
+            if self.worker.error is not None: raise self.worker.error
+            self.result = self.worker.result
+            return False
+        ticks = self.result.ticks
+        if single:
+            self.tick = min(ticks, self.tick + 1)
+        elif not speed:
+            self.tick = ticks
+        else:
+            self.frames += 1
+            if self.frames >= TICK_FRAMES // speed:
+                self.frames = 0
+                self.tick = min(ticks, self.tick + max(1, speed // TICK_FRAMES))
+        self.board.show_agents(self.result.positions[self.tick].tolist())
+        self.done = self.tick >= ticks
+        return self.done
+    def cancel(self):
+        self.worker.cancel()
+    def text(self):
+        if self.result is None:
+            return (f"planning {len(self.board.agents)} agents...  tick {self.planned}",)
+        s = self.result.stats
+        return (f"agents {s['agents']}  arrived {s['arrived']}  tick {self.tick}/{self.result.ticks}  "
+                f"stalled {s['stalled']}  unreachable {s['unreachable']}  conflicts {s['conflicts']}",
+                f"moves {s['moves']}  replans {s['replans']}  expanded {s['expanded']}  plan {s['ms']:.1f} ms")
+
+def build_field(grid, end):
+    # a generator with no events, so a SearchWorker can build the heatmap's field off the render thread
+    return flow_field(grid, end)
+    yield
+
+def build_alt(grid):
+    # the same for A*'s landmark tables; landmarks() attaches them to the grid
+    return landmarks(grid)
+    yield
+
+def open_alt(grid, alt_file):
+    # attach the tables saved next to the opened map, if they were built for this layout
+    if alt_file is None: return False
+    try:
+        load_landmarks(grid, alt_file[0])
+    except (OSError, ValueError):
+        return False
+    return True
+
+def stats_text(stats):
+    # the two HUD lines describing a run
+    d = stats.as_dict()
+    if not d["finished"]:
+        first = f"running...  {d['steps']} steps"
+    elif d["expanded"] is None:
+        first = "cached result"
+    else:
+        first = (f"expanded {d['expanded']}  pushes {d['pushes']}  pops {d['pops']} "
+                 f"(stale {d['stale']})  peak open {d['peak_open']}")
+    # engine notes such as cache: subpath or field: cached
+    first += "".join(f"  {k}: {v}" for k,v in d["other"].items() if isinstance(v, str))
+    cost = d["cost"]
+    path = (f"path {d['path_length']}  cost {cost if isinstance(cost, int) else f'{cost:.2f}'}" if d["found"]
+            else "no path" if d["finished"] else "path -")
+    ms = d["ms"]
+    return (first, f"{path}   search {ms['search']:.1f} ms  draw {ms['draw']:.1f} ms  events {ms['events']:.1f} ms")
 
 # ---------- Grid + drawing ----------
-def make_grid(rows, pixel_size):
-    grid=[]
-    gap = pixel_size // rows
-    for r in range(rows):
-        grid.append([ Node(r,c,gap,rows) for c in range(rows) ])
-    return grid
-
-def draw_grid(win, grid_pixels, rows):
-    gap = grid_pixels // rows
-    for i in range(rows):
-        pygame.draw.line(WIN, GREY, (0, i*gap), (grid_pixels, i*gap))
-        for j in range(rows):
-            pygame.draw.line(WIN, GREY, (j*gap,0), (j*gap, grid_pixels))
+def map_settings(loaded):
+    # grid density and MOVES index that show a loaded map whole with its own movement rules
+    moves = next((k for k,(_, conn, cut) in enumerate(MOVES)
+                  if (conn, cut) == (loaded.connectivity, loaded.corner_cutting)), 0)
+    return max(loaded.rows, loaded.cols), moves
+
+def make_grid(rows, pixel_size, moves=0, loaded=None):
+    board = Board(rows, pixel_size, loaded)
+    _, connectivity, corner_cutting = MOVES[moves]
+    board.grid.set_connectivity(connectivity, corner_cutting)
+    return board
+
+def resample_board(board, rows, pixel_size, moves):
+    # the same layout at another density: barriers and terrain resampled, start and end carried over
+    grid = board.grid
+    scale = rows / max(grid.rows, grid.cols)
+    shape = (max(1, round(grid.rows * scale)), max(1, round(grid.cols * scale)))
+    new = make_grid(rows, pixel_size, moves, grid.resampled(*shape))
+    for name in ("start", "end"):
+        pos = getattr(board, name)
+        if pos is None: continue
+        pos = (min(new.rows - 1, int(pos[0] * scale)), min(new.cols - 1, int(pos[1] * scale)))
+        if not new.grid.is_barrier(pos) and pos != new.start: setattr(new, name, pos)
+    return new
+
+def draw_grid(win, board):
+    # lines between the cells in view, where the camera puts them
+    gap, ox, oy = board.gap, board.ox, board.oy
+    if board.block > 1 or gap < LINES_MIN_GAP: return   # lines would hide the cells
+    view = board.viewport
+    left, top = max(0, -ox), max(0, -oy)   # where the map starts on screen, if it does
+    right, bottom = min(view.right, board.cols*gap - ox), min(view.bottom, board.rows*gap - oy)
+    for y in range(top + (-oy - top) % gap, bottom + 1, gap):
+        pygame.draw.line(win, GREY, (left, y), (right, y))
+    for x in range(left + (-ox - left) % gap, right + 1, gap):
+        pygame.draw.line(win, GREY, (x, top), (x, bottom))
+
+# ---------- HUD + toolbar drawing ----------
+def slider_rows(ratio):
+    # grid density at a slider position in 0..1, geometric so small grids stay easy to pick
+    return round(MIN_ROWS * (MAX_ROWS / MIN_ROWS) ** ratio)
+
+def slider_ratio(rows):
+    return max(0, min(1, math.log(max(rows, MIN_ROWS) / MIN_ROWS) / math.log(MAX_ROWS / MIN_ROWS)))
+
+LEGEND_ITEMS = [("Start",START_COLOR),("End",END_COLOR),("Barrier",BARRIER_COLOR),("Open Set",OPEN_COLOR),("Closed Set",CLOSED_COLOR),
+                ("Open (back)",OPEN_BACK_COLOR),("Closed (back)",CLOSED_BACK_COLOR),("Path",PATH_COLOR),("Empty",WHITE)] + \
+               [(f"{name} (x{cost})",col) for name,cost,col in TERRAINS] + \
+               [("Heat near (H)",HEAT_COLORS[1]),("Heat far (H)",HEAT_COLORS[-1]),
+                ("Agent (G)",AGENT_COLORS[0]),("Agent goal",AGENT_GOAL_COLORS[0])]
+LEGEND_H = len(LEGEND_ITEMS)*24 + 2
+
+def hud_rects(grid_pixels):
+    # screen areas the HUD covers on top of the grid: title, label, run stats, legend
+    tw, th = TITLE_FONT.size("Pathfinding Visualizer")
+    return [pygame.Rect(grid_pixels//2 - tw//2, 8, tw, th), pygame.Rect(8, 44, 480, 20),
+            pygame.Rect(8, 64, 360, 32), pygame.Rect(2, 96, 150, LEGEND_H)]
+
+def draw_hud(win, grid_pixels, label_text, stats_lines=()):
+    # Title
+    t = TITLE_FONT.render("Pathfinding Visualizer", True, PURPLE)
+    win.blit(t, (grid_pixels//2 - t.get_width()//2, 8))
+    # top-left algorithm label
+    win.blit(FONT.render(label_text, True, BLACK), (8, 44))
+    # stats of the last run, under the label
+    for k,line in enumerate(stats_lines):
+        win.blit(SMALL_FONT.render(line, True, BLACK), (8, 64 + k*16))
+    # legend small
+    lx,ly = 8,102
+    pygame.draw.rect(win, PANEL, (lx-6, ly-6, 150, LEGEND_H), border_radius=8)
+    pygame.draw.rect(win, BORDER, (lx-6, ly-6, 150, LEGEND_H), 2, border_radius=8)
+    for i,(lab,col) in enumerate(LEGEND_ITEMS):
+        pygame.draw.rect(win, col, (lx, ly + i*24, 16,16))
+        pygame.draw.rect(win, BLACK, (lx, ly + i*24, 16,16),1)
+        win.blit(FONT.render(lab, True, BLACK), (lx+22, ly + i*24 -1))
+
+def draw_toolbar(win, grid_pixels, ui_h, toolbar, slider_rect, rows, cols=None):
+    # bottom toolbar background
+    pygame.draw.rect(win, PANEL, (0, grid_pixels, grid_pixels, ui_h))
+    pygame.draw.rect(win, BORDER, (0, grid_pixels, grid_pixels, ui_h), 2)
+    # draw toolbar buttons
+    for b,act in toolbar:
+        b.draw(win)
+    # draw slider
+    pygame.draw.rect(win, (230,230,230), slider_rect, border_radius=6)
+    pygame.draw.rect(win, BORDER, slider_rect, 2, border_radius=6)
+    # slider handle position based on rows
+    ratio = slider_ratio(rows)
+    handle_x = int(slider_rect.x + 6 + ratio * (slider_rect.width - 12))
+    handle_rect = pygame.Rect(handle_x-6, slider_rect.y-6, 12, slider_rect.height+12)
+    pygame.draw.rect(win, PURPLE, handle_rect, border_radius=6)
+    win.blit(FONT.render(f"Grid: {rows} x {cols or rows}", True, BLACK), (slider_rect.x - 110, slider_rect.y -2))
+
+# ---------- Renderer ----------
+DIRTY_BATCH = 256   # above this many changed cells a frame repaints their bounding box instead
+class Renderer:
+    # Repaints only what changed: dirty cells, the HUD when a cell under it or its text
+    # changed, and the toolbar when a button did -- everything after the camera moved.
+    # Grid lines come from a cached layer that is only rebuilt when the window size or
+    # the camera changes.
+    def __init__(self):
+        self.lines = None; self.lines_key = None
+        self.board = None; self.win = None; self.size = None; self.ui_key = None; self.camera = None
+        self.full = True
+    def invalidate(self): self.full = True
+    def grid_lines(self, board):
+        key = (board.viewport.size, board.rows, board.cols, board.camera)
+        if self.lines_key != key:
+            self.lines = pygame.Surface(board.viewport.size, pygame.SRCALPHA)
+            draw_grid(self.lines, board)
+            self.lines_key = key
+        return self.lines
+    def frame(self, win, board, grid_pixels, rows, ui_h, toolbar, slider_rect, label_text, stats_lines=()):
+        lines = self.grid_lines(board)
+        ui_key = (label_text, stats_lines, rows, tuple((b.hover, b.active, b.text) for b,_ in toolbar))
+        if (self.full or board is not self.board or board.camera != self.camera
+                or win is not self.win or win.get_size()!=self.size):
+            win.fill(WHITE)
+            board.draw(win); board.dirty.clear()
+            win.blit(lines, (0,0))
+            draw_hud(win, grid_pixels, label_text, stats_lines)
+            draw_toolbar(win, grid_pixels, ui_h, toolbar, slider_rect, board.rows, board.cols)
+            pygame.display.update()
+            self.full = False; self.board = board; self.win = win; self.size = win.get_size(); self.ui_key = ui_key
+            self.camera = board.camera
+            return
+        rects = []
+        if len(board.dirty) > DIRTY_BATCH:
+            # many changed cells (a fast search, a big map): repaint their bounding box in one go
+            stride = board.grid.stride
+            r, c = np.divmod(np.fromiter(board.dirty, np.int64, len(board.dirty)), stride)
+            area = board.cell_rect(int(r.min()*stride + c.min())).union(board.cell_rect(int(r.max()*stride + c.max())))
+            area = board.draw(win, area)
+            win.blit(lines, area.topleft, area)
+            rects.append(area)
+        else:
+            for i in board.dirty:
+                if not board.visible(i): continue
+                rect = board.cell_rect(i)
+                board.draw_cell(win, i)
+                win.blit(lines, rect.topleft, rect)
+                rects.append(rect)
+        board.dirty.clear()
+        huds = hud_rects(grid_pixels)
+        ui_changed = ui_key != self.ui_key
+        if ui_changed or any(r.collidelist(huds) != -1 for r in rects):
+            for area in huds:
+                area = board.draw(win, area)
+                win.blit(lines, area.topleft, area)
+                rects.append(area)
+            draw_hud(win, grid_pixels, label_text, stats_lines)
+        if ui_changed:
+            draw_toolbar(win, grid_pixels, ui_h, toolbar, slider_rect, board.rows, board.cols)
+            rects.append(pygame.Rect(0, grid_pixels, grid_pixels, ui_h))
+            self.ui_key = ui_key
+        if rects: pygame.display.update(rects)
 
 # ---------- UI Button class ----------
 class Button:
@@ -262,147 +759,255 @@ class Button:
         bg = PURPLE if self.active else PANEL if not self.hover else (170,150,200)
         pygame.draw.rect(surf, bg, self.rect, border_radius=8)
         pygame.draw.rect(surf, BORDER, self.rect, 2, border_radius=8)
-        txt = FONT.render(f"{self.icon} {self.text}", True, BLACK if not self.active else WHITE)
+        label = f"{self.icon} {self.text}"
+        font = FONT if FONT.size(label)[0] <= self.rect.width - 8 else SMALL_FONT
+        txt = font.render(label, True, BLACK if not self.active else WHITE)
         surf.blit(txt, txt.get_rect(center=self.rect.center))
     def check_hover(self,pos): self.hover = self.rect.collidepoint(pos)
     def clicked(self): click_play()
 
+def set_speed_text(toolbar, speed):
+    for b,act in toolbar:
+        if act=="speed": b.text = speed_label(speed)
+
+def set_terrain_text(toolbar, brush):
+    name, cost, _ = TERRAINS[brush]
+    for b,act in toolbar:
+        if act=="terrain": b.text = f"{name} x{cost}"
+
+def set_pause_text(toolbar, paused):
+    for b,act in toolbar:
+        if act=="pause": b.text = "Resume" if paused else "Pause"
+
+def set_moves_text(toolbar, moves):
+    for b,act in toolbar:
+        if act=="moves": b.text = MOVES[moves][0]
+
 # ---------- UI: build bottom toolbar ----------
 def build_toolbar(grid_pixels, ui_h, rows):
     toolbar=[]
-    pad = 12; btn_w=110; btn_h=36
-    x = pad; y = grid_pixels + (ui_h - btn_h)//2
+    pad = 10; btn_h=34
     defs = [
         ("Start","🎯","start"),
         ("End","🏁","end"),
         ("Barrier","🧱","barrier"),
         ("Erase","🧼","erase"),
+        ("Agents","🤖","agents"),
+        (f"{TERRAINS[0][0]} x{TERRAINS[0][1]}","🟫","terrain"),
         ("A*","⭐","A*"),
         ("Dijkstra","🔷","Dijkstra"),
+        ("Dial","🪣","Dial"),
+        ("Flow","🌊","Flow"),
         ("BFS","🔶","BFS"),
         ("DFS","🔺","DFS"),
+        ("JPS","🦘","JPS"),
+        ("JPS+","⚡","JPS+"),
+        ("Bi-A*","🌟","Bi-A*"),
+        ("Bi-BFS","🔁","Bi-BFS"),
+        ("D* Lite","♻️","D* Lite"),
+        ("HPA*","🗺️","HPA*"),
         ("Run","▶️","run"),
+        ("Pause","⏸️","pause"),
+        (speed_label(SPEEDS[DEFAULT_SPEED]),"⏩","speed"),
+        (MOVES[0][0],"🧭","moves"),
         ("Clear","🔄","clear"),
         ("Fullscreen","⛶","fullscreen"),
     ]
-    for t,icon,action in defs:
-        b = Button((x,y,btn_w,btn_h), t, icon)
-        toolbar.append((b,action))
-        x += btn_w + pad
-        if x + btn_w > grid_pixels - pad:
-            x = pad
-            y += btn_h + 8
+    # two rows of equal-width buttons under the slider band
+    per_row = math.ceil(len(defs) / 2)
+    btn_w = (grid_pixels - pad*(per_row+1)) // per_row
+    y0 = grid_pixels + ui_h - 2*btn_h - 14
+    for k,(t,icon,action) in enumerate(defs):
+        x = pad + (k % per_row)*(btn_w + pad)
+        y = y0 + (k // per_row)*(btn_h + 6)
+        toolbar.append((Button((x,y,btn_w,btn_h), t, icon), action))
     # slider area on right: show label and bar
     slider_rect = pygame.Rect(grid_pixels - 240, grid_pixels + 8, 200, 20)
     return toolbar, slider_rect
 
 # ---------- helper ----------
-def get_cell_pos(mouse_pos, grid_pixels, rows):
+def get_cell_pos(mouse_pos, grid_pixels, board):
     x,y = mouse_pos
     if y >= grid_pixels: return None, None
-    gap = grid_pixels // rows
-    row = y // gap
-    col = x // gap
-    return row, col
+    return board.cell_at(x, y)
 
 # ---------- main ----------
-def main():
+def main(map_path=None):
     global WIN, GRID_PIXELS, UI_HEIGHT
     rows = DEFAULT_ROWS
     grid_pixels = GRID_PIXELS
     ui_h = UI_HEIGHT
-    grid = make_grid(rows, grid_pixels)
-    start = None
-    end = None
+    moves = 0   # index into MOVES
+    loaded = None   # map opened from the command line; kept across resizes until Clear
+    last_trace = None   # the last finished run's Trace, or one opened from the command line
+    alt_file = None   # (path, checksum, moves) of the landmark tables kept next to the opened map
+    if map_path:
+        if map_path.endswith(".pftrace"):
+            last_trace = load_trace(map_path)
+            loaded = last_trace.grid()
+        else:
+            loaded = open_map(map_path)
+            alt_file = (landmarks_path(map_path), layout_checksum(loaded), (loaded.connectivity, loaded.corner_cutting))
+        rows, moves = map_settings(loaded)
+    alt_on = loaded is not None and open_alt(loaded, alt_file)   # L: A* with landmark (ALT) bounds
+    grid = make_grid(rows, grid_pixels, moves, loaded)
     mode = "barrier"
     algo = "A*"
 
     toolbar, slider_rect = build_toolbar(grid_pixels, ui_h, rows)
+    set_moves_text(toolbar, moves)
 
     dragging_slider = False
-    run_in_progress = False
+    slider_source = None   # the board the slider drag started from; every density resamples it
+    panning = False   # middle or Shift+left drag moves the view
+    run = None
+    playback = None   # the multi-agent plan being played back, kept after it ends for the HUD
+    replay = TraceReplay(last_trace, grid) if last_trace is not None else None   # R: the last run again
+    paused = False    # P: hold the run, playback or replay where it is; N steps it while held
+    heat_job = None   # (board, (version, end), SearchWorker) building the heatmap's field
+    alt_job = None    # (board, SearchWorker) building the board's landmark tables
+    notice_until = 0  # "No Path Found!" stays over the board until then
+    notice_rect = None
+    speed_idx = DEFAULT_SPEED
+    brush = 0   # index into TERRAINS for the terrain paint mode
+    renderer = Renderer()
+    runs = []   # RunStats of every run this session, exported with J
+    heat_on = False   # H: show the end cell's distance field under the board
+    stats_lines = (); hud_at = 0; hud_final = None
+    status = None; status_until = 0   # a message shown instead of the label until then
+    step_once = False
 
     while True:
+        active = run.stats if run is not None else None
+        single = paused and step_once; step_once = False
+        finished = run is not None and (not paused or single) and run.advance(SPEEDS[speed_idx], single)
+        if playback is not None and playback.board is not grid: playback = stop(playback)
+        if playback is not None and not playback.done and (not paused or single):
+            playback.advance(SPEEDS[speed_idx], single)
+        if replay is not None and replay.board is not grid: replay = stop(replay)
+        if replay is not None and not replay.done and (not paused or single):
+            replay.advance(SPEEDS[speed_idx], single)
         mouse = pygame.mouse.get_pos()
         for b,_ in toolbar:
             b.check_hover(mouse)
 
-        # Draw main area
-        WIN.fill(WHITE)
-        # nodes
-        for row in grid:
-            for node in row: node.draw(WIN)
-        draw_grid(WIN, grid_pixels, rows)
-        # Title
-        t = TITLE_FONT.render("Pathfinding Visualizer", True, PURPLE)
-        WIN.blit(t, (grid_pixels//2 - t.get_width()//2, 8))
-        # top-left algorithm label
-        label = FONT.render(f"Algorithm: {algo}", True, BLACK)
-        WIN.blit(label, (8, 44))
-        # legend small
-        lx,ly = 8,70
-        pygame.draw.rect(WIN, PANEL, (lx-6, ly-6, 150, 170), border_radius=8)
-        pygame.draw.rect(WIN, BORDER, (lx-6, ly-6, 150, 170), 2, border_radius=8)
-        legend_items = [("Start",START_COLOR),("End",END_COLOR),("Barrier",BARRIER_COLOR),("Open Set",OPEN_COLOR),("Closed Set",CLOSED_COLOR),("Path",PATH_COLOR),("Empty",WHITE)]
-        for i,(lab,col) in enumerate(legend_items):
-            pygame.draw.rect(WIN, col, (lx, ly + i*24, 16,16))
-            pygame.draw.rect(WIN, BLACK, (lx, ly + i*24, 16,16),1)
-            WIN.blit(FONT.render(lab, True, BLACK), (lx+22, ly + i*24 -1))
-
-        # bottom toolbar background
-        pygame.draw.rect(WIN, PANEL, (0, grid_pixels, grid_pixels, ui_h))
-        pygame.draw.rect(WIN, BORDER, (0, grid_pixels, grid_pixels, ui_h), 2)
-
-        # draw toolbar buttons
-        for b,act in toolbar:
-            b.draw(WIN)
-
-        # draw slider
-        pygame.draw.rect(WIN, (230,230,230), slider_rect, border_radius=6)
-        pygame.draw.rect(WIN, BORDER, slider_rect, 2, border_radius=6)
-        # slider handle position based on rows
-        ratio = (rows - MIN_ROWS) / (MAX_ROWS - MIN_ROWS)
-        handle_x = int(slider_rect.x + 6 + ratio * (slider_rect.width - 12))
-        handle_rect = pygame.Rect(handle_x-6, slider_rect.y-6, 12, slider_rect.height+12)
-        pygame.draw.rect(WIN, PURPLE, handle_rect, border_radius=6)
-        WIN.blit(FONT.render(f"Grid: {rows} x {rows}", True, BLACK), (slider_rect.x - 110, slider_rect.y -2))
-
-        pygame.display.update()
+        heat_key = (grid.grid.version, grid.end)
+        if heat_on and grid.end and grid.heat_key != heat_key:
+            # (re)built after every edit while shown, on a worker; the field is cached for Flow runs too
+            if heat_job is None or heat_job[:2] != (grid, heat_key):
+                if heat_job is not None: heat_job[2].cancel()
+                heat_job = (grid, heat_key, SearchWorker(build_field(grid.grid, grid.end), SEARCH_LOCK, gate=IDLE))
+            elif heat_job[2].finished:
+                field = heat_job[2].result; heat_job = None
+                if field is not None and not field.stale:
+                    grid.show_heat(field); renderer.invalidate()
+        elif grid.heat is not None and not (heat_on and grid.end):
+            grid.show_heat(None); renderer.invalidate()
+        if alt_job is not None and (alt_job[0] is not grid or not alt_on):
+            alt_job[1].cancel(); alt_job = None
+        if alt_on and alt_job is None and attached_landmarks(grid.grid) is None:
+            # built again after every edit while on, like the heatmap; A* runs without them meanwhile
+            alt_job = (grid, SearchWorker(build_alt(grid.grid), SEARCH_LOCK, gate=IDLE))
+        elif alt_job is not None and alt_job[1].finished:
+            marks = alt_job[1].result; alt_job = None
+            if marks is not None and alt_file is not None and not marks.stale and \
+                    (marks.checksum, marks.layout) == alt_file[1:]:
+                marks.save(alt_file[0])
+                status = f"Saved {len(marks)} landmark tables to {os.path.basename(alt_file[0])}"
+                status_until = time.perf_counter() + STATUS_S
+        now = time.perf_counter()
+        if replay is not None:
+            stats_lines = replay.text()
+        elif playback is not None:
+            stats_lines = playback.text()
+        elif not runs:
+            stats_lines = ()
+        elif runs and (now - hud_at > HUD_REFRESH_S or run is None and hud_final is not runs[-1]):
+            stats_lines = stats_text(runs[-1]); hud_at = now
+            if run is None: hud_final = runs[-1]
+        label_text = (f"Algorithm: {algo}   Speed: {speed_label(SPEEDS[speed_idx])}   Zoom: {grid.zoom_text()}"
+                      + ("   ALT" + (" (building)" if alt_job else "") if alt_on else "")
+                      + ("   [paused]" if paused else ""))
+        if now < status_until: label_text = status
+        renderer.frame(WIN, grid, grid_pixels, rows, ui_h, toolbar, slider_rect, label_text, stats_lines)
+        if finished:
+            if not run.result.found:
+                notice_until = now + NOTICE_S; play_no_path_sound()
+            last_trace = run.trace
+            run = None
+        if notice_until:
+            # drawn over the board every frame until it times out, then the board is repainted
+            if now < notice_until:
+                if notice_rect:
+                    # fresh cells under it first, so the text is not blended onto itself
+                    area = grid.draw(WIN, notice_rect)
+                    WIN.blit(renderer.grid_lines(grid), area.topleft, area)
+                notice_rect = draw_no_path_message(WIN, grid_pixels)
+                pygame.display.update(notice_rect)
+            else:
+                notice_until = 0; notice_rect = None; renderer.invalidate()
+        if active: active.add("draw", time.perf_counter() - now)
 
         # Events
+        t_events = time.perf_counter()
         for event in pygame.event.get():
             if event.type==pygame.QUIT:
                 pygame.quit(); sys.exit()
 
+            if event.type==pygame.MOUSEWHEEL:
+                # zoom around the cell under the mouse
+                if grid.viewport.collidepoint(pygame.mouse.get_pos()):
+                    grid.zoom(event.y, pygame.mouse.get_pos())
+
             if event.type==pygame.MOUSEBUTTONDOWN:
-                if event.button==1:
+                if event.button==2 or event.button==1 and pygame.key.get_mods() & pygame.KMOD_SHIFT \
+                        and grid.viewport.collidepoint(event.pos):
+                    panning = True
+                elif event.button==1:
                     # check toolbar clicks
                     for b,act in toolbar:
                         if b.rect.collidepoint(event.pos):
                             b.clicked()
                             click_play()
                             # reset active flags for modes & algos
-                            if act in ("start","end","barrier","erase"):
+                            if act=="terrain" and mode=="terrain":
+                                # clicking the active terrain button cycles the brush
+                                brush = (brush + 1) % len(TERRAINS)
+                                set_terrain_text(toolbar, brush)
+                            if act in ("start","end","barrier","erase","terrain","agents"):
                                 mode = act
                                 for bb,_ in toolbar: bb.active=False
                                 b.active = True
-                            elif act in ("A*","Dijkstra","BFS","DFS"):
+                            elif act in STEPPERS:
                                 algo = act
                                 for bb,_ in toolbar: bb.active=False
                                 b.active = True
                             elif act == "run":
-                                # run algorithm if start and end exist
-                                if start and end:
-                                    # prepare neighbors
-                                    for r in grid:
-                                        for node in r: node.update_neighbors(grid)
-                                    # call selected algo
-                                    if algo=="A*": a_star(lambda: draw_frame(WIN, grid, grid_pixels, rows, toolbar, slider_rect, algo), grid, start, end)
-                                    elif algo=="Dijkstra": dijkstra(lambda: draw_frame(WIN, grid, grid_pixels, rows, toolbar, slider_rect, algo), grid, start, end)
-                                    elif algo=="BFS": bfs(lambda: draw_frame(WIN, grid, grid_pixels, rows, toolbar, slider_rect, algo), grid, start, end)
-                                    elif algo=="DFS": dfs(lambda: draw_frame(WIN, grid, grid_pixels, rows, toolbar, slider_rect, algo), grid, start, end)
+                                # agents, if any, are planned together; else run algorithm if start and end exist
+                                run = stop(run); playback = stop(playback); replay = stop(replay); paused = False
+                                set_pause_text(toolbar, paused)
+                                if grid.agents:
+                                    playback = AgentPlayback(grid)
+                                elif grid.start and grid.end:
+                                    run = SearchRun(algo, grid); runs.append(run.stats)
+                            elif act=="pause":
+                                paused = not paused
+                                set_pause_text(toolbar, paused)
+                            elif act=="speed":
+                                speed_idx = (speed_idx + 1) % len(SPEEDS)
+                                set_speed_text(toolbar, SPEEDS[speed_idx])
+                            elif act=="moves":
+                                # switch movement rules on the current board
+                                run = stop(run); playback = stop(playback); replay = stop(replay)
+                                moves = (moves + 1) % len(MOVES)
+                                _, connectivity, corner_cutting = MOVES[moves]
+                                grid.grid.set_connectivity(connectivity, corner_cutting)
+                                grid.clear_overlay()
+                                set_moves_text(toolbar, moves)
                             elif act=="clear":
-                                start=None; end=None; grid = make_grid(rows, grid_pixels)
+                                run = stop(run); playback = stop(playback); replay = stop(replay)
+                                loaded = None; rows = min(rows, MAX_ROWS)
+                                grid = make_grid(rows, grid_pixels, moves)
                             elif act=="fullscreen":
                                 # toggle fullscreen: rebuild display and grid size
                                 # if currently windowed => go fullscreen
@@ -417,67 +1022,62 @@ def main():
                                 ui_h = UI
                                 GRID_PIXELS_local = grid_pixels
                                 # rebuild grid with same rows but adapt cell sizes
-                                grid = make_grid(rows, grid_pixels)
+                                run = stop(run); playback = stop(playback); replay = stop(replay)
+                                grid = make_grid(rows, grid_pixels, moves, loaded)
                                 # reposition toolbar & slider
                                 toolbar, slider_rect = build_toolbar(grid_pixels, ui_h, rows)
+                                set_speed_text(toolbar, SPEEDS[speed_idx])
+                                set_terrain_text(toolbar, brush)
+                                set_moves_text(toolbar, moves)
+                                set_pause_text(toolbar, paused)
                             break
                     else:
                         # not toolbar: handle grid placement
-                        r,c = get_cell_pos(event.pos, grid_pixels, rows)
+                        r,c = get_cell_pos(event.pos, grid_pixels, grid)
                         if r is not None:
-                            node = grid[r][c]
-                            if mode=="start":
-                                if start: start.reset()
-                                start = node; start.make_start()
-                            elif mode=="end":
-                                if end: end.reset()
-                                end=node; end.make_end()
-                            elif mode=="barrier":
-                                if node!=start and node!=end: node.make_barrier()
-                            elif mode=="erase":
-                                if node==start: start=None
-                                if node==end: end=None
-                                node.reset()
+                            run = stop(run); playback = stop(playback); replay = stop(replay)
+                            grid.place(mode, (r,c), TERRAINS[brush][1])
                 elif event.button==3:
                     # right-click = erase
-                    r,c = get_cell_pos(event.pos, grid_pixels, rows)
+                    r,c = get_cell_pos(event.pos, grid_pixels, grid)
                     if r is not None:
-                        node = grid[r][c]
-                        if node==start: start=None
-                        if node==end: end=None
-                        node.reset()
+                        run = stop(run); playback = stop(playback); replay = stop(replay)
+                        grid.erase((r,c))
 
             if event.type==pygame.MOUSEBUTTONUP:
-                dragging_slider = False
+                dragging_slider = False; slider_source = None
+                panning = False
 
             if event.type==pygame.MOUSEMOTION:
-                if pygame.mouse.get_pressed()[0]:
+                if panning:
+                    grid.pan(*event.rel)
+                elif pygame.mouse.get_pressed()[0]:
                     # drawing while dragging
                     mx,my = event.pos
-                    r,c = get_cell_pos((mx,my), grid_pixels, rows)
-                    if r is not None:
-                        node = grid[r][c]
-                        if mode=="barrier":
-                            if node!=start and node!=end: node.make_barrier()
-                        elif mode=="erase":
-                            if node==start: start=None
-                            if node==end: end=None
-                            node.reset()
+                    r,c = get_cell_pos((mx,my), grid_pixels, grid)
+                    if r is not None and mode in ("barrier","erase","terrain","agents"):
+                        run = stop(run); playback = stop(playback); replay = stop(replay)
+                        grid.place(mode, (r,c), TERRAINS[brush][1])
                 # slider drag start if clicking handle area
                 if event.buttons[0]:
                     if slider_rect.collidepoint(event.pos):
                         dragging_slider = True
+                        if slider_source is None: slider_source = grid
                 if dragging_slider:
                     # compute new rows from mouse x inside slider_rect
                     mx = event.pos[0]
                     rel = max(0, min(1, (mx - slider_rect.x) / slider_rect.width))
-                    new_rows = int(MIN_ROWS + rel * (MAX_ROWS - MIN_ROWS))
+                    new_rows = slider_rows(rel)
                     if new_rows != rows:
                         rows = new_rows
-                        grid = make_grid(rows, grid_pixels)
-                        start=None; end=None
+                        run = stop(run); playback = stop(playback); replay = stop(replay); loaded = None
+                        grid = resample_board(slider_source, rows, grid_pixels, moves)
                         # rebuild toolbar positions to fit new width
                         toolbar, slider_rect = build_toolbar(grid_pixels, ui_h, rows)
+                        set_speed_text(toolbar, SPEEDS[speed_idx])
+                        set_terrain_text(toolbar, brush)
+                        set_moves_text(toolbar, moves)
+                        set_pause_text(toolbar, paused)
 
             if event.type==pygame.KEYDOWN:
                 if event.key==pygame.K_ESCAPE:
@@ -486,8 +1086,13 @@ def main():
                         GRID, UI = compute_grid_pixels(fullscreen=False)
                         WIN = pygame.display.set_mode((GRID, GRID + UI))
                         grid_pixels = GRID; ui_h = UI
-                        grid = make_grid(rows, grid_pixels)
+                        run = stop(run); playback = stop(playback); replay = stop(replay)
+                        grid = make_grid(rows, grid_pixels, moves, loaded)
                         toolbar, slider_rect = build_toolbar(grid_pixels, ui_h, rows)
+                        set_speed_text(toolbar, SPEEDS[speed_idx])
+                        set_terrain_text(toolbar, brush)
+                        set_moves_text(toolbar, moves)
+                        set_pause_text(toolbar, paused)
                     else:
                         pygame.quit(); sys.exit()
                 if event.key==pygame.K_F11:
@@ -499,60 +1104,97 @@ def main():
                         GRID, UI = compute_grid_pixels(fullscreen=True)
                         WIN = pygame.display.set_mode((GRID, GRID + UI), pygame.FULLSCREEN)
                     grid_pixels = GRID; ui_h = UI
-                    grid = make_grid(rows, grid_pixels)
+                    run = stop(run); playback = stop(playback); replay = stop(replay)
+                    grid = make_grid(rows, grid_pixels, moves, loaded)
                     toolbar, slider_rect = build_toolbar(grid_pixels, ui_h, rows)
+                    set_speed_text(toolbar, SPEEDS[speed_idx])
+                    set_terrain_text(toolbar, brush)
+                    set_moves_text(toolbar, moves)
+                    set_pause_text(toolbar, paused)
 
                 # keyboard alternatives kept
-                if event.key==pygame.K_1:
-                    algo="A*"
-                    for b,act in toolbar:
-                        b.active = (act=="A*")
-                if event.key==pygame.K_2:
-                    algo="Dijkstra"
+                if pygame.K_0 <= event.key <= pygame.K_9 and (event.key - pygame.K_1) % 10 < len(ALGORITHM_KEYS):
+                    algo = ALGORITHM_KEYS[(event.key - pygame.K_1) % 10]
                     for b,act in toolbar:
-                        b.active = (act=="Dijkstra")
-                if event.key==pygame.K_3:
-                    algo="BFS"
-                    for b,act in toolbar:
-                        b.active = (act=="BFS")
-                if event.key==pygame.K_4:
-                    algo="DFS"
-                    for b,act in toolbar:
-                        b.active = (act=="DFS")
+                        b.active = (act==algo)
                 if event.key==pygame.K_SPACE:
-                    if start and end:
-                        for r in grid:
-                            for n in r: n.update_neighbors(grid)
-                        if algo=="A*": a_star(lambda: draw_frame(WIN, grid, grid_pixels, rows, toolbar, slider_rect, algo), grid, start, end)
-                        elif algo=="Dijkstra": dijkstra(lambda: draw_frame(WIN, grid, grid_pixels, rows, toolbar, slider_rect, algo), grid, start, end)
-                        elif algo=="BFS": bfs(lambda: draw_frame(WIN, grid, grid_pixels, rows, toolbar, slider_rect, algo), grid, start, end)
-                        elif algo=="DFS": dfs(lambda: draw_frame(WIN, grid, grid_pixels, rows, toolbar, slider_rect, algo), grid, start, end)
+                    run = stop(run); playback = stop(playback); replay = stop(replay); paused = False
+                    set_pause_text(toolbar, paused)
+                    if grid.agents:
+                        playback = AgentPlayback(grid)
+                    elif grid.start and grid.end:
+                        run = SearchRun(algo, grid); runs.append(run.stats)
+                if event.key==pygame.K_p:
+                    paused = not paused
+                    set_pause_text(toolbar, paused)
+                if event.key==pygame.K_n:
+                    step_once = True
+                if event.key==pygame.K_r and last_trace is not None:
+                    # replay the last run from its trace, on its own map if this board changed since
+                    run = stop(run); playback = stop(playback); replay = stop(replay)
+                    if not last_trace.matches(grid.grid):
+                        loaded = last_trace.grid(); rows, moves = map_settings(loaded)
+                        grid = make_grid(rows, grid_pixels, moves, loaded)
+                        toolbar, slider_rect = build_toolbar(grid_pixels, ui_h, rows)
+                        set_speed_text(toolbar, SPEEDS[speed_idx])
+                        set_terrain_text(toolbar, brush)
+                        set_moves_text(toolbar, moves)
+                        set_pause_text(toolbar, paused)
+                    replay = TraceReplay(last_trace, grid)
+                if event.key==pygame.K_s and last_trace is not None:
+                    last_trace.save(TRACE_FILE)
+                    status, status_until = f"Saved {len(last_trace)} events to {TRACE_FILE}", time.perf_counter() + STATUS_S
+                if replay is not None:
+                    # scrub the replay: Shift+Left/Right move by single events
+                    shift = event.mod & pygame.KMOD_SHIFT
+                    if event.key in (pygame.K_LEFT, pygame.K_RIGHT):
+                        sign = 1 if event.key==pygame.K_RIGHT else -1
+                        if shift: replay.seek(replay.pos + sign)
+                        else: replay.scrub(sign / SCRUB_STEPS)
+                    if event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                        replay.scrub((1 if event.key==pygame.K_PAGEDOWN else -1) * 10 / SCRUB_STEPS)
+                    if event.key==pygame.K_HOME: replay.seek(0)
+                    if event.key==pygame.K_END: replay.seek(len(replay.trace))
+                if event.key==pygame.K_x:
+                    # cancel the search or agent plan in progress
+                    run = stop(run); playback = stop(playback); replay = stop(replay)
+                if event.key==pygame.K_g:
+                    run = stop(run); playback = stop(playback); replay = stop(replay)
+                    grid.scatter_agents(AGENT_BATCH)
+                if event.key==pygame.K_h:
+                    heat_on = not heat_on
+                if event.key==pygame.K_l:
+                    # A* with landmark bounds: the opened map's saved tables if they fit, else built
+                    alt_on = not alt_on
+                    if not alt_on: detach_landmarks(grid.grid)
+                    elif grid.grid is loaded: open_alt(loaded, alt_file)
+                if event.key==pygame.K_f:
+                    grid.fit()   # zoom back out to the whole map
+                if event.key==pygame.K_j and runs:
+                    export_json(runs, STATS_FILE)
+                    status, status_until = f"Saved stats of {len(runs)} runs to {STATS_FILE}", time.perf_counter() + STATUS_S
+                # speed: +/- step through SPEEDS, the last one is instant
+                if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                    speed_idx = min(speed_idx + 1, len(SPEEDS) - 1)
+                    set_speed_text(toolbar, SPEEDS[speed_idx])
+                if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    speed_idx = max(speed_idx - 1, 0)
+                    set_speed_text(toolbar, SPEEDS[speed_idx])
+        if active: active.add("events", time.perf_counter() - t_events)
 
+        IDLE.set()
         CLOCK.tick(60)
+        IDLE.clear()
 
-# small helper used by algos to redraw while running
-def draw_frame(win, grid, grid_pixels, rows, toolbar, slider_rect, algo_name):
-    # draw nodes and UI minimal to keep animation visible
-    win.fill(WHITE)
-    for row in grid:
-        for node in row: node.draw(win)
-    draw_grid(win, grid_pixels, rows)
-    t = TITLE_FONT.render("Pathfinding Visualizer", True, PURPLE)
-    win.blit(t, (grid_pixels//2 - t.get_width()//2, 8))
-    lbl = FONT.render(f"Algorithm: {algo_name}", True, BLACK)
-    win.blit(lbl, (8,44))
-    # draw bottom panel (simple)
-    pygame.draw.rect(win, PANEL, (0, grid_pixels, grid_pixels, slider_rect.height + 48))
-    for b,_ in toolbar: b.draw(win)
-    pygame.display.update()
-    CLOCK.tick(120)
-
-def draw_no_path_message():
+def draw_no_path_message(win, grid_pixels):
+    # paints the notice (no display update) and returns the area it covers
     text = TITLE_FONT.render("No Path Found!", True, (255, 50, 50))
     sub = FONT.render("Try clearing some barriers and run again.", True, (80, 0, 0))
-    WIN.blit(text, (GRID_PIXELS // 2 - text.get_width() // 2, GRID_PIXELS // 2 - 20))
-    WIN.blit(sub, (GRID_PIXELS // 2 - sub.get_width() // 2, GRID_PIXELS // 2 + 20))
-    pygame.display.update()
+    r1 = win.blit(text, (grid_pixels // 2 - text.get_width() // 2, grid_pixels // 2 - 20))
+    r2 = win.blit(sub, (grid_pixels // 2 - sub.get_width() // 2, grid_pixels // 2 + 20))
+    return r1.union(r2)
+
+def play_no_path_sound():
     if AUDIO:
         try:
             freq = 400
@@ -568,8 +1210,8 @@ def draw_no_path_message():
             snd.play()
         except:
             pass
-    pygame.time.delay(2000)  # pause 2 seconds to let the user see it
 
 
 if __name__ == "__main__":
-    main()
+    # optional map to open: a Moving AI .map or a native .grid file, or a .pftrace to replay
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
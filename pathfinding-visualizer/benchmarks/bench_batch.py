@@ -0,0 +1,33 @@
+"""Batch throughput against worker count over one shared grid.
+
+    python benchmarks/bench_batch.py --scenario cave --size 512 --queries 2000 --workers 1 2 4 8
+"""
+import argparse, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pathfinding_core import ALGORITHMS, SCENARIOS, random_queries, solve_batch
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scenario", default="cave", choices=list(SCENARIOS))
+    ap.add_argument("--size", type=int, default=512)
+    ap.add_argument("--algorithm", default="A*", choices=list(ALGORITHMS))
+    ap.add_argument("--queries", type=int, default=2000)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    grid = SCENARIOS[args.scenario](args.size, seed=args.seed)
+    queries = random_queries(grid, args.queries, seed=args.seed)
+    base = None
+    print(f"{'workers':>8} {'seconds':>8} {'queries/s':>10} {'scaling':>8}")
+    for w in sorted(set(args.workers)):
+        t = time.perf_counter()
+        for _ in solve_batch(grid, queries, args.algorithm, workers=w, paths=False): pass
+        dt = time.perf_counter() - t
+        base = base or dt
+        print(f"{w:>8} {dt:>8.2f} {len(queries)/dt:>10.0f} {base/dt:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Before/after timing of the heapq engine against the old PriorityQueue searches.
+
+    python benchmarks/bench_engine.py --sizes 80 200 400 --density 0.25 --queries 5
+
+The "before" functions below are the A*/Dijkstra loops as they were prior to
+the heapq rewrite (thread-safe PriorityQueue, dict state, no stale skipping),
+kept here only as a baseline.
+"""
+import argparse, os, sys, time
+from queue import PriorityQueue
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pathfinding_core import BLOCKED, a_star, dijkstra, random_obstacles
+
+
+def legacy_a_star(grid, start, end):
+    cells = memoryview(grid.cells); offsets = grid.offsets.tolist(); stride = grid.stride
+    s, e = grid.index(start), grid.index(end)
+    er, ec = divmod(e, stride)
+    count = 0
+    open_set = PriorityQueue(); open_set.put((0, count, s))
+    came_from = {}; g_score = {s: 0}; open_hash = {s}
+    while not open_set.empty():
+        current = open_set.get()[2]
+        open_hash.remove(current)
+        if current == e: return g_score[e]
+        for o in offsets:
+            neighbor = current + o
+            if cells[neighbor] & BLOCKED: continue
+            temp_g = g_score[current] + 1
+            if temp_g < g_score.get(neighbor, float('inf')):
+                came_from[neighbor] = current; g_score[neighbor] = temp_g
+                if neighbor not in open_hash:
+                    nr, nc = divmod(neighbor, stride)
+                    count += 1
+                    open_set.put((temp_g + abs(nr - er) + abs(nc - ec), count, neighbor))
+                    open_hash.add(neighbor)
+    return None
+
+
+def legacy_dijkstra(grid, start, end):
+    cells = memoryview(grid.cells); offsets = grid.offsets.tolist()
+    s, e = grid.index(start), grid.index(end)
+    pq = PriorityQueue(); pq.put((0, s))
+    dist = {s: 0}; came_from = {}
+    while not pq.empty():
+        current = pq.get()[1]
+        if current == e: return dist[e]
+        for o in offsets:
+            neighbor = current + o
+            if cells[neighbor] & BLOCKED: continue
+            temp = dist[current] + 1
+            if temp < dist.get(neighbor, float('inf')):
+                came_from[neighbor] = current; dist[neighbor] = temp
+                pq.put((temp, neighbor))
+    return None
+
+
+def timed(fn, grid, queries):
+    t = time.perf_counter()
+    for a, b in queries: fn(grid, a, b)
+    return (time.perf_counter() - t) / len(queries)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[80, 200, 400])
+    ap.add_argument("--density", type=float, default=0.25)
+    ap.add_argument("--queries", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args(argv)
+    pairs = (("A*", legacy_a_star, a_star), ("Dijkstra", legacy_dijkstra, dijkstra))
+    print(f"{'size':>6} {'algorithm':>10} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        grid = random_obstacles(size, seed=args.seed, density=args.density)   # the maps run_benchmarks uses
+        rng = np.random.default_rng(args.seed)
+        free = np.flatnonzero(~grid.barriers.reshape(-1))
+        picks = rng.choice(free, size=(args.queries, 2))
+        queries = [(divmod(int(a), size), divmod(int(b), size)) for a, b in picks]
+        for name, before, after in pairs:
+            tb, ta = timed(before, grid, queries), timed(after, grid, queries)
+            print(f"{size:>6} {name:>10} {tb*1e3:>10.2f} {ta*1e3:>10.2f} {tb/ta:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
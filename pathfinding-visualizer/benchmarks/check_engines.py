@@ -0,0 +1,119 @@
+"""Correctness check: every engine against BFS and Dijkstra on seeded random maps.
+
+    python benchmarks/check_engines.py --maps 300 --queries 5
+
+Each map gets a random shape -- including narrow (16 columns or fewer) and
+tall ones, whose cluster layout differs from square maps -- random barriers,
+and on every other map random cell costs. Every engine must find a path
+exactly when BFS does, and the ones that return shortest paths on that grid
+(``is_optimal``) must match the shortest cost: Dijkstra's for the ones that
+charge ``grid.costs`` (``is_weighted``), BFS's step count for the rest. A
+stretch of each such path is then looked up through a ``PathCache``, in both
+directions, and must cost the same as a fresh search. Queries from and to a
+barrier cell must find no path, and all engines but the flow field must turn
+them away without searching. Exits 1 on any mismatch.
+"""
+import argparse, os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from pathfinding_core import ALGORITHMS, STEPPERS, PathCache, run_steps, is_optimal, is_weighted, random_obstacles, random_queries
+
+CONNECTIVITY = {"4": (4, True), "8": (8, True), "8-no-corner": (8, False)}
+SHAPES = ((4, 40), (2, 16), (17, 64))   # (smallest, largest) side, drawn per map
+MAX_COST = 4                            # costs on weighted maps are drawn from 1..MAX_COST
+TOLERANCE = 1e-9
+
+
+def random_shape(rng):
+    narrow, wide = rng.integers(*SHAPES[rng.integers(len(SHAPES))], size=2)
+    return (int(wide), int(narrow)) if rng.random() < 0.5 else (int(narrow), int(wide))
+
+
+def shortest(grid, name, start, end):
+    """The cost ``name`` must match between two cells, and the engine it comes from."""
+    reference = "Dijkstra" if is_weighted(name, grid) else "BFS"
+    return ALGORITHMS[reference](grid, start, end).cost, reference
+
+
+def check_slices(grid, name, start, end, result):
+    """Mismatch messages for the cache's slices of ``result``, forward and reversed."""
+    problems = []
+    cache = PathCache()
+    cache.put(grid, name, start, end, result)
+    n = len(result.path)
+    a, b = result.path[n // 3], result.path[2 * n // 3]
+    for p, q in ((a, b), (b, a)):
+        hit = cache.get(grid, name, p, q)
+        if hit is None: continue   # reversed stretches are not reused on weighted 8-connected grids
+        expected, reference = shortest(grid, name, p, q)
+        if abs(hit.cost - expected) > TOLERANCE:
+            problems.append(f"{name}: cached slice {p}->{q} costs {hit.cost}, {reference} {expected}")
+    return problems
+
+
+def check_map(grid, queries):
+    """Mismatch messages for every engine on ``queries``; empty if all agree."""
+    problems = []
+    for start, end in queries:
+        steps = ALGORITHMS["BFS"](grid, start, end)
+        for name, fn in ALGORITHMS.items():
+            result = fn(grid, start, end)
+            if result.found != steps.found:
+                problems.append(f"{name}: found={result.found}, BFS found={steps.found} for {start}->{end}")
+                continue
+            if not steps.found or not is_optimal(name, grid): continue
+            expected, reference = shortest(grid, name, start, end)
+            if abs(result.cost - expected) > TOLERANCE:
+                problems.append(f"{name}: cost {result.cost}, {reference} {expected} for {start}->{end}")
+            else:
+                problems += check_slices(grid, name, start, end, result)
+    return problems
+
+
+def check_blocked(grid, rng):
+    """Mismatch messages for every engine queried from and to a random barrier cell."""
+    walls, free = np.argwhere(grid.barriers), np.argwhere(~grid.barriers)
+    if not len(walls) or not len(free): return []
+    wall = tuple(map(int, walls[rng.integers(len(walls))]))
+    cell = tuple(map(int, free[rng.integers(len(free))]))
+    problems = []
+    for start, end in ((wall, cell), (cell, wall)):
+        for name, steps in STEPPERS.items():
+            result = run_steps(steps(grid, start, end), lambda kind, i: None)
+            if result.found:
+                problems.append(f"{name}: found a path {start}->{end} with a barrier endpoint")
+            elif name != "Flow" and result.stats.get("unreachable") != "components":
+                problems.append(f"{name}: searched {start}->{end} instead of rejecting it")
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--maps", type=int, default=300)
+    ap.add_argument("--queries", type=int, default=5, help="queries per map")
+    ap.add_argument("--connectivity", nargs="+", default=list(CONNECTIVITY), choices=list(CONNECTIVITY))
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    rng = np.random.default_rng(args.seed)
+    failures = 0
+    for k in range(args.maps):
+        rows, cols = random_shape(rng)
+        grid = random_obstacles(rows, cols, seed=args.seed + k, density=float(rng.uniform(0.1, 0.4)))
+        grid.set_connectivity(*CONNECTIVITY[args.connectivity[k % len(args.connectivity)]])
+        if k % 2:
+            grid.interior(grid.costs)[:] = rng.integers(1, MAX_COST + 1, size=(rows, cols))
+            grid.changed()
+        problems = check_map(grid, random_queries(grid, args.queries, seed=args.seed + k))
+        problems += check_blocked(grid, rng)
+        for p in problems:
+            print(f"map {k} ({rows}x{cols}, {grid.connectivity}-connected"
+                  f"{', weighted' if grid.weighted else ''}): {p}")
+        failures += bool(problems)
+    print(f"{args.maps - failures}/{args.maps} maps agree")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Headless benchmark suite: every engine over seeded scenarios, reported as JSON or CSV.
+
+    python benchmarks/run_benchmarks.py --scenarios random maze rooms cave \\
+        --sizes 20 40 80 256 1024 --queries 10 --format json --output results.json
+
+    # 8-connected movement, with and without cutting corners past barriers
+    python benchmarks/run_benchmarks.py --connectivity 4 8 8-no-corner
+
+    # Moving AI benchmark maps; queries come from foo.map.scen next to foo.map if present
+    python benchmarks/run_benchmarks.py --maps maps/den312d.map --connectivity 8-no-corner
+
+    # fail (exit 1) if anything got more than 25% slower than a saved run
+    python benchmarks/run_benchmarks.py --compare results.json --tolerance 0.25
+
+Only the headless ``pathfinding_core`` package is imported, so no display is
+needed. Each (scenario, size, algorithm) cell runs in a fresh process by
+default so its peak RSS is its own; ``--no-isolate`` runs everything inline.
+"""
+import argparse, csv, io, json, os, platform, sys, time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")   # in case anything pulls in pygame
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from pathfinding_core import ALGORITHMS
+from pathfinding_core.scenarios import SCENARIOS, random_queries
+from pathfinding_core.maps import open_map, read_scen
+
+CONNECTIVITY = {"4": (4, True), "8": (8, True), "8-no-corner": (8, False)}
+
+FIELDS = ["scenario", "size", "connectivity", "seed", "algorithm", "queries", "found", "mean_cost",
+          "warmup_ms", "wall_ms", "mean_ms", "expanded", "expansions_per_sec", "peak_open",
+          "rss_base_kb", "peak_rss_kb"]
+
+
+def _rss_kb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_cell(scenario, size, algorithm, queries, seed, min_distance, connectivity="4"):
+    """Build one scenario (or load a map file), run one algorithm over its queries, return a result row.
+
+    ``min_distance`` is a fraction of the size; for a map file ``size`` is ignored
+    and reported as its larger side.
+    """
+    if scenario in SCENARIOS:
+        grid = SCENARIOS[scenario](size, seed=seed)
+    else:
+        grid = open_map(scenario)
+        size = max(grid.rows, grid.cols)
+    grid.set_connectivity(*CONNECTIVITY[connectivity])
+    if os.path.exists(scenario + ".scen"):
+        pairs = [(q.start, q.end) for q in read_scen(scenario + ".scen")[:queries]]
+    else:
+        pairs = random_queries(grid, queries, seed=seed, min_distance=int(min_distance * size))
+    fn = ALGORITHMS[algorithm]
+    # one untimed pass first, so per-grid caches (search state, JPS+ tables) are built
+    t0 = time.perf_counter()
+    if pairs: fn(grid, *pairs[0])
+    warmup = time.perf_counter() - t0
+    rss_base = _rss_kb()
+    found = expanded = peak_open = 0
+    costs = []
+    t0 = time.perf_counter()
+    for start, end in pairs:
+        result = fn(grid, start, end)
+        expanded += result.stats.get("expanded", 0)
+        peak_open = max(peak_open, result.stats.get("peak_open", 0))
+        if result.found:
+            found += 1; costs.append(result.cost)
+    wall = time.perf_counter() - t0
+    return {"scenario": scenario, "size": size, "connectivity": connectivity, "seed": seed, "algorithm": algorithm,
+            "queries": len(pairs), "found": found,
+            "mean_cost": round(float(np.mean(costs)), 3) if costs else None,
+            "warmup_ms": round(warmup * 1e3, 3), "wall_ms": round(wall * 1e3, 3),
+            "mean_ms": round(wall * 1e3 / len(pairs), 3) if pairs else None,
+            "expanded": expanded,
+            "expansions_per_sec": round(expanded / wall) if wall > 0 else None,
+            "peak_open": peak_open, "rss_base_kb": rss_base, "peak_rss_kb": _rss_kb()}
+
+
+def run_suite(cells, isolate=True):
+    """Run ``(scenario, size, algorithm, queries, seed, min_distance, connectivity)`` cells, yielding rows in order."""
+    if not isolate:
+        for cell in cells: yield run_cell(*cell)
+        return
+    ctx = multiprocessing.get_context("spawn")
+    for cell in cells:
+        # a fresh interpreter per cell keeps each peak RSS independent
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            yield pool.submit(run_cell, *cell).result()
+
+
+def to_csv(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def compare(rows, baseline_rows, tolerance):
+    """Rows whose mean time regressed by more than ``tolerance`` against the baseline."""
+    key = lambda r: (r["scenario"], r["size"], r.get("connectivity", "4"), r["seed"], r["algorithm"])
+    base = {key(r): r for r in baseline_rows}
+    slower = []
+    for row in rows:
+        old = base.get(key(row))
+        if old and old["mean_ms"] and row["mean_ms"] and row["mean_ms"] > old["mean_ms"] * (1 + tolerance):
+            slower.append((row, old))
+    return slower
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20, 40, 80, 256])
+    ap.add_argument("--maps", nargs="+", default=[],
+                    help="map files (Moving AI .map or native .grid) to run in addition to the scenarios")
+    ap.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    ap.add_argument("--connectivity", nargs="+", default=["4"], choices=list(CONNECTIVITY))
+    ap.add_argument("--queries", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--min-distance", type=float, default=0.5,
+                    help="minimum Manhattan distance between endpoints, as a fraction of the size")
+    ap.add_argument("--format", choices=("json", "csv"), default="json")
+    ap.add_argument("--output", help="write results here instead of stdout")
+    ap.add_argument("--no-isolate", action="store_true", help="run every cell in this process")
+    ap.add_argument("--compare", help="earlier JSON results to check for regressions")
+    ap.add_argument("--tolerance", type=float, default=0.2)
+    args = ap.parse_args(argv)
+
+    cells = [(sc, size, algo, args.queries, args.seed, args.min_distance, conn)
+             for sc in args.scenarios for size in args.sizes for conn in args.connectivity
+             for algo in args.algorithms]
+    cells += [(path, None, algo, args.queries, args.seed, args.min_distance, conn)
+              for path in args.maps for conn in args.connectivity for algo in args.algorithms]
+    rows = []
+    for row in run_suite(cells, isolate=not args.no_isolate):
+        rows.append(row)
+        print(f"{os.path.basename(row['scenario']):>7} {row['size']:>6} {row['connectivity']:>11} {row['algorithm']:>9}  "
+              f"{row['mean_ms']} ms/query  {row['expansions_per_sec']} exp/s  "
+              f"peak open {row['peak_open']}  rss {row['peak_rss_kb']} kB", file=sys.stderr)
+
+    if args.format == "json":
+        text = json.dumps({"meta": {"python": platform.python_version(), "numpy": np.__version__,
+                                    "platform": platform.platform(), "args": vars(args),
+                                    "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                           "results": rows}, indent=2)
+    else:
+        text = to_csv(rows)
+    if args.output:
+        with open(args.output, "w", newline="") as f: f.write(text)
+    else:
+        sys.stdout.write(text)
+
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)["results"]
+        slower = compare(rows, baseline, args.tolerance)
+        for row, old in slower:
+            print(f"REGRESSION {row['scenario']} {row['size']} {row['algorithm']}: "
+                  f"{old['mean_ms']} -> {row['mean_ms']} ms/query", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Headless pathfinding core. Importing this package never touches pygame."""
+from .grid import Grid, DIRECTIONS, DIAGONALS, BARRIER, BORDER, BLOCKED
+from .state import SearchState, search_state
+from .components import ComponentIndex, component_index, connected, label_components
+from .search import (SearchResult, h, octile, heuristic, reconstruct_path, run_steps,
+                     a_star, dijkstra, dial, bfs, dfs,
+                     a_star_steps, dijkstra_steps, dial_steps, bfs_steps, dfs_steps,
+                     OPEN, CLOSED, PATH, OPEN_BACK, CLOSED_BACK)
+from .jps import jps, jps_plus, jps_steps, jps_plus_steps, build_jump_tables, jump_tables
+from .bidirectional import (bidirectional_a_star, bidirectional_bfs,
+                            bidirectional_a_star_steps, bidirectional_bfs_steps)
+from .incremental import DStarLite, incremental_planner, d_star_lite, d_star_lite_steps
+from .hierarchical import ClusterGraph, cluster_graph, hpa_star, hpa_star_steps
+from .fields import FlowField, distance_field, flow_field, flow_field_path, flow_field_steps
+from .landmarks import (Landmarks, landmarks, build_landmarks, attached_landmarks, detach_landmarks,
+                        save_landmarks, load_landmarks, landmarks_path)
+from .multiagent import (ReservationTable, MultiAgentResult, WindowedPlanner, whca_star, whca_star_steps,
+                         random_agents, find_conflicts)
+from .worker import SearchWorker
+from .trace import Trace, record_run, load_trace
+from .scenarios import SCENARIOS, random_obstacles, maze, rooms, cave, terrain, random_queries
+from .batch import BatchItem, solve_batch
+from .algorithms import ALGORITHMS, STEPPERS, OPTIMAL, WEIGHTED, is_optimal, is_weighted
+from .cache import PathCache, path_cache
+from .profiling import RunStats, profile_run, export_json
+from .maps import Scenario, read_map, write_map, read_scen, write_scen, save_grid, load_grid, open_map
+
+__all__ = ["Grid", "DIRECTIONS", "DIAGONALS", "BARRIER", "BORDER", "BLOCKED",
+           "SearchState", "search_state", "ComponentIndex", "component_index", "connected", "label_components",
+           "SearchResult", "h", "octile", "heuristic",
+           "reconstruct_path", "run_steps",
+           "a_star", "dijkstra", "dial", "bfs", "dfs",
+           "a_star_steps", "dijkstra_steps", "dial_steps", "bfs_steps", "dfs_steps",
+           "jps", "jps_plus", "jps_steps", "jps_plus_steps", "build_jump_tables", "jump_tables",
+           "bidirectional_a_star", "bidirectional_bfs",
+           "bidirectional_a_star_steps", "bidirectional_bfs_steps",
+           "DStarLite", "incremental_planner", "d_star_lite", "d_star_lite_steps",
+           "ClusterGraph", "cluster_graph", "hpa_star", "hpa_star_steps",
+           "FlowField", "distance_field", "flow_field", "flow_field_path", "flow_field_steps",
+           "Landmarks", "landmarks", "build_landmarks", "attached_landmarks", "detach_landmarks",
+           "save_landmarks", "load_landmarks", "landmarks_path",
+           "ReservationTable", "MultiAgentResult", "WindowedPlanner", "whca_star", "whca_star_steps",
+           "random_agents", "find_conflicts", "SearchWorker", "Trace", "record_run", "load_trace",
+           "SCENARIOS", "random_obstacles", "maze", "rooms", "cave", "terrain", "random_queries",
+           "BatchItem", "solve_batch",
+           "ALGORITHMS", "STEPPERS", "OPTIMAL", "WEIGHTED", "is_optimal", "is_weighted", "PathCache", "path_cache",
+           "RunStats", "profile_run", "export_json",
+           "Scenario", "read_map", "write_map", "read_scen", "write_scen", "save_grid", "load_grid", "open_map",
+           "OPEN", "CLOSED", "PATH", "OPEN_BACK", "CLOSED_BACK"]
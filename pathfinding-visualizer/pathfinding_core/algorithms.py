@@ -0,0 +1,38 @@
+"""Name -> function registries for every engine, as shown in the visualizer."""
+from .search import (a_star, dijkstra, dial, bfs, dfs,
+                     a_star_steps, dijkstra_steps, dial_steps, bfs_steps, dfs_steps)
+from .jps import jps, jps_plus, jps_steps, jps_plus_steps
+from .bidirectional import bidirectional_a_star, bidirectional_bfs, bidirectional_a_star_steps, bidirectional_bfs_steps
+from .incremental import d_star_lite, d_star_lite_steps
+from .hierarchical import hpa_star, hpa_star_steps
+from .fields import flow_field_path, flow_field_steps
+
+ALGORITHMS = {"A*": a_star, "Dijkstra": dijkstra, "BFS": bfs, "DFS": dfs,
+              "JPS": jps, "JPS+": jps_plus,
+              "Bi-A*": bidirectional_a_star, "Bi-BFS": bidirectional_bfs,
+              "D* Lite": d_star_lite, "HPA*": hpa_star,
+              "Dial": dial, "Flow": flow_field_path}
+STEPPERS = {"A*": a_star_steps, "Dijkstra": dijkstra_steps, "BFS": bfs_steps, "DFS": dfs_steps,
+            "JPS": jps_steps, "JPS+": jps_plus_steps,
+            "Bi-A*": bidirectional_a_star_steps, "Bi-BFS": bidirectional_bfs_steps,
+            "D* Lite": d_star_lite_steps, "HPA*": hpa_star_steps,
+            "Dial": dial_steps, "Flow": flow_field_steps}
+# these always return shortest paths, so any stretch of one is a shortest path too
+OPTIMAL = {"A*", "Dijkstra", "Dial", "Flow", "BFS", "JPS", "JPS+", "Bi-A*", "Bi-BFS", "D* Lite"}
+# these charge grid.costs per step; the rest count steps
+WEIGHTED = {"A*", "Dijkstra", "Dial", "Flow", "Bi-A*", "D* Lite"}
+# 4-connected techniques: on any other grid they run A* instead
+A_STAR_FALLBACK = {"JPS", "JPS+", "HPA*"}
+
+
+def is_weighted(algorithm, grid):
+    """True if ``algorithm`` charges ``grid.costs`` per step on ``grid``, False if it counts steps."""
+    return algorithm in WEIGHTED or (algorithm in A_STAR_FALLBACK and grid.connectivity != 4)
+
+
+def is_optimal(algorithm, grid):
+    """True if ``algorithm`` returns shortest paths on ``grid``, so any stretch of one is shortest too."""
+    if algorithm in A_STAR_FALLBACK and grid.connectivity != 4: return True
+    # JPS jumps over cells as if they all cost the same: on a weighted grid it only counts steps
+    if algorithm in ("JPS", "JPS+") and grid.weighted: return False
+    return algorithm in OPTIMAL
@@ -0,0 +1,112 @@
+"""Answer many (start, end) queries against one barrier layout on a process pool.
+
+The grid's ``cells`` and ``costs`` are copied once into a
+``multiprocessing.shared_memory`` block; every worker wraps that block in a ``Grid`` without copying, so tasks
+only carry the query pairs. Results stream back as workers finish them::
+
+    for item in solve_batch(grid, pairs, "A*", workers=8):
+        print(item.index, item.result.cost, item.result.stats["ms"])
+
+Queries are sent in chunks; per-grid caches (search state, JPS+ tables, the
+result cache) are built once per worker and reused for every query it answers,
+so repeated queries -- or ones lying on an earlier shortest path -- are not
+searched again. Queries whose endpoints lie in different components (see
+``components.py``) are answered in the calling process before any pool
+starts, whatever the algorithm, so unreachable pairs cost a lookup each.
+"""
+import os, time
+from dataclasses import dataclass
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+
+from .algorithms import ALGORITHMS
+from .cache import path_cache
+from .components import component_index
+from .grid import Grid
+from .search import SearchResult, _unreachable
+
+_worker = {}
+
+
+@dataclass
+class BatchItem:
+    index: int          # position in the submitted query list
+    start: tuple
+    end: tuple
+    result: SearchResult
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        # older versions register the block again, with the same tracker the parent
+        # uses (pool workers inherit it), so the parent's unlink still cleans it up
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(name, rows, cols, connectivity, algorithm, paths, cache):
+    shm = _attach(name)
+    size = (rows + 2) * (cols + 2)
+    cells = np.ndarray((size,), dtype=np.uint8, buffer=shm.buf)
+    costs = np.ndarray((size,), dtype=np.uint8, buffer=shm.buf, offset=size)
+    grid = Grid(rows, cols, cells=cells, costs=costs)
+    grid.set_connectivity(*connectivity)
+    _worker.update(shm=shm, grid=grid, algorithm=algorithm, paths=paths, cache=cache)
+
+
+def _solve(grid, algorithm, paths, cache, chunk):
+    fn, cached = ALGORITHMS[algorithm], path_cache(grid) if cache else None
+    components = component_index(grid)
+    out = []
+    for index, start, end in chunk:
+        t = time.perf_counter()
+        if components.separated(grid.index(start), grid.index(end)):
+            result = _unreachable()
+        else:
+            result = cached.solve(grid, algorithm, start, end) if cached else fn(grid, start, end)
+        result.stats["ms"] = (time.perf_counter() - t) * 1e3
+        result.stats["worker"] = os.getpid()
+        if not paths: result.path = result.path[:1] + result.path[-1:] if result.path else []
+        out.append((index, start, end, result))
+    return out
+
+
+def _solve_chunk(chunk):
+    return _solve(_worker["grid"], _worker["algorithm"], _worker["paths"], _worker["cache"], chunk)
+
+
+def solve_batch(grid, queries, algorithm="A*", workers=None, chunksize=None, paths=True, cache=True):
+    """Yield a ``BatchItem`` per query, in completion order.
+
+    ``workers`` defaults to the CPU count; ``workers=1`` answers inline with no
+    pool. With ``paths=False`` only the endpoints of each path are sent back,
+    which saves pickling on long paths when only costs and stats are needed.
+    ``cache=False`` searches every query even if it was answered before.
+    """
+    queries = [(i, tuple(a), tuple(b)) for i, (a, b) in enumerate(queries)]
+    components = component_index(grid)
+    split = {False: [], True: []}
+    for q in queries: split[components.separated(grid.index(q[1]), grid.index(q[2]))].append(q)
+    for item in _solve(grid, algorithm, paths, cache, split[True]): yield BatchItem(*item)
+    queries = split[False]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(queries) <= 1:
+        for item in _solve(grid, algorithm, paths, cache, queries): yield BatchItem(*item)
+        return
+    chunksize = chunksize or max(1, min(256, len(queries) // (workers * 8)))
+    chunks = [queries[k:k + chunksize] for k in range(0, len(queries), chunksize)]
+    size = grid.cells.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=2 * size)
+    try:
+        shm.buf[:size] = grid.cells.tobytes()
+        shm.buf[size:2 * size] = grid.costs.tobytes()
+        connectivity = (grid.connectivity, grid.corner_cutting)
+        init = (shm.name, grid.rows, grid.cols, connectivity, algorithm, paths, cache)
+        with Pool(workers, _init_worker, init) as pool:
+            for done in pool.imap_unordered(_solve_chunk, chunks):
+                for item in done: yield BatchItem(*item)
+    finally:
+        shm.close()
+        shm.unlink()
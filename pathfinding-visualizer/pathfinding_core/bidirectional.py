@@ -0,0 +1,139 @@
+"""Bidirectional BFS and A*: search from ``start`` and ``end`` at once.
+
+The forward side uses search-state slot 0 and reports ``"open"``/``"closed"``
+events; the backward side uses slot 1 and reports ``"open_back"``/
+``"closed_back"``, so a front end can color the two frontiers apart.
+
+Bidirectional BFS expands whole levels, always from the smaller frontier,
+and stops after the level in which the frontiers first touch; the best
+connecting edge seen in that level is a shortest path. Bidirectional A* runs
+forward A* towards ``end`` and backward A* towards ``start``, keeps the best
+meeting cost ``mu`` found so far, and stops once either open set's smallest
+``f`` reaches ``mu`` -- no unexpanded path can beat it after that.
+
+Bidirectional A* honors ``grid.costs`` and diagonal moves: forward steps pay
+for the cell they enter, backward steps for the cell they leave, so both
+sides measure the same edges. Bidirectional BFS counts steps.
+"""
+import heapq
+
+from .grid import BLOCKED
+from .search import (SearchResult, OPEN, CLOSED, PATH, OPEN_BACK, CLOSED_BACK, DIAGONAL_SAVING,
+                     heuristic, reconstruct_path, run_steps, _stats, _plain, _unreachable)
+from .components import component_index
+from .state import search_state
+
+INF = float('inf')
+
+
+def _join(grid, parent_f, parent_b, s, e, meet_f, meet_b, cost, stats, trace):
+    # start .. meet_f from the forward tree, then meet_b .. end from the backward tree
+    path = reconstruct_path(parent_f, s, meet_f)
+    back = reconstruct_path(parent_b, e, meet_b)
+    path.extend(reversed(back if meet_b != meet_f else back[:-1]))
+    if trace:
+        for i in reversed(path[1:-1]): yield PATH, i
+    return SearchResult([grid.pos(i) for i in path], _plain(cost), stats)
+
+
+def bidirectional_bfs_steps(grid, start, end, trace=True):
+    cells = memoryview(grid.cells); moves = grid.moves
+    s, e = grid.index(start), grid.index(end)
+    # also rejects a barrier endpoint: a side seeded inside a wall would still meet the other
+    if component_index(grid).separated(s, e): return _unreachable()
+    if s == e: return SearchResult([start], 0, _stats(0, 0, 0, 0, 0))
+    sides = []
+    for slot, root in ((0, s), (1, e)):
+        gen, seen, _, dist, parent = search_state(grid, slot).begin()
+        seen[root] = gen; dist[root] = 0; parent[root] = root
+        sides.append([[root], gen, seen, dist, parent])
+    best, meet = INF, None
+    expanded = pops = stale = 0; pushes = peak = 2
+    while sides[0][0] and sides[1][0] and meet is None:
+        forward = len(sides[0][0]) <= len(sides[1][0])
+        (frontier, gen, seen, dist, parent), (_, ogen, oseen, odist, _) = sides if forward else sides[::-1]
+        opened, closed_kind = (OPEN, CLOSED) if forward else (OPEN_BACK, CLOSED_BACK)
+        level = []
+        for u in frontier:
+            pops += 1; expanded += 1
+            du = dist[u] + 1
+            for o, _, ga, gb in moves:
+                v = u + o
+                if cells[v] & BLOCKED: continue
+                if ga and (cells[u + ga] | cells[u + gb]) & BLOCKED: continue
+                if oseen[v] == ogen and du + odist[v] < best:
+                    best = du + odist[v]
+                    meet = (u, v) if forward else (v, u)
+                if seen[v] == gen: continue
+                seen[v] = gen; dist[v] = du; parent[v] = u
+                level.append(v)
+                pushes += 1
+                if trace: yield opened, v
+            if trace and u != s and u != e: yield closed_kind, u
+        sides[0 if forward else 1][0] = level
+        if len(sides[0][0]) + len(sides[1][0]) > peak: peak = len(sides[0][0]) + len(sides[1][0])
+    stats = _stats(expanded, pushes, pops, stale, peak)
+    if meet is None: return SearchResult(stats=stats)
+    return (yield from _join(grid, sides[0][4], sides[1][4], s, e, meet[0], meet[1], best, stats, trace))
+
+
+def bidirectional_a_star_steps(grid, start, end, trace=True):
+    cells = memoryview(grid.cells); costs = memoryview(grid.costs); moves = grid.moves
+    stride = grid.stride
+    saving = DIAGONAL_SAVING if grid.connectivity == 8 else 0
+    s, e = grid.index(start), grid.index(end)
+    # also rejects a barrier endpoint: a side seeded inside a wall would still meet the other
+    if component_index(grid).separated(s, e): return _unreachable()
+    if s == e: return SearchResult([start], 0, _stats(0, 0, 0, 0, 0))
+    h0 = heuristic(grid)(start, end)
+    sides = []
+    for slot, root, target in ((0, s, e), (1, e, s)):
+        gen, seen, closed, g, parent = search_state(grid, slot).begin()
+        seen[root] = gen; g[root] = 0; parent[root] = root
+        sides.append(([(h0, h0, 0, root)], gen, seen, closed, g, parent, divmod(target, stride)))
+    push, pop = heapq.heappush, heapq.heappop
+    best, meet = INF, -1
+    count = 0
+    expanded = pops = stale = 0; pushes = peak = 2
+    fwd, bwd = sides
+    while fwd[0] and bwd[0]:
+        if fwd[0][0][0] >= best or bwd[0][0][0] >= best: break
+        if len(fwd[0]) + len(bwd[0]) > peak: peak = len(fwd[0]) + len(bwd[0])
+        forward = len(fwd[0]) <= len(bwd[0])
+        (heap, gen, seen, closed, g, parent, (tr, tc)), (_, ogen, oseen, _, og, _, _) = (fwd, bwd) if forward else (bwd, fwd)
+        u = pop(heap)[3]
+        pops += 1
+        if closed[u] == gen:
+            stale += 1
+            continue
+        closed[u] = gen
+        expanded += 1
+        gu, leave = g[u], costs[u]
+        for o, w, ga, gb in moves:
+            v = u + o
+            if cells[v] & BLOCKED or closed[v] == gen: continue
+            if ga and (cells[u + ga] | cells[u + gb]) & BLOCKED: continue
+            temp_g = gu + (costs[v] if forward else leave) * w
+            if seen[v] != gen or temp_g < g[v]:
+                seen[v] = gen; g[v] = temp_g; parent[v] = u
+                vr, vc = divmod(v, stride)
+                dr, dc = abs(vr - tr), abs(vc - tc)
+                hv = dr + dc - saving * (dr if dr < dc else dc)
+                count += 1
+                push(heap, (temp_g + hv, hv, count, v))
+                pushes += 1
+                if oseen[v] == ogen and temp_g + og[v] < best:
+                    best, meet = temp_g + og[v], v
+                if trace: yield (OPEN if forward else OPEN_BACK), v
+        if trace and u != s and u != e: yield (CLOSED if forward else CLOSED_BACK), u
+    stats = _stats(expanded, pushes, pops, stale, peak)
+    if meet < 0: return SearchResult(stats=stats)
+    return (yield from _join(grid, fwd[5], bwd[5], s, e, meet, meet, best, stats, trace))
+
+
+def bidirectional_bfs(grid, start, end, on_event=None):
+    return run_steps(bidirectional_bfs_steps(grid, start, end, on_event is not None), on_event)
+
+
+def bidirectional_a_star(grid, start, end, on_event=None):
+    return run_steps(bidirectional_a_star_steps(grid, start, end, on_event is not None), on_event)
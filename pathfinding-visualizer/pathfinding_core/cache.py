@@ -0,0 +1,109 @@
+"""Memoized query results, keyed on ``(grid version, algorithm, start, end)``.
+
+Any barrier or cost edit bumps ``Grid.version`` (clearing a cell that is
+already free does not, so placing the start or end keeps the cache), so a
+cached result can only be served for the exact layout it was computed on;
+the first lookup after an edit drops everything older. Entries are evicted least recently used first.
+
+For algorithms that return shortest paths (``is_optimal``), every stretch of a
+cached path is itself a shortest path, so a query whose endpoints both lie
+on one -- in either order -- is answered by slicing it. (Reversing is safe
+with per-cell costs on a 4-connected grid: both directions of any path differ
+by the same ``cost(end) - cost(start)``. Diagonal steps cost ``sqrt(2)`` times
+the cell they enter, which breaks that, so weighted 8-connected grids only
+reuse stretches in the cached direction.)
+"""
+from collections import OrderedDict
+
+from .algorithms import ALGORITHMS, is_optimal, is_weighted
+from .search import SearchResult
+
+DEFAULT_CAPACITY = 256
+
+
+class PathCache:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.entries = OrderedDict()   # key -> (result, {cell: position on its path})
+        self.on_path = {}              # (algorithm, cell) -> keys of optimal paths through it
+        self.version = None
+        self.hits = self.subpath_hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self):
+        return {"hits": self.hits, "subpath_hits": self.subpath_hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self.entries)}
+
+    def clear(self):
+        self.entries.clear()
+        self.on_path.clear()
+
+    def _sync(self, grid):
+        if self.version != grid.version:
+            self.clear()
+            self.version = grid.version
+
+    def get(self, grid, algorithm, start, end):
+        """A copy of the cached result for this query, or ``None``."""
+        self._sync(grid)
+        start, end = tuple(start), tuple(end)
+        key = (grid.version, algorithm, start, end)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            result = entry[0]
+            return SearchResult(list(result.path), result.cost, {"cache": "hit"})
+        if is_optimal(algorithm, grid):
+            weighted = is_weighted(algorithm, grid)
+            for other in self.on_path.get((algorithm, start), ()):
+                result, positions = self.entries[other]
+                j = positions.get(end)
+                if j is None: continue
+                i = positions[start]
+                if i > j and weighted and grid.weighted and grid.connectivity != 4: continue
+                self.entries.move_to_end(other)
+                self.subpath_hits += 1
+                path = result.path[i:j + 1] if i <= j else result.path[j:i + 1][::-1]
+                cost = grid.path_cost(path) if weighted else len(path) - 1
+                return SearchResult(path, cost, {"cache": "subpath"})
+        self.misses += 1
+        return None
+
+    def put(self, grid, algorithm, start, end, result):
+        self._sync(grid)
+        start, end = tuple(start), tuple(end)
+        key = (grid.version, algorithm, start, end)
+        if key in self.entries: self._drop(key)
+        stored = SearchResult(list(result.path), result.cost, dict(result.stats))
+        positions = None
+        if is_optimal(algorithm, grid) and stored.found:
+            positions = {p: k for k, p in enumerate(stored.path)}
+            for p in positions: self.on_path.setdefault((algorithm, p), set()).add(key)
+        self.entries[key] = (stored, positions)
+        while len(self.entries) > self.capacity:
+            self._drop(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _drop(self, key):
+        _, positions = self.entries.pop(key)
+        for p in positions or ():
+            keys = self.on_path[(key[1], p)]
+            keys.discard(key)
+            if not keys: del self.on_path[(key[1], p)]
+
+    def solve(self, grid, algorithm, start, end):
+        """The cached answer if there is one, otherwise run ``algorithm`` and remember it."""
+        result = self.get(grid, algorithm, start, end)
+        if result is None:
+            result = ALGORITHMS[algorithm](grid, start, end)
+            self.put(grid, algorithm, start, end, result)
+        return result
+
+
+def path_cache(grid, capacity=DEFAULT_CAPACITY):
+    """The grid's result cache, created on first use."""
+    cache = getattr(grid, "_path_cache", None)
+    if cache is None:
+        cache = grid._path_cache = PathCache(capacity)
+    return cache
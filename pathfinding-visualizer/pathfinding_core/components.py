@@ -0,0 +1,202 @@
+"""Connected components of the free cells, for rejecting unreachable queries up front.
+
+A search whose end lies in another region than its start can only fail after
+expanding everything it can reach. ``connected(grid, start, end)`` answers
+that in O(1) from a per-cell component label, so the engines skip such
+queries (``stats["unreachable"] == "components"``). Blocked cells are label
+0, reachable from nowhere, so a query from or to a barrier is one of them.
+
+The labels are built with whole-array numpy operations, a row at a time
+rather than a cell at a time: every run of free cells in a row is a node,
+runs touching in neighboring rows (also diagonally on an 8-connected grid
+with corner cutting) are joined, and the run graph's components come from
+repeatedly hooking each larger label onto the smaller and halving pointer
+chains until nothing changes.
+
+Like the other per-grid caches the index is rebuilt lazily, but after small
+edits it is updated in place instead, by diffing the blocked bits against its
+snapshot:
+
+- a freed cell joins its neighbors' components, merged in a union-find over
+  the labels;
+- a new barrier can only split its own component. Flood fills start from
+  each free neighbor together, one cell each in turn, and merge when they
+  meet. A fill that runs dry without meeting the rest has walled off a
+  region, which gets a fresh label. This costs about the size of the smaller
+  side; if it passes ``SPLIT_BUDGET`` cells, or more than ``MAX_EDITS`` cells
+  changed, the labels are rebuilt from scratch.
+"""
+from collections import deque
+
+import numpy as np
+
+from .grid import BLOCKED
+
+MAX_EDITS = 256             # changed cells handled in place; more trigger a full relabel
+SPLIT_BUDGET = 1 << 14      # cells a split check may visit before giving up and relabeling
+
+
+def label_components(grid):
+    """``(labels, count)``: a component number (1..count) per free cell, 0 for blocked ones."""
+    free = (grid.cells & BLOCKED) == 0
+    # runs [start, end) of free cells, row by row (the border ends every row's last run)
+    starts = np.flatnonzero(free[1:] > free[:-1]) + 1
+    ends = np.flatnonzero(free[1:] < free[:-1]) + 1
+    n = len(starts)
+    labels = np.zeros(grid.size, dtype=np.int32)
+    if not n: return labels, 0
+    # the runs of the row above that each run touches, as a contiguous range in run order
+    reach = 1 if grid.connectivity == 8 and grid.corner_cutting else 0
+    lo = np.searchsorted(ends, starts - grid.stride - reach, "right")
+    hi = np.searchsorted(starts, ends - grid.stride + reach, "left")
+    counts = np.maximum(hi - lo, 0)
+    src = np.repeat(np.arange(n), counts)
+    dst = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    root = np.arange(n)
+    while True:
+        a, b = root[src], root[dst]
+        differ = a != b
+        if not differ.any(): break
+        a, b = a[differ], b[differ]
+        np.minimum.at(root, np.maximum(a, b), np.minimum(a, b))   # hook the larger root onto the smaller
+        while True:
+            jumped = root[root]
+            if np.array_equal(jumped, root): break
+            root = jumped
+    _, component = np.unique(root, return_inverse=True)
+    labels[free] = np.repeat(component.astype(np.int32) + 1, ends - starts)
+    return labels, int(component.max()) + 1
+
+
+class ComponentIndex:
+    def __init__(self, grid):
+        self.grid = grid
+        self.version = self.layout = None
+        self.relabels = self.merges = self.splits = 0
+
+    def _relabel(self):
+        grid = self.grid
+        self.labels, count = label_components(grid)
+        self.parent = list(range(count + 1))   # union-find over labels; 0 stays "blocked"
+        self.relabels += 1
+
+    def sync(self):
+        """Bring the labels up to date with the grid's barriers and connectivity."""
+        grid = self.grid
+        if self.version == grid.version: return
+        blocked = grid.cells & BLOCKED
+        layout = (grid.connectivity, grid.corner_cutting)
+        changed = np.flatnonzero(blocked != self.snapshot) if self.layout == layout else None
+        if changed is None or len(changed) > MAX_EDITS:
+            self._relabel()
+        elif len(changed):
+            self._update(changed.tolist())
+        self.snapshot, self.version, self.layout = blocked, grid.version, layout
+
+    def _update(self, changed):
+        cells, labels, parent = self.grid.cells, self.labels, self.parent
+        walls = [i for i in changed if cells[i] & BLOCKED]
+        freed = [i for i in changed if not cells[i] & BLOCKED]
+        for i in walls: labels[i] = 0
+        for i in freed:
+            labels[i] = len(parent); parent.append(len(parent))
+        # without corner cutting a freed cell also opens the diagonals it guards
+        guarded = self.grid.connectivity == 8 and not self.grid.corner_cutting
+        for i in freed:
+            for u in [i] + ([i + o for o, _, _, _ in self.grid.moves[:4]] if guarded else []):
+                if not labels[u]: continue
+                for n in self._neighbors(u): self._union(labels[u], labels[n])
+        # a new barrier can only split its own component: check each touched component
+        # once, starting a fill from every free cell around its new barriers
+        seeds = {}
+        for i in walls:
+            for o, _, _, _ in self.grid.moves:
+                if labels[i + o]: seeds.setdefault(self.find(labels[i + o]), set()).add(i + o)
+        for group in seeds.values():
+            if len(group) > 1 and not self._split(group):
+                self._relabel()
+                return
+
+    def _union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+            self.merges += 1
+
+    def _neighbors(self, u):
+        cells = self.grid.cells
+        for o, _, ga, gb in self.grid.moves:
+            n = u + o
+            if not (cells[n] | cells[u + ga] | cells[u + gb]) & BLOCKED:
+                yield n
+
+    def _split(self, seeds):
+        """Relabel whatever got walled off from the rest of ``seeds``' component; False if
+        that took more than ``SPLIT_BUDGET`` cells to find out."""
+        owner = {s: k for k, s in enumerate(seeds)}   # cell -> the fill that reached it first
+        group = list(range(len(seeds)))                # fill -> the fill it merged into
+        queues = {k: deque([s]) for k, s in enumerate(seeds)}   # live fills' frontiers
+
+        def find(k):
+            while group[k] != k: k = group[k]
+            return k
+
+        visited = len(owner)
+        while len(queues) > 1:
+            for k in list(queues):
+                if k not in queues: continue
+                queue = queues[k]
+                if not queue:
+                    # this fill ran dry without meeting the others: a region of its own
+                    del queues[k]
+                    label = len(self.parent); self.parent.append(label)
+                    for cell, j in owner.items():
+                        if find(j) == k: self.labels[cell] = label
+                    self.splits += 1
+                    continue
+                u = queue.popleft()
+                for n in self._neighbors(u):
+                    j = owner.get(n)
+                    if j is None:
+                        owner[n] = k; queue.append(n)
+                        visited += 1
+                    elif find(j) != k:
+                        # two fills met: one region so far, carried on by the bigger frontier
+                        j = find(j)
+                        keep, drop = (k, j) if len(queue) >= len(queues[j]) else (j, k)
+                        group[drop] = keep
+                        queues[keep].extend(queues.pop(drop))
+                        k, queue = keep, queues[keep]
+                if visited > SPLIT_BUDGET: return False
+        return True
+
+    def find(self, label):
+        parent = self.parent
+        root = label
+        while parent[root] != root: root = parent[root]
+        while parent[label] != root: parent[label], label = root, parent[label]
+        return root
+
+    def component(self, i):
+        """The component of flat index ``i``, 0 if it is blocked."""
+        return self.find(self.labels[i]) if self.labels[i] else 0
+
+    def separated(self, s, e):
+        """True if no path joins flat indices ``s`` and ``e``: either is blocked, or they
+        are in different components."""
+        a, b = self.labels[s], self.labels[e]
+        return not (a and b) or self.find(a) != self.find(b)
+
+
+def component_index(grid):
+    """The grid's component index, brought up to date."""
+    index = getattr(grid, "_components", None)
+    if index is None:
+        index = grid._components = ComponentIndex(grid)
+    index.sync()
+    return index
+
+
+def connected(grid, start, end):
+    """False if no path can join ``start`` and ``end``, including when either is a barrier."""
+    return not component_index(grid).separated(grid.index(start), grid.index(end))
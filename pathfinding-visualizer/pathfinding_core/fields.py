@@ -0,0 +1,160 @@
+"""Distance-to-goal fields and flow fields, built with whole-array numpy operations.
+
+Instead of one search per agent, ``flow_field(grid, goal)`` computes what
+every cell's shortest path to ``goal`` costs and which move starts it. The
+distance field grows out from the goal one wave at a time, Dijkstra-style
+but a whole bucket per step: the wave is every pending cell whose tentative
+distance lies within the cheapest step cost of the smallest one. No step can
+improve a cell that close to the minimum, so those distances are final; the
+wave relaxes all its neighbors at once with array operations
+(``np.minimum.at`` resolves several offers for one cell) and the cells that
+improved join the pending set. Every cell is expanded once, and on a uniform
+4-connected grid the waves are exactly the levels of breadth-first search.
+The result is exact under the grid's costs and connectivity.
+
+``distance_field(grid, goal, steps=True)`` counts moves instead of costs
+(every move, diagonal or not, is one step), which is what the multi-agent
+planner uses as its time-to-goal heuristic.
+
+The flow field then picks, per cell, the move toward the neighbor that
+realizes its distance, so the path from any start is read off in
+O(path length) with no search. Fields are cached on the grid per goal and
+dropped as soon as the grid changes.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from .grid import BLOCKED
+from .search import SearchResult, CLOSED, PATH, run_steps, _stats, _plain
+
+INF = float('inf')
+MAX_FIELDS = 8            # fields kept per grid, least recently used dropped first
+FLOW_CHUNK = 1 << 20      # cells per block when choosing flow directions, bounds the temporaries
+
+
+def distance_field(grid, goal, steps=False):
+    """``(distance, stats)``: a layer with every cell's cost to ``goal`` (inf if unreachable).
+
+    With ``steps=True`` every move costs 1, whatever the cell or direction.
+    """
+    dist = grid.new_layer(np.float64, INF)
+    goal = grid.index(goal)
+    if grid.cells[goal] & BLOCKED: return dist, _stats(0, 0, 0, 0, 0)
+    free = (grid.cells & BLOCKED) == 0
+    costs = np.ones(grid.size) if steps else grid.costs.astype(np.float64)
+    dist[goal] = 0
+    delta = float(costs[free].min())   # the cheapest step there is
+    pending = np.array([goal], dtype=np.int64)
+    waves = relaxed = improved = peak = 0
+    while pending.size:
+        d = dist[pending]
+        take = d < d.min() + delta
+        wave, pending = pending[take], pending[~take]
+        waves += 1; relaxed += wave.size
+        if pending.size + wave.size > peak: peak = pending.size + wave.size
+        step = dist[wave]; enter = costs[wave]
+        cells, offers = [], []
+        for o, w, ga, gb in grid.moves:
+            # u moves into the wave cell n = u + o, paying n's cost
+            u = wave - o
+            ok = free[u]
+            if ga: ok &= free[u + ga] & free[u + gb]
+            cells.append(u[ok]); offers.append((step + enter * (1 if steps else w))[ok])
+        cells, offers = np.concatenate(cells), np.concatenate(offers)
+        better = offers < dist[cells]
+        cells, offers = cells[better], offers[better]
+        improved += cells.size
+        np.minimum.at(dist, cells, offers)
+        pending = np.union1d(pending, cells)
+    reached = int(np.isfinite(dist).sum())
+    return dist, {"waves": waves, **_stats(relaxed, improved, relaxed, relaxed - reached, peak),
+                  "reached": reached}
+
+
+class FlowField:
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = grid.index(goal)
+        self.version = grid.version
+        # cost from each cell to the goal, and the index into grid.moves of its first step (-1: none)
+        self.distance, self.stats = distance_field(grid, goal)
+        self.direction = grid.new_layer(np.int8, -1)
+        if self.stats["expanded"]:
+            self._directions()
+
+    def _directions(self):
+        grid, dist = self.grid, self.distance
+        free = (grid.cells & BLOCKED) == 0
+        costs = grid.costs.astype(np.float64)
+        cells = np.flatnonzero(np.isfinite(dist))
+        cells = cells[cells != self.goal]
+        for k0 in range(0, cells.size, FLOW_CHUNK):
+            u = cells[k0:k0 + FLOW_CHUNK]
+            best = np.full(u.size, INF); choice = np.full(u.size, -1, dtype=np.int8)
+            for k, (o, w, ga, gb) in enumerate(grid.moves):
+                n = u + o
+                offer = dist[n] + costs[n] * w
+                ok = free[n]
+                if ga: ok &= free[u + ga] & free[u + gb]
+                take = ok & (offer < best)
+                best[take] = offer[take]; choice[take] = k
+            self.direction[u] = choice
+
+    @property
+    def stale(self): return self.version != self.grid.version
+
+    def cost(self, start):
+        return _plain(self.distance[self.grid.index(start)])
+
+    def path(self, start):
+        """Flat indices from ``start`` to the goal along the flow, or [] if the goal is unreachable."""
+        i = self.grid.index(start)
+        if self.distance[i] == INF: return []
+        offsets, direction = self.grid.offsets.tolist(), self.direction
+        path = [i]
+        while i != self.goal:
+            i += offsets[direction[i]]
+            path.append(i)
+        return path
+
+
+def flow_field(grid, goal):
+    """The grid's flow field toward ``goal``, built on first use and after any grid change."""
+    fields = getattr(grid, "_flow_fields", None)
+    if fields is None:
+        fields = grid._flow_fields = OrderedDict()
+    key = grid.index(goal)
+    field = fields.get(key)
+    if field is None or field.stale:
+        field = fields[key] = FlowField(grid, goal)
+    fields.move_to_end(key)
+    for k in [k for k, f in fields.items() if f.stale]: del fields[k]
+    while len(fields) > MAX_FIELDS: fields.popitem(last=False)
+    return field
+
+
+def flow_field_steps(grid, start, end, trace=True):
+    fields = getattr(grid, "_flow_fields", None) or {}
+    old = fields.get(grid.index(end))
+    field = flow_field(grid, end)
+    built = field is not old
+    stats = dict(field.stats) if built else _stats(0, 0, 0, 0, 0)
+    stats["field"] = "built" if built else "cached"
+    s = grid.index(start)
+    if grid.cells[s] & BLOCKED: return SearchResult(stats=stats)
+    path = field.path(start)
+    if trace:
+        if built:
+            # the field is built in one go; replay it as a wavefront, nearest cells first
+            dist = field.distance
+            reached = np.flatnonzero(np.isfinite(dist))
+            for i in reached[np.argsort(dist[reached], kind="stable")].tolist():
+                if i != field.goal: yield CLOSED, i
+        for i in reversed(path[1:-1]): yield PATH, i
+    if not path: return SearchResult(stats=stats)
+    return SearchResult([grid.pos(i) for i in path], field.cost(start), stats)
+
+
+def flow_field_path(grid, start, end, on_event=None):
+    return run_steps(flow_field_steps(grid, start, end, on_event is not None), on_event)
@@ -0,0 +1,172 @@
+"""Grid model used by the solvers. Knows nothing about colors or pygame.
+
+The map is one flat ``uint8`` array with a one-cell blocked border around it,
+so a neighbor is always ``i + offset`` and never needs a bounds check. Cells
+are addressed by int32 flat indices; ``index``/``pos`` convert to and from
+``(row, col)``.
+
+``costs`` is a parallel ``uint8`` array holding what it costs to step *into*
+each cell (1..255, default 1). Engines marked weighted in ``algorithms.py``
+use it; the others count steps.
+
+Movement is 4-connected by default. ``set_connectivity(8)`` adds diagonal
+moves costing sqrt(2) times the entered cell's cost, and
+``set_connectivity(8, corner_cutting=False)`` only allows a diagonal move when
+both cells it passes between are free. The moves are precomputed per grid as
+``(offset, cost factor, guard, guard)`` tuples; a guard is the offset of a cell
+that must be free for the move, and 0 (the cell being left) when there is none.
+"""
+import math
+
+import numpy as np
+
+# bit flags stored in Grid.cells
+BARRIER = 1
+BORDER = 2
+BLOCKED = BARRIER | BORDER
+
+# 4 directions, same order the visualizer always used: down, up, right, left
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DIAGONALS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+SQRT2 = math.sqrt(2)
+
+
+class Grid:
+    def __init__(self, rows, cols=None, cells=None, costs=None):
+        """An empty ``rows x cols`` map, or one wrapping existing bordered ``cells``
+        (and ``costs``) buffers -- shared memory, a memory map, ... -- without copying."""
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        self.stride = self.cols + 2
+        self.size = (self.rows + 2) * self.stride
+        if cells is None:
+            cells = np.zeros((self.rows + 2, self.stride), dtype=np.uint8)
+            cells[0, :] = cells[-1, :] = cells[:, 0] = cells[:, -1] = BORDER
+        else:
+            cells = np.frombuffer(cells, dtype=np.uint8) if not isinstance(cells, np.ndarray) else cells
+            if cells.size != self.size:
+                raise ValueError(f"cells holds {cells.size} bytes, a {self.rows}x{self.cols} grid needs {self.size}")
+        self.cells = cells.reshape(-1)
+        if costs is None:
+            costs = np.ones(self.size, dtype=np.uint8)
+        else:
+            costs = np.frombuffer(costs, dtype=np.uint8) if not isinstance(costs, np.ndarray) else costs
+            if costs.size != self.size:
+                raise ValueError(f"costs holds {costs.size} bytes, a {self.rows}x{self.cols} grid needs {self.size}")
+        self.costs = costs.reshape(-1)
+        self.version = 0   # bumped on every barrier, cost or connectivity change so derived caches know to rebuild
+        self._max_cost = (None, 1)
+        self.set_connectivity(4)
+
+    def set_connectivity(self, connectivity=4, corner_cutting=True):
+        """Switch between 4- and 8-connected movement (see the module docstring)."""
+        if connectivity not in (4, 8): raise ValueError(f"connectivity must be 4 or 8, got {connectivity}")
+        self.connectivity, self.corner_cutting = connectivity, corner_cutting
+        stride = self.stride
+        # precomputed once per grid instead of per-node neighbor lists
+        moves = [(dr * stride + dc, 1, 0, 0) for dr, dc in DIRECTIONS]
+        if connectivity == 8:
+            moves += [(dr * stride + dc, SQRT2, 0 if corner_cutting else dr * stride,
+                       0 if corner_cutting else dc) for dr, dc in DIAGONALS]
+        self.moves = moves
+        self.offsets = np.array([m[0] for m in moves], dtype=np.int32)
+        self.version += 1
+
+    def index(self, pos):
+        r, c = pos
+        return (r + 1) * self.stride + c + 1
+
+    def pos(self, i):
+        r, c = divmod(int(i), self.stride)
+        return (r - 1, c - 1)
+
+    def in_bounds(self, pos):
+        r, c = pos
+        return 0 <= r < self.rows and 0 <= c < self.cols
+
+    def is_barrier(self, pos): return bool(self.cells[self.index(pos)] & BARRIER)
+
+    def set_barrier(self, pos, on=True):
+        i = self.index(pos)
+        if bool(self.cells[i] & BARRIER) == on: return   # unchanged: derived caches stay valid
+        if on: self.cells[i] |= BARRIER
+        else: self.cells[i] &= ~np.uint8(BARRIER)
+        self.version += 1
+
+    def cost(self, pos): return int(self.costs[self.index(pos)])
+
+    def set_cost(self, pos, cost=1):
+        if not 1 <= cost <= 255: raise ValueError(f"cell costs must be 1..255, got {cost}")
+        i = self.index(pos)
+        if self.costs[i] == cost: return
+        self.costs[i] = cost
+        self.version += 1
+
+    def clear(self):
+        self.cells &= ~np.uint8(BARRIER)
+        self.costs[:] = 1
+        self.version += 1
+
+    def changed(self):
+        """Call after writing barriers or costs straight into ``cells``/``costs``/``view``."""
+        self.version += 1
+
+    @property
+    def max_cost(self):
+        """Largest step cost on the map, recomputed only after the grid changed."""
+        version, value = self._max_cost
+        if version != self.version:
+            value = int(self.costs.max())
+            self._max_cost = (self.version, value)
+        return value
+
+    @property
+    def weighted(self): return self.max_cost > 1
+
+    @property
+    def barriers(self):
+        """2-D boolean copy of the barrier layout, border excluded."""
+        return (self.view & BARRIER).astype(bool)
+
+    @property
+    def view(self):
+        """2-D ``rows x cols`` view onto ``cells`` (writes go through)."""
+        return self.interior(self.cells)
+
+    def interior(self, layer):
+        """2-D ``rows x cols`` view of any array laid out like ``cells``."""
+        return layer.reshape(self.rows + 2, self.stride)[1:-1, 1:-1]
+
+    def new_layer(self, dtype=np.uint8, fill=0):
+        """A per-cell array laid out like ``cells``, for search or display state."""
+        return np.full(self.size, fill, dtype=dtype)
+
+    def resampled(self, rows, cols=None):
+        """A new ``rows x cols`` grid with this one's barriers, costs and moves scaled onto it.
+
+        Every new cell copies the old cell under its center (nearest neighbor), so
+        shrinking can close one-cell gaps or drop one-cell walls.
+        """
+        cols = rows if cols is None else cols
+        r = ((np.arange(rows) + 0.5) * (self.rows / rows)).astype(np.int64)
+        c = ((np.arange(cols) + 0.5) * (self.cols / cols)).astype(np.int64)
+        grid = Grid(rows, cols)
+        grid.view[:] = self.view[np.ix_(r, c)] & BARRIER
+        grid.interior(grid.costs)[:] = self.interior(self.costs)[np.ix_(r, c)]
+        grid.set_connectivity(self.connectivity, self.corner_cutting)
+        return grid
+
+    def neighbors(self, i):
+        cells = self.cells
+        for o, _, ga, gb in self.moves:
+            n = i + o
+            if not (cells[n] | cells[i + ga] | cells[i + gb]) & BLOCKED:
+                yield n
+
+    def path_cost(self, path):
+        """What a ``(row, col)`` path costs under this grid's costs and moves."""
+        total = 0
+        for (r0, c0), (r1, c1) in zip(path, path[1:]):
+            step = self.cost((r1, c1))
+            total += step * SQRT2 if r0 != r1 and c0 != c1 else step
+        return total
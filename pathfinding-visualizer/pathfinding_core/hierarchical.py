@@ -0,0 +1,259 @@
+"""HPA*: hierarchical search over a cached cluster abstraction, for big maps.
+
+The map is cut into ``cluster x cluster`` squares. Along every border between
+two neighboring clusters each maximal run of cell pairs that are free on both
+sides gets one transition (two, one per end, for wide runs); the cells of a
+transition are the abstract nodes, joined across the border with cost 1 and,
+inside a cluster, by exact in-cluster BFS distances. A query links start and
+end to the entrances of their own clusters, runs A* on that small graph and
+then refines each abstract edge into grid cells with a BFS bounded to one
+cluster; refined segments between entrances are cached.
+
+Paths are valid and found whenever one exists, but only near-optimal: they
+are shortest among paths that change cluster at transition cells. Like JPS,
+it counts steps and ignores ``grid.costs``, and on an 8-connected grid it
+runs plain A* instead.
+
+The abstraction is cached on the grid. After barrier edits it diffs the
+layout against the one it was built from and rebuilds only the clusters the
+changed cells lie in, plus a neighbor when the transitions on their shared
+border moved.
+"""
+import heapq
+
+import numpy as np
+
+from .grid import BLOCKED
+from .search import SearchResult, OPEN, CLOSED, PATH, run_steps, _stats, _unreachable, a_star_steps
+from .components import component_index
+
+DEFAULT_CLUSTER = 16
+WIDE_ENTRANCE = 6   # runs at least this long get a transition at each end instead of one in the middle
+
+
+class ClusterGraph:
+    def __init__(self, grid, cluster=DEFAULT_CLUSTER):
+        self.grid = grid
+        self.cluster = cluster
+        self.crows = -(-grid.rows // cluster)
+        self.ccols = -(-grid.cols // cluster)
+        ids = (np.arange(grid.rows)[:, None] // cluster) * self.ccols + np.arange(grid.cols)[None, :] // cluster
+        self.cluster_of = grid.new_layer(np.int32, -1)   # -1 on the border
+        grid.interior(self.cluster_of)[:] = ids
+        count = self.crows * self.ccols
+        self.transitions = {}                       # (k, k2), k < k2 -> [(cell in k, cell in k2)]
+        self.partners = {}                          # entrance -> entrances across a border
+        self.intra = [{} for _ in range(count)]     # cluster -> {entrance: [(entrance, dist)]}
+        self.segments = [{} for _ in range(count)]  # cluster -> {(a, b): refined cells after a}
+        self.snapshot = None
+        self.version = None
+        self.rebuilt = 0
+
+    # ---------- building ----------
+    def refresh(self):
+        """Bring the abstraction up to date with the grid; returns the clusters rebuilt."""
+        grid = self.grid
+        if self.version == grid.version: return 0
+        blocked = grid.cells & BLOCKED
+        if self.snapshot is None:
+            dirty = range(self.crows * self.ccols)
+        else:
+            changed = np.flatnonzero(blocked != self.snapshot)
+            dirty = np.unique(self.cluster_of[changed]).tolist()
+        self.snapshot, self.version = blocked, grid.version
+        touched = set(dirty)
+        for k in dirty:
+            for k2 in self._adjacent(k):
+                border = (k, k2) if k < k2 else (k2, k)
+                if self._scan_border(*border): touched.update(border)
+        for k in touched: self._connect(k)
+        self.rebuilt = len(touched)
+        return self.rebuilt
+
+    def _adjacent(self, k):
+        cr, cc = divmod(k, self.ccols)
+        if cc > 0: yield k - 1
+        if cc + 1 < self.ccols: yield k + 1
+        if cr > 0: yield k - self.ccols
+        if cr + 1 < self.crows: yield k + self.ccols
+
+    def _scan_border(self, k, k2):
+        # recompute the transitions between k and its right or lower neighbor k2
+        grid, size = self.grid, self.cluster
+        cr, cc = divmod(k, self.ccols)
+        # with a single cluster column the lower neighbor is k + 1 as well
+        if k2 == k + 1 and cc + 1 < self.ccols:
+            r0, r1 = cr * size, min((cr + 1) * size, grid.rows)
+            a = (cc + 1) * size - 1
+            cells = [((r, a), (r, a + 1)) for r in range(r0, r1)]
+        else:
+            c0, c1 = cc * size, min((cc + 1) * size, grid.cols)
+            a = (cr + 1) * size - 1
+            cells = [((a, c), (a + 1, c)) for c in range(c0, c1)]
+        blocked = memoryview(self.snapshot)
+        pairs, run = [], []
+        for p, q in cells + [(None, None)]:
+            if p is not None:
+                i, j = grid.index(p), grid.index(q)
+                if not blocked[i] and not blocked[j]:
+                    run.append((i, j))
+                    continue
+            if run:
+                if len(run) >= WIDE_ENTRANCE: pairs += [run[0], run[-1]]
+                else: pairs.append(run[len(run) // 2])
+                run = []
+        old = self.transitions.get((k, k2), [])
+        if pairs == old: return False
+        partners = self.partners
+        for i, j in old:
+            partners[i].remove(j); partners[j].remove(i)
+            if not partners[i]: del partners[i]
+            if not partners[j]: del partners[j]
+        for i, j in pairs:
+            partners.setdefault(i, []).append(j)
+            partners.setdefault(j, []).append(i)
+        self.transitions[(k, k2)] = pairs
+        return True
+
+    def entrances(self, k):
+        cl = self.cluster_of
+        return sorted(i for k2 in self._adjacent(k)
+                      for pair in self.transitions.get((k, k2) if k < k2 else (k2, k), ())
+                      for i in pair if cl[i] == k)
+
+    def _connect(self, k):
+        nodes = self.entrances(k)
+        edges = {}
+        for n in nodes:
+            found, _ = self._bfs(k, n, nodes)
+            edges[n] = [(m, d) for m, d in found.items() if m != n]
+        self.intra[k] = edges
+        self.segments[k] = {}
+
+    def _bfs(self, k, src, targets):
+        # breadth-first from src without leaving cluster k; distances to the targets it reached
+        cells = memoryview(self.grid.cells); cl = memoryview(self.cluster_of)
+        offsets = self.grid.offsets.tolist()
+        want = set(targets)
+        found = {src: 0} if src in want else {}
+        parent = {src: src}
+        frontier, d = [src], 0
+        while frontier and len(found) < len(want):
+            d += 1
+            level = []
+            for u in frontier:
+                for o in offsets:
+                    v = u + o
+                    if v in parent or cl[v] != k or cells[v] & BLOCKED: continue
+                    parent[v] = u
+                    level.append(v)
+                    if v in want: found[v] = d
+            frontier = level
+        return found, parent
+
+    def _segment(self, k, a, b):
+        # cells after a up to and including b, staying inside cluster k
+        cached = self.segments[k].get((a, b))
+        if cached is not None: return cached
+        _, parent = self._bfs(k, a, (b,))
+        cells = [b]
+        while cells[-1] != a: cells.append(parent[cells[-1]])
+        cells = cells[-2::-1]
+        self.segments[k][(a, b)] = cells
+        return cells
+
+    # ---------- queries ----------
+    def search_steps(self, start, end, trace=True, refine=True):
+        """Step generator for one query; with ``refine=False`` the path holds only the waypoints."""
+        grid = self.grid
+        rebuilt = self.refresh()
+        cells = memoryview(grid.cells); cl = memoryview(self.cluster_of)
+        stride = grid.stride
+        s, e = grid.index(start), grid.index(end)
+        if cells[s] & BLOCKED or cells[e] & BLOCKED:
+            return SearchResult(stats=self._stats(0, 0, 0, 0, 0, rebuilt))
+        if s == e: return SearchResult([start], 0, self._stats(0, 0, 0, 0, 0, rebuilt))
+        ks, ke = cl[s], cl[e]
+        start_edges, _ = self._bfs(ks, s, self.entrances(ks) + ([e] if ke == ks else []))
+        end_edges, _ = self._bfs(ke, e, self.entrances(ke))
+        intra, partners = self.intra, self.partners
+        er, ec = divmod(e, stride)
+
+        g, parent, closed = {s: 0}, {s: s}, set()
+        h0 = abs(start[0] - end[0]) + abs(start[1] - end[1])
+        heap = [(h0, h0, 0, s)]
+        count = 0
+        expanded = pops = stale = 0; pushes = peak = 1
+        while heap:
+            if len(heap) > peak: peak = len(heap)
+            u = heapq.heappop(heap)[3]
+            pops += 1
+            if u in closed:
+                stale += 1
+                continue
+            if u == e: break
+            closed.add(u)
+            expanded += 1
+            edges = list(start_edges.items()) if u == s else intra[cl[u]].get(u, [])
+            edges = edges + [(v, 1) for v in partners.get(u, ())]
+            if u in end_edges: edges.append((e, end_edges[u]))
+            gu = g[u]
+            for v, d in edges:
+                if v in closed or gu + d >= g.get(v, gu + d + 1): continue
+                g[v] = gu + d; parent[v] = u
+                vr, vc = divmod(v, stride)
+                hv = abs(vr - er) + abs(vc - ec)
+                count += 1
+                heapq.heappush(heap, (gu + d + hv, hv, count, v))
+                pushes += 1
+                if trace: yield OPEN, v
+            if trace and u != s: yield CLOSED, u
+        stats = self._stats(expanded, pushes, pops, stale, peak, rebuilt)
+        if e not in parent: return SearchResult(stats=stats)
+        waypoints = [e]
+        while waypoints[-1] != s: waypoints.append(parent[waypoints[-1]])
+        waypoints.reverse()
+        if not refine:
+            return SearchResult([grid.pos(i) for i in waypoints], g[e], stats)
+        path = [s]
+        for a, b in zip(waypoints, waypoints[1:]):
+            if cl[a] != cl[b]:
+                path.append(b)
+            elif a == s or b == e:
+                _, par = self._bfs(cl[a], a, (b,))
+                seg = [b]
+                while seg[-1] != a: seg.append(par[seg[-1]])
+                path.extend(seg[-2::-1])
+            else:
+                path.extend(self._segment(cl[a], a, b))
+        if trace:
+            for i in reversed(path[1:-1]): yield PATH, i
+        return SearchResult([grid.pos(i) for i in path], g[e], stats)
+
+    def _stats(self, expanded, pushes, pops, stale, peak, rebuilt):
+        stats = _stats(expanded, pushes, pops, stale, peak)
+        stats.update(abstract_nodes=len(self.partners), clusters_rebuilt=rebuilt)
+        return stats
+
+
+def cluster_graph(grid, cluster=None):
+    """The grid's HPA* abstraction, built on first use and repaired as barriers change.
+
+    ``cluster`` picks the cluster size (a different size rebuilds from scratch);
+    ``None`` keeps whatever the grid already has, or ``DEFAULT_CLUSTER``.
+    """
+    graph = getattr(grid, "_cluster_graph", None)
+    if graph is None or cluster not in (None, graph.cluster):
+        graph = grid._cluster_graph = ClusterGraph(grid, cluster or DEFAULT_CLUSTER)
+    return graph
+
+
+def hpa_star_steps(grid, start, end, trace=True):
+    if grid.connectivity != 4:
+        return (yield from a_star_steps(grid, start, end, trace))
+    if component_index(grid).separated(grid.index(start), grid.index(end)): return _unreachable()
+    return (yield from cluster_graph(grid).search_steps(start, end, trace))
+
+
+def hpa_star(grid, start, end, on_event=None):
+    return run_steps(hpa_star_steps(grid, start, end, on_event is not None), on_event)
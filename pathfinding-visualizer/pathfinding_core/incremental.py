@@ -0,0 +1,183 @@
+"""D* Lite: incremental replanning that repairs only what barrier edits touched.
+
+The planner searches backwards from the goal and keeps its ``g``/``rhs``
+arrays and priority queue between runs. Each ``plan`` diffs the grid's
+blocked bits and step costs against the snapshot it last planned on,
+re-examines only the changed cells and their neighbors, and lets the queue propagate the
+consequences. A start that moved (e.g. along the previous path) is absorbed
+through the ``km`` key offset instead of a restart.
+
+``d_star_lite(grid, start, end)`` keeps one planner per grid and goal, so
+calling it again after a few edits -- what the visualizer does on Run --
+is a repair rather than a fresh search.
+"""
+import heapq
+
+import numpy as np
+
+from .grid import BLOCKED, BORDER
+from .search import SearchResult, OPEN, CLOSED, PATH, DIAGONAL_SAVING, run_steps, _stats, _plain, _unreachable
+from .components import component_index
+
+INF = float('inf')
+EPS = 1e-9
+
+
+class DStarLite:
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = grid.index(goal)
+        self.connectivity = (grid.connectivity, grid.corner_cutting)
+        self.saving = DIAGONAL_SAVING if grid.connectivity == 8 else 0
+        self.g = grid.new_layer(np.float64, INF)
+        self.rhs = grid.new_layer(np.float64, INF)
+        self.snapshot = (grid.cells & BLOCKED, grid.costs.copy())
+        self.start = self.last = None
+        self.km = 0
+        self.queue = []          # (k1, k2, count, cell); entries not matching keys[cell] are stale
+        self.keys = {}
+        self.count = 0
+        self.rhs[self.goal] = 0
+        self.plans = 0
+
+    def _h(self, a, b):
+        ar, ac = divmod(a, self.grid.stride)
+        br, bc = divmod(b, self.grid.stride)
+        dr, dc = abs(ar - br), abs(ac - bc)
+        return dr + dc - self.saving * (dr if dr < dc else dc)
+
+    def plan(self, start, on_event=None):
+        return run_steps(self.plan_steps(start, on_event is not None), on_event)
+
+    def plan_steps(self, start, trace=True):
+        """Repair (or on the first call, compute) the path from ``start`` to the goal."""
+        grid = self.grid; stride = grid.stride
+        cells = memoryview(grid.cells); costs = memoryview(grid.costs)
+        moves = grid.moves; offsets = grid.offsets.tolist(); saving = self.saving
+        g, rhs = memoryview(self.g), memoryview(self.rhs)
+        keys, queue, goal = self.keys, self.queue, self.goal
+        s = grid.index(start)
+        expanded = pops = stale = pushes = 0; peak = len(keys)
+        sr, sc = divmod(s, stride)
+
+        def key(u):
+            m = g[u] if g[u] < rhs[u] else rhs[u]
+            ur, uc = divmod(u, stride)
+            dr, dc = abs(ur - sr), abs(uc - sc)
+            return (m + dr + dc - saving * (dr if dr < dc else dc) + self.km, m)
+
+        def update(u):
+            # recompute rhs(u) from its successors and fix its place in the queue
+            nonlocal pushes
+            if cells[u] & BORDER: return False
+            if u != goal:
+                best = INF
+                if not cells[u] & BLOCKED:
+                    for o, w, ga, gb in moves:
+                        n = u + o
+                        if (cells[n] | cells[u + ga] | cells[u + gb]) & BLOCKED: continue
+                        if g[n] + costs[n] * w < best: best = g[n] + costs[n] * w
+                rhs[u] = best
+            if g[u] != rhs[u]:
+                k = key(u)
+                if keys.get(u) != k:
+                    keys[u] = k
+                    self.count += 1
+                    heapq.heappush(queue, (k[0], k[1], self.count, u))
+                    pushes += 1
+                    return True
+            else:
+                keys.pop(u, None)
+            return False
+
+        if self.start is None:
+            self.last = s
+            k = key(goal)
+            keys[goal] = k
+            heapq.heappush(queue, (k[0], k[1], 0, goal))
+        elif s != self.last:
+            self.km += self._h(self.last, s)
+            self.last = s
+        self.start = s
+
+        blocked, snap_blocked, snap_costs = grid.cells & BLOCKED, *self.snapshot
+        changed = np.flatnonzero((blocked != snap_blocked) | (grid.costs != snap_costs)).tolist()
+        if changed:
+            self.snapshot = (blocked, grid.costs.copy())
+            for v in changed:
+                update(v)
+                for o in offsets: update(v + o)
+
+        if cells[s] & BLOCKED or cells[goal] & BLOCKED:
+            return SearchResult(stats=self._stats(expanded, pushes, pops, stale, peak, changed))
+        while queue:
+            k1, k2, _, u = queue[0]
+            if keys.get(u) != (k1, k2):
+                heapq.heappop(queue); pops += 1; stale += 1
+                continue
+            ks1, ks2 = key(s)
+            # keys tied in exact arithmetic can differ by rounding once sqrt(2) steps are
+            # summed, so a near-tie still counts as "not after the start" and is expanded
+            if not (k1 < ks1 + EPS and (k1 < ks1 - EPS or k2 < ks2 + EPS) or rhs[s] != g[s]): break
+            if len(keys) > peak: peak = len(keys)
+            heapq.heappop(queue); pops += 1
+            k_new = key(u)
+            if (k1, k2) < k_new:
+                keys[u] = k_new
+                self.count += 1
+                heapq.heappush(queue, (k_new[0], k_new[1], self.count, u))
+                pushes += 1
+                continue
+            del keys[u]
+            expanded += 1
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+            else:
+                g[u] = INF
+                update(u)
+            opened = [u + o for o in offsets if update(u + o)]
+            # events only after u is fully processed, so a run abandoned mid-animation
+            # leaves the planner consistent for the next one
+            if trace:
+                for v in opened: yield OPEN, v
+                if u != s and u != goal: yield CLOSED, u
+        stats = self._stats(expanded, pushes, pops, stale, peak, changed)
+        if g[s] == INF: return SearchResult(stats=stats)
+        path = [s]
+        cur = s
+        while cur != goal:
+            nxt, best = -1, INF
+            for o, w, ga, gb in moves:
+                n = cur + o
+                if (cells[n] | cells[cur + ga] | cells[cur + gb]) & BLOCKED: continue
+                if g[n] + costs[n] * w < best: nxt, best = n, g[n] + costs[n] * w
+            if nxt < 0 or len(path) > grid.size: return SearchResult(stats=stats)
+            path.append(nxt); cur = nxt
+        if trace:
+            for i in reversed(path[1:-1]): yield PATH, i
+        return SearchResult([grid.pos(i) for i in path], _plain(g[s]), stats)
+
+    def _stats(self, expanded, pushes, pops, stale, peak, changed):
+        self.plans += 1
+        stats = _stats(expanded, pushes, pops, stale, peak)
+        stats.update(changed_cells=len(changed), replans=self.plans - 1)
+        return stats
+
+
+def incremental_planner(grid, goal):
+    """The grid's D* Lite planner for ``goal``; a new goal or connectivity starts a new planner."""
+    planner = getattr(grid, "_d_star_lite", None)
+    if planner is None or planner.goal != grid.index(goal) or \
+       planner.connectivity != (grid.connectivity, grid.corner_cutting):
+        planner = grid._d_star_lite = DStarLite(grid, goal)
+    return planner
+
+
+def d_star_lite_steps(grid, start, end, trace=True):
+    # the planner diffs the grid against its snapshot, so skipping it here loses nothing
+    if component_index(grid).separated(grid.index(start), grid.index(end)): return _unreachable()
+    return (yield from incremental_planner(grid, end).plan_steps(start, trace))
+
+
+def d_star_lite(grid, start, end, on_event=None):
+    return run_steps(d_star_lite_steps(grid, start, end, on_event is not None), on_event)
@@ -0,0 +1,232 @@
+"""Jump Point Search for the uniform-cost 4-connected grid, plus JPS+.
+
+With only orthogonal moves a node is a jump point when it has a forced
+neighbor (a side cell that opens up right after being blocked behind us), or,
+while moving vertically, when a horizontal scan from it finds a jump point.
+Only jump points go on the open set, and the straight runs between them are
+filled back in when the path is built, so results match A* exactly.
+
+JPS+ precomputes, for every cell and direction, how far the scan would go
+before reaching a jump point (positive) or a wall (zero or negative). The
+tables are goal independent and built with whole-array numpy scans. They
+are cached on the grid until its barrier layout changes: a version bump
+alone (a cost paint, a barrier drawn and erased again) only re-checks a
+checksum of the blocked cells. The goal is checked against them at query
+time.
+
+Both are 4-connected techniques; on an 8-connected grid they run plain A*.
+"""
+import heapq, zlib
+
+import numpy as np
+
+from .grid import BLOCKED
+from .search import SearchResult, OPEN, CLOSED, h, run_steps, _stats, _finish, _unreachable, a_star_steps
+from .components import component_index
+from .state import search_state
+
+
+# ---------- online jumping ----------
+def _jump_h(cells, i, d, stride, goal):
+    # scan horizontally from i (already one step from the parent) in direction d
+    while True:
+        if cells[i] & BLOCKED: return -1
+        if i == goal: return i
+        if (not cells[i - stride] & BLOCKED and cells[i - d - stride] & BLOCKED) or \
+           (not cells[i + stride] & BLOCKED and cells[i - d + stride] & BLOCKED):
+            return i
+        i += d
+
+
+def _jump_v(cells, i, d, stride, goal):
+    while True:
+        if cells[i] & BLOCKED: return -1
+        if i == goal: return i
+        if (not cells[i - 1] & BLOCKED and cells[i - 1 - d] & BLOCKED) or \
+           (not cells[i + 1] & BLOCKED and cells[i + 1 - d] & BLOCKED):
+            return i
+        if _jump_h(cells, i + 1, 1, stride, goal) != -1 or _jump_h(cells, i - 1, -1, stride, goal) != -1:
+            return i
+        i += d
+
+
+def _online_jumper(grid, goal):
+    cells = memoryview(grid.cells); stride = grid.stride
+    def jump(n, d):
+        if d == 1 or d == -1: return _jump_h(cells, n + d, d, stride, goal)
+        return _jump_v(cells, n + d, d, stride, goal)
+    return jump
+
+
+# ---------- JPS+ tables ----------
+def _ahead(a, d):
+    # a[i + d] for every i, zero past either end
+    out = np.zeros_like(a)
+    if d > 0: out[:-d] = a[d:]
+    else: out[-d:] = a[:d]
+    return out
+
+
+def build_jump_tables(grid):
+    """Jump distances per direction, ordered like ``grid.offsets`` (down, up, right, left).
+
+    ``t[k][i] > 0``: a jump point lies that many steps away in direction k;
+    ``t[k][i] <= 0``: no jump point, ``-t[k][i]`` free cells before a wall.
+
+    Scanning from a free cell, the first cell that is either a jump point or
+    last before a wall settles its entry. Those cells are found for a whole
+    direction at once, each cell's nearest one by a running min/max of their
+    indices along its row or column.
+    """
+    stride, size = grid.stride, grid.size
+    free = (grid.cells & BLOCKED) == 0
+    free_cells = np.flatnonzero(free).astype(np.int32)
+    index = np.arange(size, dtype=np.int32)
+    tables = np.zeros((4, size), dtype=np.int32)
+    down, up, right, left = tables
+    # the vertical tables need the horizontal ones: a cell that sees a horizontal jump point is one
+    for d, table, side in ((1, right, stride), (-1, left, stride), (stride, down, 1), (-stride, up, 1)):
+        ahead = _ahead(free, d)
+        forced = ahead & ((_ahead(free, d - side) & ~_ahead(free, -side)) |
+                          (_ahead(free, d + side) & ~_ahead(free, side)))
+        if side == 1: forced |= ahead & ((_ahead(right, d) > 0) | (_ahead(left, d) > 0))
+        settles = np.where(free & (forced | ~ahead), index, size if d > 0 else -1).reshape(-1, stride)
+        axis = 1 if side == stride else 0
+        if d > 0:
+            nearest = np.flip(np.minimum.accumulate(np.flip(settles, axis), axis), axis).ravel()[free_cells]
+        else:
+            nearest = np.maximum.accumulate(settles, axis).ravel()[free_cells]
+        steps = (nearest - free_cells) // d
+        table[free_cells] = np.where(forced[nearest], steps + 1, -steps)
+    return tables
+
+
+def _blocked_checksum(grid):
+    return zlib.crc32((grid.cells & BLOCKED).tobytes())
+
+
+def jump_tables(grid):
+    """The grid's JPS+ tables, rebuilt only when its barrier layout changed."""
+    cached = getattr(grid, "_jump_tables", None)
+    if cached is None or cached[0] != grid.version:
+        # cost paints and connectivity switches bump the version too; only barriers count
+        checksum = _blocked_checksum(grid)
+        tables = cached[2] if cached is not None and cached[1] == checksum else build_jump_tables(grid)
+        cached = grid._jump_tables = (grid.version, checksum, tables)
+    return cached[2]
+
+
+def _table_jumper(grid, goal):
+    stride = grid.stride
+    down, up, right, left = (memoryview(t) for t in jump_tables(grid))
+    horiz = {1: right, -1: left}
+    by_dir = {stride: down, -stride: up, 1: right, -1: left}
+    gr, gc = divmod(goal, stride)
+    def jump(n, d):
+        t = by_dir[d][n]
+        reach = t if t > 0 else -t
+        nr, nc = divmod(n, stride)
+        if d == 1 or d == -1:
+            if gr == nr and 0 < (gc - nc) * d <= reach: return goal
+        else:
+            step = stride if d > 0 else -stride
+            m = (gr - nr) * (1 if d > 0 else -1)
+            if 0 < m <= reach:
+                c = n + m * step
+                if gc == nc: return goal
+                # the goal row: a clear horizontal line from c to the goal makes c a jump point
+                side = 1 if gc > nc else -1
+                ht = horiz[side][c]
+                if abs(gc - nc) <= (ht if ht > 0 else -ht): return c
+        return n + t * d if t > 0 else -1
+    return jump
+
+
+# ---------- search ----------
+def _fill(grid, jump_points):
+    # expand the straight segments between consecutive jump points into cells
+    stride = grid.stride
+    path = [jump_points[0]]
+    for a, b in zip(jump_points, jump_points[1:]):
+        d = (1 if b > a else -1) if abs(b - a) < stride else (stride if b > a else -stride)
+        path.extend(range(a + d, b + d, d))
+    return path
+
+
+def _jps_steps(grid, start, end, trace, plus):
+    if grid.connectivity != 4:
+        return (yield from a_star_steps(grid, start, end, trace))
+    stride = grid.stride
+    s, e = grid.index(start), grid.index(end)
+    if component_index(grid).separated(s, e): return _unreachable()
+    er, ec = divmod(e, stride)
+    jump = _table_jumper(grid, e) if plus else _online_jumper(grid, e)
+    cells = memoryview(grid.cells)
+    gen, seen, closed, g, parent = search_state(grid).begin()
+    seen[s] = gen; g[s] = 0; parent[s] = s
+    h0 = h(start, end)
+    count = 0
+    open_set = [(h0, h0, count, s)]
+    push, pop = heapq.heappush, heapq.heappop
+    expanded = pops = stale = 0; pushes = peak = 1
+    all_dirs = grid.offsets.tolist()
+    while open_set:
+        if len(open_set) > peak: peak = len(open_set)
+        current = pop(open_set)[3]
+        pops += 1
+        if closed[current] == gen:
+            stale += 1
+            continue
+        if current == e:
+            points = [e]
+            while points[-1] != s: points.append(parent[points[-1]])
+            points.reverse()
+            cells_path = _fill(grid, points)
+            for a, b in zip(cells_path, cells_path[1:]): parent[b] = a
+            return (yield from _finish(grid, parent, s, e, g[e], _stats(expanded, pushes, pops, stale, peak), trace))
+        closed[current] = gen
+        expanded += 1
+        if current == s:
+            dirs = all_dirs
+        else:
+            diff = current - parent[current]
+            if -stride < diff < stride:
+                d = 1 if diff > 0 else -1
+                dirs = (d, stride, -stride)
+            else:
+                d = stride if diff > 0 else -stride
+                dirs = (d, 1, -1)
+        cr, cc = divmod(current, stride)
+        for d in dirs:
+            if cells[current + d] & BLOCKED: continue
+            j = jump(current, d)
+            if j < 0 or closed[j] == gen: continue
+            jr, jc = divmod(j, stride)
+            temp_g = g[current] + abs(jr - cr) + abs(jc - cc)
+            if seen[j] != gen or temp_g < g[j]:
+                seen[j] = gen
+                g[j] = temp_g
+                parent[j] = current
+                hn = abs(jr - er) + abs(jc - ec)
+                count += 1
+                push(open_set, (temp_g + hn, hn, count, j))
+                pushes += 1
+                if trace: yield OPEN, j
+        if trace and current != s: yield CLOSED, current
+    return SearchResult(stats=_stats(expanded, pushes, pops, stale, peak))
+
+
+def jps_steps(grid, start, end, trace=True):
+    return (yield from _jps_steps(grid, start, end, trace, False))
+
+
+def jps_plus_steps(grid, start, end, trace=True):
+    return (yield from _jps_steps(grid, start, end, trace, True))
+
+
+def jps(grid, start, end, on_event=None):
+    return run_steps(jps_steps(grid, start, end, on_event is not None), on_event)
+
+
+def jps_plus(grid, start, end, on_event=None):
+    return run_steps(jps_plus_steps(grid, start, end, on_event is not None), on_event)
@@ -0,0 +1,209 @@
+"""ALT heuristics: A*, landmarks and the triangle inequality.
+
+Manhattan distance knows nothing about barriers, so in a maze A* expands
+nearly as much as Dijkstra. ALT precomputes the exact cost from every cell
+to a few landmark cells; since no path can be shorter than what a detour
+through a landmark ``L`` saves,
+
+    d(n, end) >= d(n, L) - d(end, L)
+
+for every cell ``n``, and on an unweighted grid (where distances are
+symmetric) also ``d(end, L) - d(n, L)``. The largest of these bounds never
+overestimates, however the barriers lie, and near a wall it is far tighter
+than Manhattan. ``a_star_steps`` takes the max of the two for every cell it
+pushes, whenever the grid has landmarks attached, so its paths stay optimal.
+
+- ``landmarks(grid, count)`` picks the landmarks farthest-point: the first
+  is the cell of the largest component farthest from its center, each next
+  one the cell farthest from all landmarks so far. Each table is one
+  ``distance_field`` toward the landmark.
+- Tables are int32 per cell in the grid's bordered layout, -1 where the
+  landmark is unreachable. On a 4-connected grid the costs are whole
+  numbers and are stored exactly. With sqrt(2) diagonals they are stored in
+  fixed point, ``scale`` units per step, and every bound gives up ``SLACK``
+  units so rounding never makes it overestimate.
+- Per end cell, the bounds for all cells come from a few whole-array numpy
+  operations. A* reads them like any other layer; the last end is cached.
+- ``save_landmarks``/``load_landmarks`` keep the tables next to a map file
+  (``.alt``), memory-mapped on load like ``load_grid``. The file records a
+  checksum of the barrier layout and costs it was built on. Loading it for
+  any other layout fails, and once the grid's barriers or costs change,
+  attached tables are dropped and A* goes back to Manhattan until
+  ``landmarks`` builds new ones.
+"""
+import os, struct, zlib
+
+import numpy as np
+
+from .grid import BLOCKED
+from .components import component_index
+from .fields import distance_field
+
+DEFAULT_LANDMARKS = 8
+MAX_SCALE = 1 << 16               # fixed-point units per step for 8-connected tables
+SLACK = 2                         # units a fixed-point bound gives up: rounding of both tables
+LIMIT = np.iinfo(np.int32).max - 1
+
+MAGIC = b"PFALT\x00\x00\x01"
+HEADER = struct.Struct("<8sIIBBHdI4x")   # magic, rows, cols, connectivity, corner cutting, count, scale, checksum
+EXTENSION = ".alt"
+
+
+def layout_checksum(grid):
+    """CRC of the blocked bits and costs: what the tables' distances depend on."""
+    crc = zlib.crc32((grid.cells & BLOCKED).tobytes())
+    return zlib.crc32(grid.costs.tobytes(), crc) if grid.weighted else crc
+
+
+class Landmarks:
+    def __init__(self, grid, cells, tables, scale, requested=None, built=None):
+        # built: (version, checksum) of the layout the tables were computed on, default the current one
+        self.grid = grid
+        self.cells = np.asarray(cells, dtype=np.int32)   # flat index of each landmark
+        self.requested = len(self.cells) if requested is None else requested
+        self.tables = tables                             # (count, size) int32: cost to each landmark
+        self.scale = scale
+        self.exact = grid.connectivity == 4 and scale == 1
+        self.symmetric = not grid.weighted
+        self.version, self.checksum = built or (grid.version, layout_checksum(grid))
+        self.layout = (grid.connectivity, grid.corner_cutting)
+        self._bounds = None
+
+    def __len__(self): return len(self.cells)
+
+    @property
+    def stale(self):
+        """True once the grid's barriers, costs or moves differ from what the tables were built on."""
+        grid = self.grid
+        if self.version != grid.version:
+            # cost-only or moved-back edits bump the version too; only a real change counts
+            if (grid.connectivity, grid.corner_cutting) != self.layout or layout_checksum(grid) != self.checksum:
+                return True
+            self.version = grid.version
+        return False
+
+    def bounds(self, end):
+        """Per-cell lower bound on the cost to flat index ``end``, as a layer."""
+        if self._bounds is not None and self._bounds[0] == end: return self._bounds[1]
+        te = self.tables[:, end]
+        best = np.zeros(self.grid.size, dtype=np.int32)
+        buf = np.empty_like(best)
+        for table, t in zip(self.tables, te.tolist()):
+            if t < 0: continue   # the end cannot reach this landmark: no bound from it
+            # differences of two tables stay within int32. Cells that cannot reach the
+            # landmark (-1) cannot reach the end either, so A* never asks about them
+            np.subtract(table, t, out=buf)
+            if self.symmetric: np.abs(buf, out=buf)
+            np.maximum(best, buf, out=best)
+        if self.exact:
+            layer = best
+        else:
+            layer = np.maximum(best - SLACK, 0) * (1 / self.scale)
+        self._bounds = (end, layer)
+        return layer
+
+    def save(self, path):
+        save_landmarks(self, path)
+
+
+def _table_scale(grid, most):
+    if grid.connectivity == 4:
+        # whole-number costs: exact, unless the longest one would overflow int32
+        scale = 1.0
+    else:
+        scale = float(MAX_SCALE)
+    while most * scale > LIMIT: scale /= 2
+    return scale
+
+
+def build_landmarks(grid, count=DEFAULT_LANDMARKS):
+    """Pick ``count`` landmarks farthest-point and compute their tables; not attached to the grid.
+
+    Only the largest component gets landmarks; queries elsewhere keep Manhattan.
+    """
+    built = (grid.version, layout_checksum(grid))   # edits made while building leave the tables stale
+    index = component_index(grid)
+    free = np.flatnonzero(index.labels)
+    if not len(free): return Landmarks(grid, [], np.zeros((0, grid.size), dtype=np.int32), 1.0, count, built)
+    roots = np.array([index.find(k) for k in range(len(index.parent))])
+    component = roots[index.labels[free]]
+    main = free[component == np.bincount(component).argmax()]
+    # the first landmark is the cell farthest from the main component's middle
+    r, c = np.divmod(main, grid.stride)
+    center = main[np.argmin(np.abs(r - r.mean()) + np.abs(c - c.mean()))]
+    dist, _ = distance_field(grid, grid.pos(center))
+    fields, cells = [], []
+    nearest = np.full(len(main), np.inf)
+    for _ in range(count):
+        if cells and not nearest.max(): break   # every cell of it already is a landmark
+        landmark = int(main[np.argmax(dist[main] if not cells else nearest)])
+        dist, _ = distance_field(grid, grid.pos(landmark))
+        cells.append(landmark); fields.append(dist)
+        np.minimum(nearest, dist[main], out=nearest)
+    most = max(float(f[np.isfinite(f)].max()) for f in fields)
+    scale = _table_scale(grid, most)
+    tables = np.full((len(fields), grid.size), -1, dtype=np.int32)
+    for table, field in zip(tables, fields):
+        reached = np.isfinite(field)
+        table[reached] = np.floor(field[reached] * scale)
+    return Landmarks(grid, cells, tables, scale, count, built)
+
+
+def landmarks(grid, count=None):
+    """The grid's landmarks, built on first use and whenever its layout changed.
+
+    ``count`` asks for that many (a different count rebuilds); ``None`` keeps
+    whatever the grid already has, or ``DEFAULT_LANDMARKS``.
+    """
+    current = getattr(grid, "_landmarks", None)
+    if current is None or current.stale or count not in (None, current.requested):
+        current = grid._landmarks = build_landmarks(grid, count or DEFAULT_LANDMARKS)
+    return current
+
+
+def attached_landmarks(grid):
+    """The landmarks A* would use on ``grid`` right now, or None; stale ones are dropped."""
+    current = getattr(grid, "_landmarks", None)
+    if current is not None and current.stale:
+        current = grid._landmarks = None
+    return current
+
+
+def detach_landmarks(grid):
+    """Stop A* using landmarks on ``grid``."""
+    grid._landmarks = None
+
+
+def landmarks_path(map_path):
+    """Where the tables for the map file ``map_path`` are kept."""
+    return os.path.splitext(map_path)[0] + EXTENSION
+
+
+def save_landmarks(marks, path):
+    """Save the tables with the layout checksum they were built on."""
+    grid = marks.grid
+    # written aside and renamed: an older table file may still be memory-mapped
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, grid.rows, grid.cols, grid.connectivity, grid.corner_cutting,
+                            len(marks), marks.scale, marks.checksum))
+        f.write(marks.cells.tobytes())
+        f.write(np.ascontiguousarray(marks.tables).tobytes())
+    os.replace(path + ".tmp", path)
+
+
+def load_landmarks(grid, path):
+    """Attach the tables saved at ``path`` to ``grid``; the file is memory-mapped, not read.
+
+    Raises ``ValueError`` if they were built for another layout or movement rule.
+    """
+    with open(path, "rb") as f:
+        magic, rows, cols, connectivity, corner_cutting, count, scale, checksum = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC: raise ValueError(f"{path}: not a pathfinding_core landmark file")
+    if (rows, cols, connectivity, bool(corner_cutting)) != (grid.rows, grid.cols, grid.connectivity, grid.corner_cutting):
+        raise ValueError(f"{path}: built for a {rows}x{cols} {connectivity}-connected grid")
+    if checksum != layout_checksum(grid):
+        raise ValueError(f"{path}: built for another barrier layout")
+    cells = np.fromfile(path, dtype=np.int32, count=count, offset=HEADER.size)
+    tables = np.memmap(path, dtype=np.int32, mode="r", offset=HEADER.size + 4 * count, shape=(count, grid.size))
+    marks = grid._landmarks = Landmarks(grid, cells, tables, scale, built=(grid.version, checksum))
+    return marks
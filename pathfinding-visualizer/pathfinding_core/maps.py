@@ -0,0 +1,153 @@
+"""Loading and saving maps: Moving AI benchmark files and a compact native format.
+
+Moving AI ``.map`` files are a short text header (``type``, ``height``,
+``width``, ``map``) followed by one character per cell; ``.``, ``G`` and
+``S`` are passable, everything else (``@``, ``O``, ``T``, ``W``) is a
+barrier. ``type octile`` maps come back 8-connected without corner cutting,
+the rules their ``.scen`` optimal lengths are computed under. Both the body
+and the passability test are parsed with whole-array numpy operations.
+
+The native format (``.grid``) is a 32-byte header followed by the barrier
+bits packed eight cells to a byte, row by row, so a 10k x 10k map is 12.5 MB
+on disk. Weighted maps append their ``costs`` array in the solvers' bordered
+layout. ``load_grid`` memory-maps the file: costs are used straight from the
+mapping, copy-on-write so edits never reach the file, and the bits are
+unpacked in row blocks into the one-byte-per-cell ``cells`` the engines
+index -- no per-cell Python objects at any point. ``save_grid(...,
+packed=False)`` stores ``cells`` unpacked instead (8x larger) and the grid
+then runs directly on the mapped bytes as well.
+"""
+import os, struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from .grid import Grid, BARRIER
+
+MAGIC = b"PFGRID\x00\x01"
+HEADER = struct.Struct("<8sIIBBBB12x")   # magic, rows, cols, flags, connectivity, corner cutting, spare
+PACKED, HAS_COSTS = 1, 2                 # header flag bits
+UNPACK_ROWS = 1024                       # rows unpacked per block, bounds the temporary
+
+PASSABLE = b".GS"
+
+
+@dataclass
+class Scenario:
+    bucket: int
+    map: str            # map file name as written in the .scen file
+    start: tuple        # (row, col)
+    end: tuple
+    optimal: float      # the benchmark's optimal path length
+
+
+# ---------- Moving AI ----------
+def read_map(path):
+    """A ``Grid`` from a Moving AI ``.map`` file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    header, sep, body = data.partition(b"\nmap")
+    if not sep: raise ValueError(f"{path}: no 'map' line, not a Moving AI map")
+    fields = dict(line.split(None, 1) for line in header.decode("ascii").splitlines() if line.strip())
+    rows, cols = int(fields["height"]), int(fields["width"])
+    body = body[body.index(b"\n") + 1:]
+    body = body.replace(b"\r", b"")
+    if not body.endswith(b"\n"): body += b"\n"
+    if len(body) < rows * (cols + 1):
+        raise ValueError(f"{path}: body is shorter than {rows}x{cols}")
+    chars = np.frombuffer(body, dtype=np.uint8, count=rows * (cols + 1)).reshape(rows, cols + 1)[:, :cols]
+    grid = Grid(rows, cols)
+    grid.view[:] = np.where(np.isin(chars, np.frombuffer(PASSABLE, dtype=np.uint8)), 0, BARRIER)
+    if fields.get("type", "").strip() == "octile":
+        grid.set_connectivity(8, corner_cutting=False)
+    grid.changed()
+    return grid
+
+
+def write_map(grid, path):
+    """Save the barrier layout as a Moving AI ``.map`` (costs are not representable)."""
+    body = np.full((grid.rows, grid.cols + 1), ord("\n"), dtype=np.uint8)
+    body[:, :-1] = np.where(grid.view & BARRIER, ord("@"), ord("."))
+    kind = "octile" if grid.connectivity == 8 else "tile"
+    with open(path, "wb") as f:
+        f.write(f"type {kind}\nheight {grid.rows}\nwidth {grid.cols}\nmap\n".encode("ascii"))
+        f.write(body.tobytes())
+
+
+def read_scen(path):
+    """The queries of a Moving AI ``.scen`` file, as ``Scenario`` records."""
+    scenarios = []
+    with open(path) as f:
+        for line in f:
+            parts = line.split("\t") if "\t" in line else line.split()
+            if len(parts) < 9 or parts[0].startswith("version"): continue
+            bucket, name, _, _, sx, sy, gx, gy, optimal = parts[:9]
+            scenarios.append(Scenario(int(bucket), name, (int(sy), int(sx)), (int(gy), int(gx)),
+                                      float(optimal)))
+    return scenarios
+
+
+def write_scen(path, grid, queries, map_name, algorithm="A*"):
+    """Write ``(start, end)`` queries as a ``.scen`` file for ``map_name``.
+
+    Optimal lengths are solved with ``algorithm`` under the grid's current
+    connectivity; unreachable queries are left out, as in the benchmark sets.
+    """
+    from .algorithms import ALGORITHMS   # the registry imports every engine; only needed here
+    solve = ALGORITHMS[algorithm]
+    with open(path, "w") as f:
+        f.write("version 1\n")
+        for start, end in queries:
+            result = solve(grid, start, end)
+            if not result.found: continue
+            f.write(f"{int(result.cost // 4)}\t{map_name}\t{grid.cols}\t{grid.rows}\t"
+                    f"{start[1]}\t{start[0]}\t{end[1]}\t{end[0]}\t{result.cost:.8f}\n")
+
+
+# ---------- native format ----------
+def save_grid(grid, path, packed=True):
+    """Save barriers, costs (if any) and connectivity in the native format."""
+    flags = (PACKED if packed else 0) | (HAS_COSTS if grid.weighted else 0)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, grid.rows, grid.cols, flags, grid.connectivity, grid.corner_cutting, 0))
+        if packed:
+            for r0 in range(0, grid.rows, UNPACK_ROWS):
+                f.write(np.packbits(grid.view[r0:r0 + UNPACK_ROWS] & BARRIER, axis=1).tobytes())
+        else:
+            f.write(grid.cells.tobytes())
+        if flags & HAS_COSTS:
+            f.write(grid.costs.tobytes())
+
+
+def load_grid(path):
+    """Open a native-format map; the file is memory-mapped, not read."""
+    with open(path, "rb") as f:
+        magic, rows, cols, flags, connectivity, corner_cutting, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC: raise ValueError(f"{path}: not a pathfinding_core grid file")
+    size = (rows + 2) * (cols + 2)
+    offset = HEADER.size
+    if flags & PACKED:
+        row_bytes = -(-cols // 8)
+        bits = np.memmap(path, dtype=np.uint8, mode="r", offset=offset, shape=(rows, row_bytes))
+        offset += rows * row_bytes
+        costs = _costs(path, flags, offset, size)
+        grid = Grid(rows, cols, costs=costs)
+        view = grid.view
+        for r0 in range(0, rows, UNPACK_ROWS):
+            view[r0:r0 + UNPACK_ROWS] |= np.unpackbits(bits[r0:r0 + UNPACK_ROWS], axis=1, count=cols)
+        del bits
+    else:
+        cells = np.memmap(path, dtype=np.uint8, mode="c", offset=offset, shape=(size,))
+        grid = Grid(rows, cols, cells=cells, costs=_costs(path, flags, offset + size, size))
+    grid.set_connectivity(connectivity, bool(corner_cutting))
+    return grid
+
+
+def _costs(path, flags, offset, size):
+    if not flags & HAS_COSTS: return None
+    return np.memmap(path, dtype=np.uint8, mode="c", offset=offset, shape=(size,))
+
+
+def open_map(path):
+    """Load a map by extension: ``.map`` (Moving AI), anything else the native format."""
+    return read_map(path) if os.path.splitext(path)[1].lower() == ".map" else load_grid(path)
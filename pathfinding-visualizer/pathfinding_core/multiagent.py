@@ -0,0 +1,277 @@
+"""Many agents on one grid without collisions: windowed cooperative A* (WHCA*).
+
+Time advances in ticks; each tick an agent either moves to a neighbor or
+waits. Agents are planned one after another in priority order, each with a
+space-time A* that only looks ``window`` ticks ahead and must avoid what the
+agents planned before it reserved: a cell at a tick (vertex conflicts) and
+two agents trading cells in one tick (swap conflicts). Beyond the window it
+estimates the remaining ticks with a per-goal distance field in steps
+(``fields.distance_field``), so agents do not wander into dead ends. Every
+``window // 2`` ticks all agents replan, and the priority order rotates so no
+agent is starved. Waiting at one's goal is free, so arrived agents park but
+still step aside when someone has to pass.
+
+``ReservationTable`` keeps one ``{cell: agent}`` dict per tick of the
+window in a ring buffer, so it never holds more than ``agents x (window + 1)``
+entries however long the run, and the trajectories are a single
+``(ticks + 1) x agents`` int32 array.
+
+Collisions are ruled out by construction. An agent not yet planned holds
+its cell for the whole window, so waiting always stays open to it; only
+agents parked at their goal or stuck since the last round hold it just for
+the next tick, so others can push them aside. If such an agent then finds no
+way out, it is pinned in place and whoever planned through its cell replans.
+``find_conflicts`` checks any trajectory array independently
+(``stats["conflicts"]``).
+
+WHCA* is fast and scales to thousands of agents but is not complete: in
+one-cell-wide corridors agents can block each other for good. Such runs end
+at ``max_ticks`` with ``stats["arrived"]`` short of ``stats["agents"]``.
+Agents whose goal is unreachable from their start do not hold the run open
+(``stats["unreachable"]``).
+"""
+import heapq, time
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .grid import BLOCKED
+from .fields import distance_field
+
+DEFAULT_WINDOW = 16
+
+
+class ReservationTable:
+    def __init__(self, window):
+        self.span = window + 1
+        self.slots = [{} for _ in range(self.span)]   # tick % span -> {cell: agent}
+        self.ticks = [None] * self.span                # which tick each slot currently holds
+
+    def _slot(self, t):
+        k = t % self.span
+        if self.ticks[k] != t:
+            self.slots[k].clear(); self.ticks[k] = t
+        return self.slots[k]
+
+    def owner(self, t, cell):
+        k = t % self.span
+        return self.slots[k].get(cell) if self.ticks[k] == t else None
+
+    def reserve(self, t, cell, agent):
+        self._slot(t)[cell] = agent
+
+    def release(self, t, cell, agent):
+        slot = self._slot(t)
+        if slot.get(cell) == agent: del slot[cell]
+
+    def clear(self):
+        for slot in self.slots: slot.clear()
+        self.ticks = [None] * self.span
+
+    def __len__(self): return sum(len(slot) for slot in self.slots)
+
+
+@dataclass
+class MultiAgentResult:
+    grid: object
+    positions: np.ndarray            # (ticks + 1, agents) flat cell indices
+    goals: list                      # flat goal index per agent
+    stats: dict = field(default_factory=dict)
+
+    @property
+    def ticks(self): return len(self.positions) - 1
+
+    def at(self, t):
+        """Every agent's ``(row, col)`` at tick ``t`` (clamped to the last tick)."""
+        grid = self.grid
+        return [grid.pos(i) for i in self.positions[min(t, self.ticks)].tolist()]
+
+    def path(self, agent):
+        """One agent's ``(row, col)`` per tick, without the waiting at its goal at the end."""
+        cells = self.positions[:, agent].tolist()
+        end = len(cells)
+        while end > 1 and cells[end - 1] == cells[end - 2] == self.goals[agent]: end -= 1
+        return [self.grid.pos(i) for i in cells[:end]]
+
+    @property
+    def arrived(self):
+        return [i == g for i, g in zip(self.positions[-1].tolist(), self.goals)]
+
+
+def find_conflicts(positions):
+    """``(tick, kind, a, b)`` for every vertex or swap conflict in a ``(ticks + 1) x agents`` array."""
+    conflicts = []
+    for t in range(len(positions)):
+        row = positions[t].tolist()
+        seen = {}
+        for a, i in enumerate(row):
+            if i in seen: conflicts.append((t, "vertex", seen[i], a))
+            else: seen[i] = a
+        if t:
+            prev = positions[t - 1].tolist()
+            where = {i: a for a, i in enumerate(prev)}
+            for a, i in enumerate(row):
+                b = where.get(i)
+                if b is not None and b > a and prev[a] != i and row[b] == prev[a]:
+                    conflicts.append((t, "swap", a, b))
+    return conflicts
+
+
+class WindowedPlanner:
+    def __init__(self, grid, agents, window=DEFAULT_WINDOW, heuristic="field"):
+        """``agents`` is a list of ``(start, goal)``; ``heuristic="distance"`` swaps the
+        per-goal distance fields for Manhattan/Chebyshev distance, for many goals on big maps."""
+        self.grid = grid
+        self.window = window
+        self.starts = [grid.index(s) for s, _ in agents]
+        self.goals = [grid.index(g) for _, g in agents]
+        self.table = ReservationTable(window)
+        self.fields = {}
+        if heuristic == "field":
+            for g in set(self.goals):
+                self.fields[g], _ = distance_field(grid, grid.pos(g), steps=True)
+        # with the fields at hand, agents that can never arrive do not hold the run open
+        self.reachable = [g not in self.fields or self.fields[g][s] != np.inf
+                          for s, g in zip(self.starts, self.goals)]
+        self.searches = self.expanded = self.stalled = 0
+
+    def _h(self, cell, goal):
+        field = self.fields.get(goal)
+        if field is not None:
+            d = field[cell]
+            return 0 if d == np.inf else int(d)
+        stride = self.grid.stride
+        (ar, ac), (br, bc) = divmod(cell, stride), divmod(goal, stride)
+        dr, dc = abs(ar - br), abs(ac - bc)
+        return max(dr, dc) if self.grid.connectivity == 8 else dr + dc
+
+    def _search(self, agent, start, t0):
+        """The agent's next ``window`` ticks as window + 1 cells, or None."""
+        grid, table, window = self.grid, self.table, self.window
+        cells = grid.cells; size = grid.size
+        moves = [(0, 0, 0)] + [(o, ga, gb) for o, _, ga, gb in grid.moves]   # waiting first
+        goal = self.goals[agent]
+        h = self._h
+        self.searches += 1
+        g = {start: 0}
+        parent = {start: None}
+        count = 0
+        heap = [(h(start, goal), 0, count, start)]
+        while heap:
+            _, gs, _, state = heapq.heappop(heap)
+            if gs > g.get(state, gs): continue
+            dt, u = divmod(state, size)
+            if dt == window:
+                path = []
+                while state is not None:
+                    path.append(state % size); state = parent[state]
+                return path[::-1]
+            self.expanded += 1
+            t = t0 + dt
+            for o, ga, gb in moves:
+                n = u + o
+                if o:
+                    if (cells[n] | cells[u + ga] | cells[u + gb]) & BLOCKED: continue
+                    b = table.owner(t, n)   # b is where n's occupant goes: no trading places
+                    if b is not None and b != agent and table.owner(t + 1, u) == b: continue
+                other = table.owner(t + 1, n)
+                if other is not None and other != agent: continue
+                nxt = state + size + o
+                cost = gs + (0 if o == 0 and u == goal else 1)
+                if cost < g.get(nxt, cost + 1):
+                    g[nxt] = cost; parent[nxt] = state
+                    count += 1
+                    heapq.heappush(heap, (cost + h(n, goal), cost, count, nxt))
+        return None
+
+    def plan(self, max_ticks=None):
+        steps = self.plan_steps(max_ticks)
+        while True:
+            try: next(steps)
+            except StopIteration as stop: return stop.value
+
+    def plan_steps(self, max_ticks=None):
+        """Like ``plan``, but a generator that yields the tick each replanning round starts at."""
+        grid = self.grid
+        agents = len(self.starts)
+        max_ticks = max_ticks or 4 * (grid.rows + grid.cols)
+        step = max(1, self.window // 2)
+        pos = list(self.starts)
+        trail = [list(pos)]
+        peak = rounds = 0
+        t0 = time.perf_counter()
+        t = 0
+        waiting = [a for a in range(agents) if self.reachable[a]]
+        last = None
+        while t < max_ticks and any(pos[a] != self.goals[a] for a in waiting):
+            yield t
+            table = self.table
+            table.clear()
+            for a, i in enumerate(pos):
+                # until an agent is planned it holds its cell -- for the whole window while it is
+                # under way, so waiting stays open to it, but only for the next tick once parked
+                # at its goal or stuck since the last round, so the agents planned before it can
+                # push it aside
+                yielding = i == self.goals[a] or last is not None and last[a] == i
+                for dt in range(2 if yielding else self.window + 1):
+                    table.reserve(t + dt, i, a)
+            last = list(pos)
+            shift = rounds % agents if agents else 0
+            plans = [None] * agents
+            pending = deque(list(range(shift, agents)) + list(range(shift)))
+            while pending:
+                a = pending.popleft()
+                for dt in range(1, self.window + 1): table.release(t + dt, pos[a], a)
+                path = self._search(a, pos[a], t)
+                if path is None:
+                    # no way around: the agent stays put, and whoever planned through its cell
+                    # replans around it -- each agent is pinned at most once a round
+                    self.stalled += 1
+                    path = [pos[a]] * (self.window + 1)
+                    for dt in range(1, self.window + 1):
+                        b = table.owner(t + dt, pos[a])
+                        if b is not None and b != a and plans[b] is not None:
+                            for k, i in enumerate(plans[b][1:], 1): table.release(t + k, i, b)
+                            plans[b] = None
+                            pending.append(b)
+                for dt, i in enumerate(path[1:], 1): table.reserve(t + dt, i, a)
+                plans[a] = path
+            peak = max(peak, len(table))
+            for k in range(1, step + 1):
+                pos = [plans[a][k] for a in range(agents)]
+                trail.append(pos)
+                if all(pos[a] == self.goals[a] for a in waiting): break
+            t += step
+            rounds += 1
+        positions = np.array(trail, dtype=np.int32).reshape(len(trail), agents)
+        conflicts = find_conflicts(positions)
+        arrived = int(sum(i == g for i, g in zip(positions[-1].tolist(), self.goals)))
+        moves = int((positions[1:] != positions[:-1]).sum()) if len(positions) > 1 else 0
+        stats = {"agents": agents, "arrived": arrived, "ticks": len(positions) - 1, "moves": moves,
+                 "replans": rounds, "searches": self.searches, "expanded": self.expanded,
+                 "stalled": self.stalled,
+                 "unreachable": agents - len(waiting), "conflicts": len(conflicts), "peak_reservations": peak,
+                 "ms": (time.perf_counter() - t0) * 1e3}
+        return MultiAgentResult(grid, positions, list(self.goals), stats)
+
+
+def whca_star(grid, agents, window=DEFAULT_WINDOW, heuristic="field", max_ticks=None):
+    """Plan ``(start, goal)`` agents together; see the module docstring."""
+    return WindowedPlanner(grid, agents, window, heuristic).plan(max_ticks)
+
+
+def whca_star_steps(grid, agents, window=DEFAULT_WINDOW, heuristic="field", max_ticks=None):
+    """``whca_star`` as a generator of replanning ticks, for running it in steps or on a worker."""
+    return (yield from WindowedPlanner(grid, agents, window, heuristic).plan_steps(max_ticks))
+
+
+def random_agents(grid, count, seed=0):
+    """``count`` agents with distinct free starts and distinct free goals, seeded."""
+    rng = np.random.default_rng(seed)
+    free = np.flatnonzero((grid.view & BLOCKED) == 0)
+    count = min(count, len(free))
+    starts = rng.choice(free, count, replace=False)
+    goals = rng.choice(free, count, replace=False)
+    cols = grid.cols
+    return [((int(s) // cols, int(s) % cols), (int(g) // cols, int(g) % cols)) for s, g in zip(starts, goals)]
@@ -0,0 +1,91 @@
+"""Per-run instrumentation: search counters, path figures and a wall-time split.
+
+Every engine reports ``expanded``, ``pushes``, ``pops``, ``stale`` and
+``peak_open`` in ``SearchResult.stats``. A ``RunStats`` gathers those with
+the path's length and cost and the wall time the run spent in each phase:
+
+- ``search``: inside the engine's step generator;
+- ``draw``: in ``on_event`` callbacks (in the visualizer, rendering frames);
+- ``events``: the visualizer's event pump.
+
+``profile_run`` fills one in for a headless run, timing the generator and
+the callback separately; the visualizer fills one per Run itself. Both
+export as JSON::
+
+    stats = profile_run("A*", grid, start, end, on_event=draw)
+    print(stats.as_dict()["ms"])
+    export_json([stats], "runs.json")
+"""
+import json, time
+
+from .algorithms import STEPPERS
+
+PHASES = ("search", "draw", "events")
+COUNTERS = ("expanded", "pushes", "pops", "stale", "peak_open")
+
+
+class RunStats:
+    def __init__(self, algorithm, start=None, end=None):
+        self.algorithm = algorithm
+        self.start, self.end = start, end
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.steps = 0          # events the engine yielded
+        self.frames = 0         # visualizer frames the run spanned
+        self.result = None      # the SearchResult, once the run finished
+
+    def add(self, phase, seconds):
+        self.seconds[phase] += seconds
+
+    def finish(self, result):
+        self.result = result
+
+    def as_dict(self):
+        result = self.result
+        found = result is not None and result.found
+        stats = dict(result.stats) if result is not None else {}
+        out = {"algorithm": self.algorithm, "start": self.start, "end": self.end,
+               "finished": result is not None, "found": found,
+               "path_length": len(result.path) - 1 if found else None,
+               "cost": result.cost if found else None}
+        out.update((k, stats.pop(k, None)) for k in COUNTERS)
+        out["other"] = stats   # engine-specific extras: changed_cells, clusters_rebuilt, cache, ...
+        out["steps"], out["frames"] = self.steps, self.frames
+        out["ms"] = {phase: round(s * 1e3, 3) for phase, s in self.seconds.items()}
+        out["ms"]["total"] = round(sum(self.seconds.values()) * 1e3, 3)
+        return out
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
+
+
+def profile_run(algorithm, grid, start, end, on_event=None):
+    """Run ``algorithm`` like ``ALGORITHMS[algorithm]`` would, returning its ``RunStats``."""
+    stats = RunStats(algorithm, start, end)
+    steps = STEPPERS[algorithm](grid, start, end, on_event is not None)
+    clock = time.perf_counter
+    search = draw = 0.0
+    count = 0
+    t = clock()
+    try:
+        while True:
+            kind, i = next(steps)
+            t1 = clock()
+            on_event(kind, i)
+            count += 1
+            t2 = clock()
+            search += t1 - t; draw += t2 - t1
+            t = t2
+    except StopIteration as stop:
+        search += clock() - t
+        stats.finish(stop.value)
+    stats.add("search", search); stats.add("draw", draw)
+    stats.steps = count
+    return stats
+
+
+def export_json(runs, path=None):
+    """Serialize several ``RunStats`` as ``{"runs": [...]}``; written to ``path`` if given."""
+    text = json.dumps({"runs": [run.as_dict() for run in runs]}, indent=2)
+    if path:
+        with open(path, "w") as f: f.write(text)
+    return text
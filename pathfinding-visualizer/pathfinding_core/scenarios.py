@@ -0,0 +1,128 @@
+"""Reproducible, seeded map and query generators for benchmarks and demos.
+
+Every generator takes ``(rows, cols=None, seed=0, ...)`` and returns a fresh
+``Grid``; the same arguments always give the same map. Layouts are built
+with whole-array numpy operations where possible so maps of several thousand
+rows are cheap to make.
+"""
+import numpy as np
+
+from .grid import Grid, BARRIER
+
+
+def _from_mask(mask):
+    grid = Grid(*mask.shape)
+    grid.view[mask] |= BARRIER
+    grid.changed()
+    return grid
+
+
+def random_obstacles(rows, cols=None, seed=0, density=0.25):
+    """Each cell is a barrier with probability ``density``."""
+    cols = rows if cols is None else cols
+    rng = np.random.default_rng(seed)
+    return _from_mask(rng.random((rows, cols)) < density)
+
+
+def maze(rows, cols=None, seed=0):
+    """A perfect maze (recursive backtracker) with one-cell corridors and walls."""
+    cols = rows if cols is None else cols
+    rng = np.random.default_rng(seed)
+    mask = np.ones((rows, cols), dtype=bool)
+    h, w = (rows + 1) // 2, (cols + 1) // 2   # maze cells live on even coordinates
+    visited = np.zeros(h * w, dtype=bool)
+    steps = ((0, 1), (1, 0), (0, -1), (-1, 0))
+    order = rng.permuted(np.tile(np.arange(4), (h * w, 1)), axis=1).tolist()
+    stack = [0]
+    visited[0] = True
+    mask[0, 0] = False
+    while stack:
+        cur = stack[-1]
+        r, c = divmod(cur, w)
+        for k in order[cur]:
+            dr, dc = steps[k]
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < h and 0 <= nc < w and not visited[nr * w + nc]:
+                visited[nr * w + nc] = True
+                mask[2 * r + dr, 2 * c + dc] = False
+                mask[2 * nr, 2 * nc] = False
+                stack.append(nr * w + nc)
+                break
+        else:
+            stack.pop()
+    return _from_mask(mask)
+
+
+def rooms(rows, cols=None, seed=0, room=12, door=2):
+    """Square rooms of side ``room`` separated by walls, each shared wall with one door."""
+    cols = rows if cols is None else cols
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((rows, cols), dtype=bool)
+    step = room + 1
+    mask[step - 1::step, :] = True
+    mask[:, step - 1::step] = True
+    for wr in range(step - 1, rows, step):            # horizontal walls: a door per room column
+        for c0 in range(0, cols, step):
+            width = min(room, cols - c0)
+            if width <= 0: continue
+            d = c0 + int(rng.integers(0, max(1, width - door + 1)))
+            mask[wr, d:d + door] = False
+    for wc in range(step - 1, cols, step):            # vertical walls: a door per room row
+        for r0 in range(0, rows, step):
+            height = min(room, rows - r0)
+            if height <= 0: continue
+            d = r0 + int(rng.integers(0, max(1, height - door + 1)))
+            mask[d:d + door, wc] = False
+    return _from_mask(mask)
+
+
+def terrain(rows, cols=None, seed=0, feature=24, roads=4):
+    """A weighted map: smooth patches of mud (cost 3) and water (cost 8) on
+    open ground, crossed by a few straight roads (cost 1) and no barriers."""
+    cols = rows if cols is None else cols
+    rng = np.random.default_rng(seed)
+    coarse = rng.random((rows // feature + 2, cols // feature + 2))
+    # bilinear upsampling of a coarse noise grid gives blobs about ``feature`` cells wide
+    y = np.linspace(0, coarse.shape[0] - 1.001, rows)
+    x = np.linspace(0, coarse.shape[1] - 1.001, cols)
+    y0, x0 = y.astype(int), x.astype(int)
+    fy, fx = (y - y0)[:, None], (x - x0)[None, :]
+    field = (coarse[y0][:, x0] * (1 - fy) * (1 - fx) + coarse[y0 + 1][:, x0] * fy * (1 - fx) +
+             coarse[y0][:, x0 + 1] * (1 - fy) * fx + coarse[y0 + 1][:, x0 + 1] * fy * fx)
+    cost = np.where(field > 0.65, 8, np.where(field > 0.45, 3, 2)).astype(np.uint8)
+    cost[rng.integers(0, rows, roads), :] = 1
+    cost[:, rng.integers(0, cols, roads)] = 1
+    grid = Grid(rows, cols)
+    grid.interior(grid.costs)[:] = cost
+    grid.changed()
+    return grid
+
+
+def cave(rows, cols=None, seed=0, fill=0.45, iterations=5):
+    """Organic, game-map-like caverns (cellular automaton), in the spirit of the Moving AI maps."""
+    cols = rows if cols is None else cols
+    rng = np.random.default_rng(seed)
+    wall = rng.random((rows, cols)) < fill
+    for _ in range(iterations):
+        padded = np.pad(wall, 1, constant_values=True).astype(np.uint8)
+        around = sum(padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+                     for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+        wall = (around >= 5) | (wall & (around >= 4))
+    return _from_mask(wall)
+
+
+SCENARIOS = {"random": random_obstacles, "maze": maze, "rooms": rooms, "cave": cave, "terrain": terrain}
+
+
+def random_queries(grid, count, seed=0, min_distance=0):
+    """``count`` seeded ``(start, end)`` pairs of free cells at least ``min_distance`` apart (Manhattan)."""
+    rng = np.random.default_rng(seed)
+    free = np.argwhere(~grid.barriers)
+    if len(free) == 0: return []
+    queries = []
+    for _ in range(count * 50):
+        if len(queries) == count: break
+        a, b = free[rng.integers(len(free), size=2)]
+        if abs(int(a[0]) - int(b[0])) + abs(int(a[1]) - int(b[1])) >= min_distance:
+            queries.append(((int(a[0]), int(a[1])), (int(b[0]), int(b[1]))))
+    return queries
@@ -0,0 +1,317 @@
+"""The classic searches, free of any drawing or event handling.
+
+Each search is written once as a step generator, ``a_star_steps(grid, start,
+end)`` and friends, that yields ``(kind, i)`` events -- ``"open"``,
+``"closed"`` or ``"path"`` (bidirectional searches add ``"open_back"`` and
+``"closed_back"``) plus the cell's flat index in ``grid.cells`` -- and
+returns a ``SearchResult`` when exhausted. A front end pulls as many steps as
+it likes per frame. The plain ``a_star(grid, start, end, on_event=None)``
+functions run a generator to completion; without ``on_event`` no events are
+produced at all, so headless runs pay nothing for them.
+
+The engine is single threaded and lock free: plain ``heapq``/``deque``/list
+frontiers, per-grid generation-stamped state (see ``state.py``), a real closed
+set, and stale heap entries skipped on pop. Heap ties break on the smaller
+heuristic and then on insertion order, so runs are deterministic.
+
+A*, Dijkstra and Dial charge ``grid.costs`` of the cell being entered, times
+sqrt(2) for a diagonal move on an 8-connected grid; A* uses the Manhattan or
+octile heuristic to match, both admissible since no step costs less than 1.
+BFS and DFS count steps. When the grid has ALT landmark tables attached
+(``landmarks.py``), A* raises its heuristic to their lower bound wherever that
+is larger.
+
+Every engine except the flow field first looks the endpoints up in the
+grid's component index (``components.py``): a query from or to a barrier, or
+whose end lies in another region than its start, returns "no path" at once,
+marked ``stats["unreachable"] == "components"``, instead of expanding
+everything the start can reach. A flow field serves every start toward its
+goal, so it is built regardless.
+"""
+import heapq
+from collections import deque
+from dataclasses import dataclass, field
+
+from .grid import BLOCKED, SQRT2
+from .components import component_index
+from .state import search_state
+
+OPEN, CLOSED, PATH = "open", "closed", "path"
+# the backward frontier of a bidirectional search
+OPEN_BACK, CLOSED_BACK = "open_back", "closed_back"
+
+
+@dataclass
+class SearchResult:
+    path: list = field(default_factory=list)   # (row, col) from start to end, empty if unreachable
+    cost: float = float('inf')
+    stats: dict = field(default_factory=dict)
+
+    @property
+    def found(self): return bool(self.path)
+
+
+# ---------- Heuristic & path reconstruct ----------
+def h(p1, p2):
+    (r1, c1), (r2, c2) = p1, p2
+    return abs(r1 - r2) + abs(c1 - c2)
+
+
+DIAGONAL_SAVING = 2 - SQRT2   # a diagonal step replaces two straight ones
+
+
+def octile(p1, p2):
+    """Exact distance on an open 8-connected grid with sqrt(2) diagonals."""
+    (r1, c1), (r2, c2) = p1, p2
+    dr, dc = abs(r1 - r2), abs(c1 - c2)
+    return dr + dc - DIAGONAL_SAVING * (dr if dr < dc else dc)
+
+
+def heuristic(grid):
+    """The admissible distance estimate for the grid's connectivity."""
+    return octile if grid.connectivity == 8 else h
+
+
+def reconstruct_path(parent, start, end):
+    """Flat indices from ``start`` to ``end`` following ``parent`` links."""
+    path = [end]
+    while end != start:
+        end = parent[end]
+        path.append(end)
+    path.reverse()
+    return path
+
+
+def _stats(expanded, pushes, pops, stale, peak):
+    return {"expanded": expanded, "pushes": pushes, "pops": pops, "stale": stale, "peak_open": peak}
+
+
+def _unreachable():
+    # endpoints in different components: nothing was searched
+    return SearchResult(stats={**_stats(0, 0, 0, 0, 0), "unreachable": "components"})
+
+
+def _plain(cost):
+    # g values are stored as floats; whole costs are reported as ints
+    return int(cost) if float(cost).is_integer() else cost
+
+
+def _finish(grid, parent, s, e, cost, stats, trace):
+    path = reconstruct_path(parent, s, e)
+    if trace:
+        # walk back from end like the visualizer always did, endpoints excluded
+        for i in reversed(path[1:-1]): yield PATH, i
+    return SearchResult([grid.pos(i) for i in path], _plain(cost), stats)
+
+
+def run_steps(steps, on_event=None):
+    """Drain a step generator, forwarding its events; returns its SearchResult."""
+    try:
+        while True:
+            kind, i = next(steps)
+            on_event(kind, i)
+    except StopIteration as stop:
+        return stop.value
+
+
+# ---------- Algorithms ----------
+def a_star_steps(grid, start, end, trace=True):
+    cells = memoryview(grid.cells); costs = memoryview(grid.costs); moves = grid.moves
+    stride = grid.stride
+    saving = DIAGONAL_SAVING if grid.connectivity == 8 else 0
+    s, e = grid.index(start), grid.index(end)
+    if component_index(grid).separated(s, e): return _unreachable()
+    from .landmarks import attached_landmarks   # landmarks build on fields, which import this module
+    marks = attached_landmarks(grid)
+    alt = memoryview(marks.bounds(e)) if marks else None
+    er, ec = divmod(e, stride)
+    gen, seen, closed, g, parent = search_state(grid).begin()
+    seen[s] = gen; g[s] = 0; parent[s] = s
+    h0 = max(heuristic(grid)(start, end), alt[s]) if alt is not None else heuristic(grid)(start, end)
+    count = 0
+    open_set = [(h0, h0, count, s)]
+    push, pop = heapq.heappush, heapq.heappop
+    expanded = pops = stale = 0; pushes = peak = 1
+    while open_set:
+        if len(open_set) > peak: peak = len(open_set)
+        current = pop(open_set)[3]
+        pops += 1
+        if closed[current] == gen:
+            stale += 1
+            continue
+        if current == e:
+            stats = _stats(expanded, pushes, pops, stale, peak)
+            if alt is not None: stats["heuristic"] = f"ALT ({len(marks)} landmarks)"
+            return (yield from _finish(grid, parent, s, e, g[e], stats, trace))
+        closed[current] = gen
+        expanded += 1
+        gc = g[current]
+        for o, w, ga, gb in moves:
+            neighbor = current + o
+            if cells[neighbor] & BLOCKED or closed[neighbor] == gen: continue
+            if ga and (cells[current + ga] | cells[current + gb]) & BLOCKED: continue
+            temp_g = gc + costs[neighbor] * w
+            if seen[neighbor] != gen or temp_g < g[neighbor]:
+                seen[neighbor] = gen
+                g[neighbor] = temp_g
+                parent[neighbor] = current
+                nr, nc = divmod(neighbor, stride)
+                dr, dc = abs(nr - er), abs(nc - ec)
+                hn = dr + dc - saving * (dr if dr < dc else dc)
+                if alt is not None and alt[neighbor] > hn: hn = alt[neighbor]
+                count += 1
+                push(open_set, (temp_g + hn, hn, count, neighbor))
+                pushes += 1
+                if trace: yield OPEN, neighbor
+        if trace and current != s: yield CLOSED, current
+    stats = _stats(expanded, pushes, pops, stale, peak)
+    if alt is not None: stats["heuristic"] = f"ALT ({len(marks)} landmarks)"
+    return SearchResult(stats=stats)
+
+
+def dijkstra_steps(grid, start, end, trace=True):
+    cells = memoryview(grid.cells); costs = memoryview(grid.costs); moves = grid.moves
+    s, e = grid.index(start), grid.index(end)
+    if component_index(grid).separated(s, e): return _unreachable()
+    gen, seen, closed, dist, parent = search_state(grid).begin()
+    seen[s] = gen; dist[s] = 0; parent[s] = s
+    count = 0
+    pq = [(0, count, s)]
+    push, pop = heapq.heappush, heapq.heappop
+    expanded = pops = stale = 0; pushes = peak = 1
+    while pq:
+        if len(pq) > peak: peak = len(pq)
+        d, _, current = pop(pq)
+        pops += 1
+        if closed[current] == gen or d > dist[current]:
+            stale += 1
+            continue
+        if current == e:
+            return (yield from _finish(grid, parent, s, e, d, _stats(expanded, pushes, pops, stale, peak), trace))
+        closed[current] = gen
+        expanded += 1
+        for o, w, ga, gb in moves:
+            neighbor = current + o
+            if cells[neighbor] & BLOCKED or closed[neighbor] == gen: continue
+            if ga and (cells[current + ga] | cells[current + gb]) & BLOCKED: continue
+            temp = d + costs[neighbor] * w
+            if seen[neighbor] != gen or temp < dist[neighbor]:
+                seen[neighbor] = gen
+                dist[neighbor] = temp
+                parent[neighbor] = current
+                count += 1
+                push(pq, (temp, count, neighbor))
+                pushes += 1
+                if trace: yield OPEN, neighbor
+        if trace and current != s: yield CLOSED, current
+    return SearchResult(stats=_stats(expanded, pushes, pops, stale, peak))
+
+
+def dial_steps(grid, start, end, trace=True):
+    """Dijkstra on a bucket queue (Dial's algorithm): no heap, O(1) push and pop.
+
+    Tentative distances never run more than ``grid.max_cost`` ahead of the one
+    being expanded, so ``max_cost + 1`` buckets used round-robin hold the whole
+    frontier; the cursor only ever moves forward. Needs integer step costs, so
+    8-connected grids (sqrt(2) diagonals) are handed to ``dijkstra_steps``.
+    """
+    if grid.connectivity != 4:
+        return (yield from dijkstra_steps(grid, start, end, trace))
+    cells = memoryview(grid.cells); costs = memoryview(grid.costs); offsets = grid.offsets.tolist()
+    s, e = grid.index(start), grid.index(end)
+    if component_index(grid).separated(s, e): return _unreachable()
+    gen, seen, closed, dist, parent = search_state(grid).begin()
+    seen[s] = gen; dist[s] = 0; parent[s] = s
+    width = grid.max_cost + 1
+    buckets = [[] for _ in range(width)]
+    buckets[0].append(s)
+    d = 0; pending = 1
+    expanded = pops = stale = 0; pushes = peak = 1
+    while pending:
+        bucket = buckets[d % width]
+        if not bucket:
+            d += 1
+            continue
+        if pending > peak: peak = pending
+        current = bucket.pop()
+        pending -= 1; pops += 1
+        if closed[current] == gen:
+            stale += 1
+            continue
+        if current == e:
+            return (yield from _finish(grid, parent, s, e, d, _stats(expanded, pushes, pops, stale, peak), trace))
+        closed[current] = gen
+        expanded += 1
+        for o in offsets:
+            neighbor = current + o
+            if cells[neighbor] & BLOCKED or closed[neighbor] == gen: continue
+            temp = d + costs[neighbor]
+            if seen[neighbor] != gen or temp < dist[neighbor]:
+                seen[neighbor] = gen
+                dist[neighbor] = temp
+                parent[neighbor] = current
+                buckets[temp % width].append(neighbor)
+                pending += 1; pushes += 1
+                if trace: yield OPEN, neighbor
+        if trace and current != s: yield CLOSED, current
+    return SearchResult(stats=_stats(expanded, pushes, pops, stale, peak))
+
+
+def _uninformed_steps(lifo, grid, start, end, trace):
+    cells = memoryview(grid.cells); moves = grid.moves
+    s, e = grid.index(start), grid.index(end)
+    if component_index(grid).separated(s, e): return _unreachable()
+    gen, seen, _, depth, parent = search_state(grid).begin()
+    seen[s] = gen; depth[s] = 0; parent[s] = s
+    frontier = [s] if lifo else deque([s])
+    take = frontier.pop if lifo else frontier.popleft
+    expanded = pops = stale = 0; pushes = peak = 1
+    while frontier:
+        if len(frontier) > peak: peak = len(frontier)
+        current = take()
+        pops += 1
+        if current == e:
+            return (yield from _finish(grid, parent, s, e, depth[e], _stats(expanded, pushes, pops, stale, peak), trace))
+        expanded += 1
+        d = depth[current] + 1
+        for o, _, ga, gb in moves:
+            neighbor = current + o
+            if cells[neighbor] & BLOCKED or seen[neighbor] == gen: continue
+            if ga and (cells[current + ga] | cells[current + gb]) & BLOCKED: continue
+            seen[neighbor] = gen
+            depth[neighbor] = d
+            parent[neighbor] = current
+            frontier.append(neighbor)
+            pushes += 1
+            if trace: yield OPEN, neighbor
+        if trace and current != s: yield CLOSED, current
+    return SearchResult(stats=_stats(expanded, pushes, pops, stale, peak))
+
+
+def bfs_steps(grid, start, end, trace=True):
+    return (yield from _uninformed_steps(False, grid, start, end, trace))
+
+
+def dfs_steps(grid, start, end, trace=True):
+    return (yield from _uninformed_steps(True, grid, start, end, trace))
+
+
+def a_star(grid, start, end, on_event=None):
+    return run_steps(a_star_steps(grid, start, end, on_event is not None), on_event)
+
+
+def dijkstra(grid, start, end, on_event=None):
+    return run_steps(dijkstra_steps(grid, start, end, on_event is not None), on_event)
+
+
+def dial(grid, start, end, on_event=None):
+    return run_steps(dial_steps(grid, start, end, on_event is not None), on_event)
+
+
+def bfs(grid, start, end, on_event=None):
+    return run_steps(bfs_steps(grid, start, end, on_event is not None), on_event)
+
+
+def dfs(grid, start, end, on_event=None):
+    return run_steps(dfs_steps(grid, start, end, on_event is not None), on_event)
+
@@ -0,0 +1,44 @@
+"""Scratch arrays the searches reuse from run to run.
+
+A cell's ``g``/``parent`` entries only count when ``seen[i]`` holds the
+current generation, and it is closed when ``closed[i]`` does. Starting a new
+search just bumps the generation, so nothing proportional to the grid size is
+touched between runs. Only one search per grid and slot can be in flight at a
+time; starting another invalidates the first.
+"""
+import numpy as np
+
+_MAX_GENERATION = np.iinfo(np.uint32).max
+
+
+class SearchState:
+    def __init__(self, size):
+        self.size = size
+        self.seen = np.zeros(size, dtype=np.uint32)
+        self.closed = np.zeros(size, dtype=np.uint32)
+        self.g = np.zeros(size, dtype=np.float64)   # float: diagonal steps cost sqrt(2)
+        self.parent = np.zeros(size, dtype=np.int32)
+        self.generation = 0
+
+    def begin(self):
+        """Start a new search; returns ``(gen, seen, closed, g, parent)`` memoryviews."""
+        if self.generation == _MAX_GENERATION:
+            self.seen[:] = 0; self.closed[:] = 0; self.generation = 0
+        self.generation += 1
+        return (self.generation, memoryview(self.seen), memoryview(self.closed),
+                memoryview(self.g), memoryview(self.parent))
+
+
+def search_state(grid, slot=0):
+    """The grid's SearchState for ``slot``, allocated on first use and kept on the grid.
+
+    Bidirectional searches take slot 0 for the forward side and slot 1 for the
+    backward side.
+    """
+    states = getattr(grid, "_search_states", None)
+    if states is None:
+        states = grid._search_states = {}
+    state = states.get(slot)
+    if state is None or state.size != grid.size:
+        state = states[slot] = SearchState(grid.size)
+    return state
@@ -0,0 +1,234 @@
+"""Recording a search's events into a compact trace, and replaying it without the search.
+
+``Trace.record(steps)`` wraps any step generator and stores what it yields
+as it passes through: one byte for the event kind and the cell's flat index,
+appended to flat arrays. ``record_run`` does this for a headless run.
+
+On disk (``save``/``load_trace``, ``.pftrace``) every event is one varint.
+It holds the zigzag-coded difference from the previous event's cell,
+shifted left 3 bits, with the event kind in the low bits. Successive events
+are mostly neighbors, so typical events take one or two bytes, and the
+stream is zlib-compressed on top. The file also carries the run's
+algorithm, start, end, result and stats, plus the barrier bits and costs it
+ran on. ``Trace.grid()`` rebuilds that map, so a trace replays on its own.
+
+``state(n)`` is the overlay after the first ``n`` events: per cell, the kind
+code of the last event that touched it (0 if none). Keyframes hold that
+layer zlib-compressed every ``every`` events (at most ``KEYFRAMES`` of them,
+fewer on big maps, each built the first time a jump needs it), so jumping
+anywhere costs one decompression plus at most ``every`` events applied with
+numpy, however long the run.
+"""
+import json, struct, zlib
+from array import array
+
+import numpy as np
+
+from .grid import Grid, BARRIER
+from .algorithms import STEPPERS
+from .search import OPEN, CLOSED, PATH, OPEN_BACK, CLOSED_BACK
+
+KINDS = (OPEN, CLOSED, PATH, OPEN_BACK, CLOSED_BACK)   # kind code k + 1; 0 means untouched
+CODES = {kind: k + 1 for k, kind in enumerate(KINDS)}
+KIND_BITS = 3
+
+MAGIC = b"PFTRACE\x01"
+HEADER = struct.Struct("<8sIIQBB6x")   # magic, rows, cols, events, connectivity, corner cutting
+KEYFRAMES = 64                         # at most this many keyframes per trace
+KEYFRAME_MIN = 4096                    # and never closer together than this many events,
+KEYFRAME_CELLS = 8                     # nor than one per this many cells of the map
+
+
+class Trace:
+    def __init__(self, grid, algorithm=None, start=None, end=None):
+        self.rows, self.cols = grid.rows, grid.cols
+        self.connectivity, self.corner_cutting = grid.connectivity, grid.corner_cutting
+        # the map as it was when the run started, for replaying it anywhere
+        self.barriers = np.packbits(grid.barriers, axis=None)
+        self.costs = grid.interior(grid.costs).copy() if grid.weighted else None
+        self.meta = {"algorithm": algorithm, "start": start, "end": end}
+        self._kinds = array("B"); self._cells = array("i")
+        self._arrays = None
+        self._keyframes = None
+
+    # ---------- recording ----------
+    def record(self, steps):
+        """Pass ``steps``'s events through, recording them; returns its result."""
+        kinds, cells = self._kinds, self._cells
+        try:
+            while True:
+                try:
+                    kind, i = next(steps)
+                except StopIteration as stop:
+                    self.finish(stop.value)
+                    return stop.value
+                kinds.append(CODES[kind]); cells.append(i)
+                yield kind, i
+        finally:
+            steps.close()
+
+    def finish(self, result):
+        found = result is not None and result.found
+        self.meta.update(found=found, path_length=len(result.path) - 1 if found else None,
+                         cost=result.cost if found else None,
+                         stats={k: v for k, v in (result.stats if result is not None else {}).items()
+                                if isinstance(v, (int, float, str))})
+
+    def __len__(self): return len(self._kinds)
+
+    @property
+    def size(self): return (self.rows + 2) * (self.cols + 2)
+
+    @property
+    def events(self):
+        """``(codes, cells)``: the kind code and flat cell index of every event, as arrays."""
+        if self._arrays is None or len(self._arrays[0]) != len(self):
+            self._arrays = (np.array(self._kinds, dtype=np.uint8), np.array(self._cells, dtype=np.int64))
+        return self._arrays
+
+    # ---------- replay ----------
+    @property
+    def every(self):
+        """Events between keyframes."""
+        # a keyframe costs about as much to build as applying size // KEYFRAME_CELLS events
+        return max(KEYFRAME_MIN, -(-len(self) // KEYFRAMES), self.size // KEYFRAME_CELLS)
+
+    def changes(self, lo, hi):
+        """``(cells, codes)``: where events ``lo``..``hi`` leave each cell they touch."""
+        codes, cells = self.events
+        cells, codes = cells[lo:hi][::-1], codes[lo:hi][::-1]
+        cells, last = np.unique(cells, return_index=True)   # first in reverse: the last event wins
+        return cells, codes[last]
+
+    def apply(self, layer, lo, hi):
+        """Bring a ``state(lo)`` layer forward to ``state(hi)`` in place."""
+        cells, codes = self.changes(lo, hi)
+        layer[cells] = codes
+
+    def state(self, n):
+        """The overlay after the first ``n`` events, as a fresh layer of kind codes."""
+        n = max(0, min(n, len(self)))
+        k = n // self.every
+        layer = self._keyframe(k)
+        self.apply(layer, k * self.every, n)
+        return layer
+
+    def _keyframe(self, k):
+        # keyframes are built on demand up to the one asked for, from a running layer
+        if self._keyframes is None or self._keyframes[0] != len(self):
+            self._keyframes = (len(self), [zlib.compress(bytes(self.size), 1)], np.zeros(self.size, np.uint8))
+        _, frames, front = self._keyframes
+        every = self.every
+        while len(frames) <= k:
+            lo = (len(frames) - 1) * every
+            self.apply(front, lo, lo + every)
+            frames.append(zlib.compress(front.tobytes(), 1))
+        return np.frombuffer(zlib.decompress(frames[k]), dtype=np.uint8).copy()
+
+    def kind(self, n):
+        """The kind of event ``n``."""
+        return KINDS[self.events[0][n] - 1]
+
+    def matches(self, grid):
+        """True if ``grid`` has the barriers, costs and connectivity the run had."""
+        if (grid.rows, grid.cols, grid.connectivity, grid.corner_cutting) != \
+                (self.rows, self.cols, self.connectivity, self.corner_cutting):
+            return False
+        if not np.array_equal(np.packbits(grid.barriers, axis=None), self.barriers): return False
+        return np.array_equal(grid.interior(grid.costs), self.costs) if self.costs is not None else not grid.weighted
+
+    def grid(self):
+        """A new ``Grid`` with the barriers, costs and connectivity the run had."""
+        grid = Grid(self.rows, self.cols)
+        cells = np.unpackbits(self.barriers, count=self.rows * self.cols).reshape(self.rows, self.cols)
+        grid.view[:] = cells * BARRIER
+        if self.costs is not None: grid.interior(grid.costs)[:] = self.costs
+        grid.set_connectivity(self.connectivity, self.corner_cutting)
+        grid.changed()
+        return grid
+
+    # ---------- file format ----------
+    def to_bytes(self):
+        codes, cells = self.events
+        deltas = np.diff(cells, prepend=0)
+        zigzag = (deltas << 1) ^ (deltas >> 63)
+        stream = _varints((zigzag.astype(np.uint64) << KIND_BITS) | codes)
+        sections = [json.dumps(self.meta).encode(), self.barriers.tobytes(),
+                    self.costs.tobytes() if self.costs is not None else b"", stream]
+        out = [HEADER.pack(MAGIC, self.rows, self.cols, len(self), self.connectivity, self.corner_cutting)]
+        for data in sections:
+            data = zlib.compress(data, 6)
+            out += [struct.pack("<I", len(data)), data]
+        return b"".join(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, rows, cols, count, connectivity, corner_cutting = HEADER.unpack_from(data)
+        if magic != MAGIC: raise ValueError("not a pathfinding_core trace")
+        offset = HEADER.size
+        sections = []
+        for _ in range(4):
+            (length,) = struct.unpack_from("<I", data, offset)
+            sections.append(zlib.decompress(data[offset + 4:offset + 4 + length]))
+            offset += 4 + length
+        meta, barriers, costs, stream = sections
+        trace = cls.__new__(cls)
+        trace.rows, trace.cols = rows, cols
+        trace.connectivity, trace.corner_cutting = connectivity, bool(corner_cutting)
+        trace.barriers = np.frombuffer(barriers, dtype=np.uint8)
+        trace.costs = np.frombuffer(costs, dtype=np.uint8).reshape(rows, cols) if costs else None
+        trace.meta = json.loads(meta)
+        values = _unvarints(np.frombuffer(stream, dtype=np.uint8))
+        if len(values) != count: raise ValueError(f"trace holds {len(values)} events, header says {count}")
+        zigzag = (values >> KIND_BITS).astype(np.int64)
+        cells = np.cumsum((zigzag >> 1) ^ -(zigzag & 1))
+        trace._kinds = array("B", (values & ((1 << KIND_BITS) - 1)).astype(np.uint8).tobytes())
+        trace._cells = array("i", cells.astype(np.int32).tobytes())
+        trace._arrays = trace._keyframes = None
+        return trace
+
+    def save(self, path):
+        with open(path, "wb") as f: f.write(self.to_bytes())
+
+
+def load_trace(path):
+    with open(path, "rb") as f:
+        return Trace.from_bytes(f.read())
+
+
+def record_run(algorithm, grid, start, end):
+    """Run ``algorithm`` headless and return its ``Trace``."""
+    trace = Trace(grid, algorithm, start, end)
+    steps = trace.record(STEPPERS[algorithm](grid, start, end))
+    for _ in steps: pass
+    return trace
+
+
+def _varints(values):
+    """LEB128: seven bits per byte, low groups first, high bit set on all but the last byte."""
+    values = values.astype(np.uint64)
+    if not len(values): return b""
+    nbytes = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += values >= np.uint64(1 << (7 * k))
+    ends = np.cumsum(nbytes)
+    out = np.empty(int(ends[-1]), dtype=np.uint8)
+    starts = ends - nbytes
+    for k in range(int(nbytes.max())):
+        has = nbytes > k
+        group = (values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = np.where(nbytes[has] > k + 1, 0x80, 0).astype(np.uint64)
+        out[starts[has] + k] = (group | more).astype(np.uint8)
+    return out.tobytes()
+
+
+def _unvarints(data):
+    if not len(data): return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(data < 0x80) + 1
+    starts = np.concatenate(([0], ends[:-1]))
+    nbytes = ends - starts
+    values = np.zeros(len(ends), dtype=np.uint64)
+    for k in range(int(nbytes.max())):
+        has = nbytes > k
+        values[has] |= (data[starts[has] + k] & 0x7F).astype(np.uint64) << np.uint64(7 * k)
+    return values
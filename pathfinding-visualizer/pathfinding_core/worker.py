@@ -0,0 +1,101 @@
+"""Running a step generator on a background thread.
+
+The engines are step generators (see ``search``), so a frontend can pull a
+few events per frame -- but some steps are long: building JPS+ tables, an
+HPA* cluster graph or a flow field, planning many agents. ``SearchWorker``
+drives the generator on a daemon thread instead and publishes its events in
+a bounded buffer that the render loop drains with ``take`` at its own pace.
+
+- The worker runs at most ``backlog`` events ahead of the consumer and then
+  waits, so a paused consumer also pauses the search and memory stays bounded.
+- ``cancel`` stops it at the next event. Engines only yield between
+  complete steps, so their cached state is left consistent (the same
+  guarantee as abandoning a generator).
+- ``lock``, if given, is held for the whole run. Workers sharing one lock
+  run one after another, so two never touch a grid's caches at once; a new
+  worker queues behind a cancelled one that is still finishing its step.
+- ``gate``, if given, is a ``threading.Event`` the worker waits on before
+  each batch. A render loop clears it while it works and sets it while it
+  sleeps: the two threads then take turns instead of contending for the GIL,
+  which costs the render loop a thread switch on every numpy or pygame call
+  that releases it.
+
+The result (``StopIteration.value``) ends up in ``result``, an exception in
+``error``; ``seconds`` is the time spent inside the generator.
+"""
+import threading, time
+from collections import deque
+
+BACKLOG = 1 << 16   # events buffered ahead of the consumer
+BATCH = 256         # events pulled from the generator per buffer lock
+
+
+class SearchWorker:
+    def __init__(self, steps, lock=None, backlog=BACKLOG, gate=None):
+        self.steps = steps
+        self.lock = lock
+        self.gate = gate
+        self.backlog = backlog
+        self.events = deque()
+        self.ready = threading.Condition()
+        self.result = self.error = None
+        self.seconds = 0.0
+        self.done = self.cancelled = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        if self.lock is not None: self.lock.acquire()
+        steps, events, ready = self.steps, self.events, self.ready
+        clock = time.perf_counter
+        gate = self.gate
+        try:
+            while True:
+                if gate is not None: gate.wait()
+                with ready:
+                    while len(events) >= self.backlog and not self.cancelled: ready.wait()
+                    if self.cancelled: return
+                t = clock()
+                batch = []
+                try:
+                    for _ in range(BATCH): batch.append(next(steps))
+                except StopIteration as stop:
+                    self.result = stop.value
+                    return
+                finally:
+                    self.seconds += clock() - t
+                    if batch:
+                        with ready: events.extend(batch)
+        except Exception as e:
+            self.error = e
+        finally:
+            steps.close()
+            if self.lock is not None: self.lock.release()
+            with ready:
+                self.done = True
+                ready.notify_all()
+
+    def take(self, count=None):
+        """Up to ``count`` buffered events (all of them with None), oldest first; never blocks."""
+        events = self.events
+        with self.ready:
+            n = len(events) if count is None else min(count, len(events))
+            out = [events.popleft() for _ in range(n)]
+            self.ready.notify_all()
+        return out
+
+    def cancel(self):
+        with self.ready:
+            self.cancelled = True
+            self.events.clear()
+            self.ready.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until the generator is finished or cancelled; True if it is."""
+        self.thread.join(timeout)
+        return self.done
+
+    @property
+    def finished(self):
+        """True once the generator ended and every event was taken."""
+        return self.done and not self.events